@@ -0,0 +1,345 @@
+"""Serviço local de análise (HTTP/JSON sobre asyncio)
+
+Mantém um único calendário em memória, compartilhado por todos os clientes, e
+responde consultas concorrentes:
+
+    GET  /health                              estado do serviço e do calendário
+    GET  /analysis?date=YYYY-MM-DD            análise de um dia
+    GET  /range?start=YYYY-MM-DD&end=...      análise por data do intervalo
+    POST /calendar?format=csv|jsonl|json      envia notícias (replace=1 substitui tudo)
+    POST /rules                               recarrega as regras de impacto (do arquivo
+                                              em uso ou do JSON enviado no corpo)
+
+Consultas de um dia saem do cache ou são calculadas na hora (custo de um
+dia); análises de intervalo são divididas em blocos e executadas num pool de
+processos, e a leitura de uploads e a serialização de respostas grandes rodam
+em threads, para o loop de eventos continuar respondendo aos demais clientes.
+
+    python analysis_server.py --port 8765 --workers 4 --calendar calendario.csv
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from calendar_importer import ImportStats, import_calendar, is_iso_date, iter_calendar_text
+from impact_rules import RuleSet, current_rules, load_rules, set_rules
+from news_analyzer import NewsAnalyzer, analyze_chunk
+
+logger = logging.getLogger(__name__)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 413: "Payload Too Large", 500: "Internal Server Error",
+           501: "Not Implemented"}
+
+# Respostas maiores que isso são serializadas fora do loop de eventos
+INLINE_JSON_LIMIT = 200
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _parse_date(params, name, required=True):
+    values = params.get(name)
+    if not values:
+        if required:
+            raise HTTPError(400, f"parâmetro obrigatório ausente: {name}")
+        return None
+    value = values[0]
+    if not is_iso_date(value):
+        raise HTTPError(400, f"data inválida em {name}: {value!r} (use YYYY-MM-DD)")
+    return value
+
+
+class AnalysisServer:
+    """Servidor HTTP/JSON em volta de um NewsAnalyzer compartilhado
+
+    Toda alteração do analisador acontece na thread do loop de eventos, então
+    não há travas: o trabalho pesado recebe cópias (blocos de notícias, texto
+    de upload) ou só lê o analisador (prepare_news_data), e só o resultado
+    volta para o loop.
+    """
+
+    def __init__(self, analyzer=None, workers=None, chunks_per_worker=4,
+                 max_body=256 * 2**20, header_timeout=30.0):
+        self.analyzer = analyzer if analyzer is not None else NewsAnalyzer()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self.max_body = max_body
+        self.header_timeout = header_timeout
+        self._process_pool = None
+        self._thread_pool = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        # Processos criados por fork herdariam os sockets dos clientes abertos no
+        # momento (e a conexão não fecharia até o processo sair): usa forkserver
+        # quando existe e sobe todos os processos antes de aceitar conexões
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+        self._process_pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._process_pool, analyze_chunk, (None, []))
+                               for _ in range(self.workers)))
+        self._thread_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="analysis-io")
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def serve_forever(self, host="127.0.0.1", port=8765):
+        server = await self.start(host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        logger.info("servindo em %s com %d processos", addresses, self.workers)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False)
+
+    # Conexões e protocolo
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.header_timeout)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.TimeoutError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 400, {"error": "cabeçalho grande demais"}, keep_alive=False)
+                    break
+
+                keep_alive = False
+                body = None
+                try:
+                    method, target, headers, keep_alive = self._parse_head(head)
+                    body = await self._read_body(reader, headers)
+                    status, payload = await self._dispatch(method, target, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": exc.message}
+                    # Corpo não consumido deixaria a conexão dessincronizada
+                    keep_alive = keep_alive and body is not None
+                except Exception:
+                    logger.exception("falha ao processar a requisição")
+                    status, payload = 500, {"error": "erro interno"}
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _parse_head(self, head):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(400, "linha de requisição inválida") from None
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+        return method.upper(), target, headers, keep_alive
+
+    async def _read_body(self, reader, headers):
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(501, "transfer-encoding chunked não suportado; envie Content-Length")
+        length = headers.get("content-length")
+        if length is None:
+            return b""
+        try:
+            length = int(length)
+        except ValueError:
+            raise HTTPError(400, "Content-Length inválido") from None
+        if length > self.max_body:
+            raise HTTPError(413, f"corpo maior que o limite de {self.max_body} bytes")
+        try:
+            return await asyncio.wait_for(reader.readexactly(length), self.header_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "tempo esgotado lendo o corpo da requisição") from None
+
+    async def _send(self, writer, status, payload, keep_alive):
+        if isinstance(payload, bytes):
+            body = payload
+        elif isinstance(payload, dict) and len(payload) > INLINE_JSON_LIMIT:
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(self._thread_pool, _encode_json, payload)
+        else:
+            body = _encode_json(payload)
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        try:
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        routes = {
+            "/health": ("GET", self.handle_health),
+            "/analysis": ("GET", self.handle_analysis),
+            "/range": ("GET", self.handle_range),
+            "/calendar": ("POST", self.handle_calendar),
+            "/rules": ("POST", self.handle_rules)
+        }
+        if url.path not in routes:
+            raise HTTPError(404, f"rota desconhecida: {url.path}")
+        allowed, handler = routes[url.path]
+        if method != allowed:
+            raise HTTPError(405, f"use {allowed} em {url.path}")
+        return 200, await handler(params, body)
+
+    # Rotas
+
+    async def handle_health(self, params, body):
+        rules = self.analyzer.rules
+        return {"status": "ok", "events": len(self.analyzer.news_data),
+                "dates": len(self.analyzer.dates), "workers": self.workers,
+                "rules": {"source": rules.source, "version": rules.version, "news": len(rules.database)}}
+
+    async def handle_analysis(self, params, body):
+        # Um dia custa o proporcional às notícias dele: roda direto no loop
+        return self.analyzer.analyze_confluence(_parse_date(params, "date"))
+
+    async def handle_range(self, params, body):
+        start = _parse_date(params, "start")
+        end = _parse_date(params, "end")
+        if start > end:
+            raise HTTPError(400, "start deve ser anterior ou igual a end")
+
+        analyzer = self.analyzer
+        cached, payloads, revision = analyzer.plan_range(start, end,
+                                                         chunks=self.workers * self.chunks_per_worker)
+        results = dict(cached)
+        if payloads:
+            loop = asyncio.get_running_loop()
+            chunks = await asyncio.gather(*(loop.run_in_executor(self._process_pool, analyze_chunk, payload)
+                                            for payload in payloads))
+            for chunk in chunks:
+                analyzer.store_results(chunk, revision)
+                results.update(chunk)
+        return dict(sorted(results.items()))
+
+    async def handle_calendar(self, params, body):
+        calendar_format = params.get("format", ["jsonl"])[0]
+        replace = params.get("replace", ["0"])[0].lower() in ("1", "true", "yes")
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPError(400, "o corpo deve estar em UTF-8") from None
+
+        # Leitura e validação fora do loop; só a aplicação no calendário roda nele
+        loop = asyncio.get_running_loop()
+        try:
+            events, stats = await loop.run_in_executor(self._thread_pool, _parse_upload, text, calendar_format)
+        except ValueError as exc:
+            raise HTTPError(400, str(exc)) from None
+        if replace:
+            # Índice por data e comparação com o calendário atual também fora
+            # do loop; nele fica só a troca
+            prepared = await loop.run_in_executor(self._thread_pool, self.analyzer.prepare_news_data, events)
+            self.analyzer.swap_news_data(prepared)
+        else:
+            self.analyzer.extend_news(events)
+        return {
+            "accepted": stats.rows_accepted,
+            "rejected": stats.rows_rejected,
+            "rejected_rows": [{"line": line, "reason": reason} for line, reason in stats.rejected],
+            "events": len(self.analyzer.news_data),
+            "dates": len(self.analyzer.dates)
+        }
+
+    async def handle_rules(self, params, body):
+        # Leitura e compilação fora do loop; análises em andamento terminam
+        # com as regras antigas e as próximas já usam as novas
+        loop = asyncio.get_running_loop()
+        try:
+            rules = await loop.run_in_executor(self._thread_pool, _load_rules_upload, body)
+        except (OSError, ValueError) as exc:
+            raise HTTPError(400, str(exc)) from None
+        set_rules(rules)
+        return {"source": rules.source, "version": rules.version, "news": len(rules.database)}
+
+
+def _encode_json(payload):
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _parse_upload(text, calendar_format):
+    stats = ImportStats()
+    events = list(iter_calendar_text(text, calendar_format, stats))
+    return events, stats
+
+
+def _load_rules_upload(body):
+    if not body.strip():
+        return load_rules(current_rules().source)
+    return RuleSet(json.loads(body.decode("utf-8")))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON local de análise de notícias.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=0, help="processos para análises de intervalo (0 = um por CPU)")
+    parser.add_argument("--calendar", help="calendário carregado na inicialização (.csv, .jsonl ou .json)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="dias mantidos no cache de análises")
+    parser.add_argument("--max-body", type=int, default=256 * 2**20, help="tamanho máximo de upload em bytes")
+    parser.add_argument("--rules", help="arquivo de regras de impacto (padrão: impact_rules.json)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        set_rules(load_rules(args.rules))
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    analyzer = NewsAnalyzer(cache_size=args.cache_size)
+    if args.calendar:
+        try:
+            stats = import_calendar(args.calendar, analyzer)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        logger.info("%s", stats.summary())
+
+    server = AnalysisServer(analyzer, workers=args.workers or None, max_body=args.max_body)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""Backtest vetorizado da reação do preço às notícias
+
+Confere se os níveis de impacto das regras (impact_rules.json) e os pares que
+determine_trading_strategy recomenda ou manda evitar correspondem à
+volatilidade realizada. Os preços ficam em arquivos .npy por instrumento
+(barras OHLC em UTC, abertos por memory-map) e cada notícia é alinhada às
+barras por busca binária; range, retorno e volatilidade depois da notícia são
+calculados com NumPy para todas as notícias de uma vez.
+
+    python backtest.py convert EURUSD_M1.csv --instrument EURUSD --data-dir precos
+    python backtest.py run calendario.csv --data-dir precos --window 60 -o backtest.json
+
+Os arrays de preços e os cálculos por notícia usam NumPy.
+"""
+import csv
+import os
+import sys
+
+import numpy as np
+
+from kill_zones import event_timestamp, resolve_timezone
+
+# Barra OHLC: início da barra em segundos UTC e preços
+BAR_DTYPE = np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"),
+                      ("low", "<f8"), ("close", "<f8")])
+
+IMPACT_LEVELS = ("VERY_HIGH", "HIGH", "MEDIUM", "LOW")
+ROLES = ("recommended", "avoid", "other")
+
+# Colunas aceitas na conversão de CSV (arquivos de tick usam "price"/"bid")
+TIME_COLUMNS = ("time", "timestamp", "datetime", "date_time")
+DATE_COLUMNS = ("date", "day")
+PRICE_COLUMNS = ("price", "bid", "last", "close")
+
+
+def _parse_times(values):
+    """Converte textos de horário (ISO ou epoch em s/ms) em segundos UTC"""
+    try:
+        numbers = np.asarray(values, dtype=np.float64)
+    except ValueError:
+        return np.asarray(values, dtype="datetime64[s]").astype(np.int64)
+    # Epochs em milissegundos passam de 1e11
+    return np.where(numbers > 1e11, numbers / 1000, numbers).astype(np.int64)
+
+
+def convert_csv(csv_path, npy_path, chunk_rows=1_000_000):
+    """Converte um CSV de barras OHLC ou de ticks no .npy usado pelo backtest
+
+    O cabeçalho precisa de uma coluna de horário (time/timestamp/datetime, ou
+    date + time) e de open/high/low/close, ou de um único preço (price/bid/
+    last) para ticks. Horários sem fuso são lidos como UTC. Retorna o número
+    de barras gravadas.
+    """
+    chunks = []
+    with open(csv_path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = [column.strip().lower() for column in next(reader, [])]
+        position = {column: index for index, column in enumerate(header)}
+
+        time_column = next((position[name] for name in TIME_COLUMNS if name in position), None)
+        date_column = next((position[name] for name in DATE_COLUMNS if name in position), None)
+        if time_column is None and date_column is None:
+            raise ValueError(f"{csv_path}: coluna de horário ausente (time, timestamp ou date)")
+        if all(name in position for name in ("open", "high", "low", "close")):
+            price_columns = [position[name] for name in ("open", "high", "low", "close")]
+        else:
+            price = next((position[name] for name in PRICE_COLUMNS if name in position), None)
+            if price is None:
+                raise ValueError(f"{csv_path}: colunas open/high/low/close (ou price) ausentes")
+            price_columns = [price] * 4
+
+        while True:
+            rows = [row for _, row in zip(range(chunk_rows), reader) if row]
+            if not rows:
+                break
+            if date_column is not None and time_column is not None:
+                times = [f"{row[date_column].strip()}T{row[time_column].strip()}" for row in rows]
+            else:
+                column = time_column if time_column is not None else date_column
+                times = [row[column].strip() for row in rows]
+            chunk = np.empty(len(rows), dtype=BAR_DTYPE)
+            chunk["time"] = _parse_times(times)
+            for field, column in zip(("open", "high", "low", "close"), price_columns):
+                chunk[field] = np.asarray([row[column] for row in rows], dtype=np.float64)
+            chunks.append(chunk)
+
+    bars = np.concatenate(chunks) if chunks else np.empty(0, dtype=BAR_DTYPE)
+    bars = bars[np.argsort(bars["time"], kind="stable")]
+    np.save(npy_path, bars)
+    return len(bars)
+
+
+class PriceHistory:
+    """Diretório de barras por instrumento (INSTRUMENTO.npy), abertas por mmap"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._bars = {}
+
+    def path(self, instrument):
+        return os.path.join(self.directory, f"{instrument}.npy")
+
+    def instruments(self):
+        return sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith(".npy"))
+
+    def bars(self, instrument):
+        """Barras do instrumento (memmap somente leitura) ou None se não houver arquivo"""
+        if instrument not in self._bars:
+            path = self.path(instrument)
+            bars = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+            if bars is not None and bars.dtype != BAR_DTYPE:
+                raise ValueError(f"{path}: formato de barras inesperado {bars.dtype}")
+            self._bars[instrument] = bars
+        return self._bars[instrument]
+
+
+def _window_reduce(ufunc, values, start, end):
+    """ufunc.reduce de values[start:end] para cada janela (janelas vazias: lixo, mascarar)"""
+    # Sentinela no fim para que end == len(values) seja um índice válido
+    extended = np.append(values, values[-1])
+    indices = np.empty(2 * len(start), dtype=np.intp)
+    indices[0::2] = start
+    indices[1::2] = end
+    return ufunc.reduceat(extended, indices)[0::2]
+
+
+def reaction_metrics(bars, epochs, window_minutes=60):
+    """Reação do preço a cada horário em epochs (segundos UTC)
+
+    Para cada horário compara o fechamento da última barra anterior com as
+    barras dos `window_minutes` seguintes. Retorna um dicionário de arrays
+    alinhados a epochs: valid, return (retorno no fim da janela), range
+    (máxima - mínima sobre o preço de referência), volatility (desvio padrão
+    dos retornos log por barra) e pre_range (range na janela de mesmo
+    tamanho antes da notícia, NaN se não houver barras nela).
+    """
+    epochs = np.asarray(epochs, dtype=np.int64)
+    count = len(epochs)
+    result = {name: np.full(count, np.nan) for name in ("return", "range", "volatility", "pre_range")}
+    result["valid"] = np.zeros(count, dtype=bool)
+    if count == 0 or bars is None or len(bars) == 0:
+        return result
+
+    span = window_minutes * 60
+    # Só o trecho do arquivo que cobre as notícias sai do disco
+    times = bars["time"]
+    lo = max(int(np.searchsorted(times, epochs.min() - span, "left")) - 1, 0)
+    hi = int(np.searchsorted(times, epochs.max() + span, "right"))
+    if hi <= lo:
+        return result
+    times = np.asarray(times[lo:hi])
+    high = np.asarray(bars["high"][lo:hi])
+    low = np.asarray(bars["low"][lo:hi])
+    close = np.asarray(bars["close"][lo:hi])
+
+    # Janelas em ordem de início: reduceat percorre cada trecho uma vez
+    order = np.argsort(epochs, kind="stable")
+    sorted_epochs = epochs[order]
+    start = np.searchsorted(times, sorted_epochs, "left")
+    end = np.searchsorted(times, sorted_epochs + span, "left")
+    pre_start = np.searchsorted(times, sorted_epochs - span, "left")
+    valid = (start > 0) & (end > start)
+    has_pre = valid & (start > pre_start)
+
+    reference = close[np.maximum(start - 1, 0)]
+    last = close[np.maximum(end - 1, 0)]
+    post_range = (_window_reduce(np.maximum, high, start, end)
+                  - _window_reduce(np.minimum, low, start, end)) / reference
+    pre_range = (_window_reduce(np.maximum, high, pre_start, start)
+                 - _window_reduce(np.minimum, low, pre_start, start)) / reference
+
+    # Variância por janela a partir de somas acumuladas dos retornos log
+    log_close = np.log(close)
+    log_returns = np.diff(log_close, prepend=log_close[0])
+    sums = np.concatenate(([0.0], np.cumsum(log_returns)))
+    squares = np.concatenate(([0.0], np.cumsum(log_returns * log_returns)))
+    bars_in_window = np.maximum(end - start, 1)
+    mean = (sums[end] - sums[start]) / bars_in_window
+    variance = (squares[end] - squares[start]) / bars_in_window - mean * mean
+
+    unsorted = np.empty_like(order)
+    unsorted[order] = np.arange(count)
+    result["valid"] = valid[unsorted]
+    result["return"] = np.where(valid, last / reference - 1, np.nan)[unsorted]
+    result["range"] = np.where(valid, post_range, np.nan)[unsorted]
+    result["volatility"] = np.where(valid, np.sqrt(np.maximum(variance, 0)), np.nan)[unsorted]
+    result["pre_range"] = np.where(has_pre, pre_range, np.nan)[unsorted]
+    return result
+
+
+def _group_stats(codes, labels, metrics):
+    """Estatísticas por grupo (códigos inteiros) das amostras válidas"""
+    valid = metrics["valid"]
+    codes = codes[valid]
+    groups = len(labels)
+    counts = np.bincount(codes, minlength=groups)
+    ranges = metrics["range"][valid]
+
+    def total(values):
+        return np.bincount(codes, weights=values, minlength=groups)
+
+    # Mediana do range: ordena por (grupo, range) e pega o meio de cada grupo
+    order = np.lexsort((ranges, codes))
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    sorted_ranges = ranges[order]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_abs_return = total(np.abs(metrics["return"][valid])) / counts
+        mean_range = total(ranges) / counts
+        mean_volatility = total(metrics["volatility"][valid]) / counts
+        # Range depois / antes das mesmas notícias (razão das somas, não média
+        # das razões, que superestima)
+        pre_range = metrics["pre_range"][valid]
+        has_pre = np.isfinite(pre_range)
+        range_ratio = total(np.where(has_pre, ranges, 0)) / total(np.where(has_pre, pre_range, 0))
+    stats = {}
+    for code, label in enumerate(labels):
+        if not counts[code]:
+            continue
+        first, last = offsets[code], offsets[code + 1]
+        middle = sorted_ranges[first:last]
+        stats[label] = {
+            "samples": int(counts[code]),
+            "mean_abs_return": float(mean_abs_return[code]),
+            "mean_range": float(mean_range[code]),
+            "median_range": float(np.median(middle)),
+            "mean_volatility": float(mean_volatility[code]),
+            "range_vs_pre": float(range_ratio[code]) if np.isfinite(range_ratio[code]) else None
+        }
+    return stats
+
+
+def _affected_instruments(analyzer, impact_info):
+    """Instrumentos que a notícia afeta: os do banco ou os expostos às suas moedas"""
+    explicit = [symbol for field in ('pairs_affected', 'instruments', 'indices')
+                for symbol in impact_info.get(field, ())]
+    if explicit:
+        return list(dict.fromkeys(explicit))
+    exposure = analyzer.exposure
+    return exposure.names(exposure.mask(exposure.exposure, impact_info.get('currencies', ())))
+
+
+def collect_samples(analyzer, start, end, event_timezone="EST", workers=1):
+    """Pares (instrumento, notícia) a medir, agrupados por instrumento
+
+    Cada notícia com impacto classificado e horário válido gera uma amostra
+    por instrumento afetado e por par recomendado/evitado no dia. Retorna
+    {instrumento: (epochs, códigos de impacto, códigos de papel, afetado?)}
+    e o total de notícias usadas.
+    """
+    analyzer.load_range(start, end)
+    tz = resolve_timezone(event_timezone)
+    strategies = {date: analysis.get("strategy") for date, analysis in analyzer.analyze_range(start, end, workers)}
+    impact_codes = {level: code for code, level in enumerate(IMPACT_LEVELS)}
+    recommended_code, avoid_code, other_code = range(len(ROLES))
+
+    # Títulos se repetem: impacto e instrumentos calculados uma vez por título
+    headlines = {}
+    samples = {}
+    events_used = 0
+    for date in analyzer.dates_between(start, end):
+        strategy = strategies.get(date) or {}
+        day_roles = dict.fromkeys(strategy.get("avoid_pairs", ()), avoid_code)
+        day_roles.update(dict.fromkeys(strategy.get("recommended_pairs", ()), recommended_code))
+        # Horários se repetem no dia: um timestamp por horário distinto
+        epochs = {}
+        for news in analyzer.events_on(date):
+            headline = headlines.get(news.name)
+            if headline is None:
+                impact_info = analyzer.get_news_impact(news.name)
+                if impact_info and impact_info['impact'] in impact_codes:
+                    headline = (impact_codes[impact_info['impact']],
+                                frozenset(_affected_instruments(analyzer, impact_info)))
+                else:
+                    headline = ()
+                headlines[news.name] = headline
+            if not headline:
+                continue
+            epoch = epochs.get(news.time)
+            if epoch is None:
+                timestamp = event_timestamp(news, tz)
+                epoch = epochs[news.time] = int(timestamp.timestamp()) if timestamp is not None else False
+            if epoch is False:
+                continue
+            impact_code, affected = headline
+            events_used += 1
+            for instrument in affected:
+                samples.setdefault(instrument, []).append(
+                    (epoch, impact_code, day_roles.get(instrument, other_code), True))
+            for instrument, role in day_roles.items():
+                if instrument not in affected:
+                    samples.setdefault(instrument, []).append((epoch, impact_code, role, False))
+    return samples, events_used
+
+
+def run_backtest(analyzer, prices, start, end, window_minutes=60, event_timezone="EST", workers=1):
+    """Backtest das notícias de start a end sobre as barras de `prices` (PriceHistory)
+
+    Retorna estatísticas por nível de impacto (só instrumentos afetados pela
+    notícia), por impacto e instrumento, e por papel do par no dia
+    (recomendado, evitar, demais).
+    """
+    samples, events_used = collect_samples(analyzer, start, end, event_timezone, workers)
+    missing = []
+    epochs, impacts, roles, affected, instruments = [], [], [], [], []
+    instrument_names = []
+    metrics = {name: [] for name in ("valid", "return", "range", "volatility", "pre_range")}
+    for instrument, rows in sorted(samples.items()):
+        bars = prices.bars(instrument)
+        if bars is None:
+            missing.append(instrument)
+            continue
+        table = np.asarray(rows, dtype=np.int64)
+        # Várias notícias no mesmo horário: uma medição por horário distinto
+        unique_epochs, inverse = np.unique(table[:, 0], return_inverse=True)
+        measured = reaction_metrics(bars, unique_epochs, window_minutes)
+        for name in metrics:
+            metrics[name].append(measured[name][inverse])
+        epochs.append(table[:, 0])
+        impacts.append(table[:, 1])
+        roles.append(table[:, 2])
+        affected.append(table[:, 3].astype(bool))
+        instruments.append(np.full(len(table), len(instrument_names)))
+        instrument_names.append(instrument)
+
+    report = {
+        "start": start,
+        "end": end,
+        "window_minutes": window_minutes,
+        "events": events_used,
+        "missing_instruments": missing,
+        "samples": 0,
+        "by_impact": {},
+        "by_impact_instrument": {},
+        "by_role": {},
+        "by_role_instrument": {}
+    }
+    if not instrument_names:
+        return report
+
+    metrics = {name: np.concatenate(values) for name, values in metrics.items()}
+    impacts = np.concatenate(impacts)
+    roles = np.concatenate(roles)
+    affected = np.concatenate(affected)
+    instruments = np.concatenate(instruments)
+    report["samples"] = int(metrics["valid"].sum())
+
+    def subset(mask):
+        return {name: values[mask] for name, values in metrics.items()}
+
+    affected_metrics = subset(affected)
+    report["by_impact"] = _group_stats(impacts[affected], IMPACT_LEVELS, affected_metrics)
+    report["by_role"] = _group_stats(roles, ROLES, metrics)
+
+    # Combinações em um único código: grupo * instrumentos + instrumento
+    width = len(instrument_names)
+    labels = [(level, name) for level in IMPACT_LEVELS for name in instrument_names]
+    for (level, name), stats in _group_stats(impacts[affected] * width + instruments[affected],
+                                             labels, affected_metrics).items():
+        report["by_impact_instrument"].setdefault(level, {})[name] = stats
+    labels = [(role, name) for role in ROLES for name in instrument_names]
+    for (role, name), stats in _group_stats(roles * width + instruments, labels, metrics).items():
+        report["by_role_instrument"].setdefault(role, {})[name] = stats
+    return report
+
+
+def format_report(report):
+    """Tabela de texto com o resumo por impacto e por papel"""
+    lines = [f"{report['events']} notícias, {report['samples']} medições, "
+             f"janela de {report['window_minutes']} min"]
+    if report["missing_instruments"]:
+        lines.append("sem dados de preço: " + ", ".join(report["missing_instruments"]))
+    header = f"{'':<12} {'amostras':>9} {'|retorno|':>10} {'range':>9} {'mediana':>9} {'vol/barra':>10} {'depois/antes':>12}"
+    for title, table in (("Por impacto", report["by_impact"]), ("Por papel", report["by_role"])):
+        lines.append("")
+        lines.append(title)
+        lines.append(header)
+        for label, stats in table.items():
+            ratio = stats["range_vs_pre"]
+            lines.append(f"{label:<12} {stats['samples']:>9} {stats['mean_abs_return']:>10.4%} "
+                         f"{stats['mean_range']:>9.4%} {stats['median_range']:>9.4%} "
+                         f"{stats['mean_volatility']:>10.4%} {ratio if ratio is not None else float('nan'):>12.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    from calendar_importer import date_argument
+
+    parser = argparse.ArgumentParser(description="Backtest da reação do preço às notícias do calendário.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="converte um CSV de barras/ticks para .npy")
+    convert.add_argument("csv", help="CSV com horário e open/high/low/close (ou price)")
+    convert.add_argument("--instrument", required=True, help="nome do instrumento (ex.: EURUSD)")
+    convert.add_argument("--data-dir", required=True, help="diretório dos arquivos .npy")
+
+    run = commands.add_parser("run", help="executa o backtest")
+    run.add_argument("calendar", nargs="?", help="calendário (.csv, .jsonl ou .json)")
+    run.add_argument("--db", help="histórico SQLite (news_store) em vez de, ou além do, calendário")
+    run.add_argument("--data-dir", required=True, help="diretório dos arquivos .npy")
+    run.add_argument("--start", type=date_argument, help="primeira data (YYYY-MM-DD)")
+    run.add_argument("--end", type=date_argument, help="última data (YYYY-MM-DD)")
+    run.add_argument("--window", type=int, default=60, help="minutos depois da notícia (padrão 60)")
+    run.add_argument("--timezone", default="EST", help="fuso dos horários do calendário (padrão EST = Nova York)")
+    run.add_argument("--workers", type=int, default=1, help="processos para a análise dos dias (0 = um por CPU)")
+    run.add_argument("-o", "--output", help="arquivo JSON com o relatório completo")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        os.makedirs(args.data_dir, exist_ok=True)
+        try:
+            count = convert_csv(args.csv, os.path.join(args.data_dir, f"{args.instrument}.npy"))
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        print(f"{count} barras gravadas para {args.instrument}", file=sys.stderr)
+        return 0
+
+    from news_store import open_cli_analyzer
+
+    analyzer, store, start, end = open_cli_analyzer(parser, args.calendar, args.db, args.start, args.end)
+    report = run_backtest(analyzer, PriceHistory(args.data_dir), start, end, args.window,
+                          args.timezone, args.workers or None)
+    print(format_report(report), file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+            handle.write("\n")
+    if store is not None:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""Benchmarks dos caminhos críticos do NewsAnalyzer
+
+Gera calendários sintéticos reproduzíveis (mesma semente, mesmos eventos) e
+mede busca de impacto, análise de um dia, análise de intervalo, janelas móveis
+e importação. Com "--only startup" mede a abertura da interface: processo novo
+até a primeira pintura da janela (requer PyQt5; sem display, usa a plataforma
+offscreen).
+O resultado sai em JSON (vazão e pico de memória por benchmark) e pode ser
+comparado com uma baseline salva:
+
+    python benchmark.py --preset quick --save-baseline bench_baseline.json
+    python benchmark.py --preset quick --baseline bench_baseline.json
+
+Tamanhos avulsos usam o formato eventos:dias, por exemplo
+"--sizes 1000:1,1000000:3650,10000000:10950".
+"""
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from news_analyzer import NEWS_IMPACT_DATABASE, NewsAnalyzer, NewsEvent
+
+PRESETS = {
+    "quick": [(1_000, 1), (10_000, 30), (100_000, 3_650)],
+    "standard": [(1_000, 1), (100_000, 365), (1_000_000, 3_650)],
+    "full": [(1_000, 1), (100_000, 365), (1_000_000, 3_650), (10_000_000, 10_950)]
+}
+
+BENCHMARKS = ("impact_lookup", "single_day", "range", "rolling", "import")
+# Fora do conjunto padrão: abre a interface em processos novos
+GUI_BENCHMARKS = ("startup",)
+
+# Marcas escritas pelo trading_analyzer.py com TRADING_ANALYZER_STARTUP_REPORT=1
+STARTUP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trading_analyzer.py")
+STARTUP_STAGES = ("window", "first_paint", "ready")
+STARTUP_TIMEOUT = 60
+
+# Prefixos e manchetes sem correspondência no banco, para um mix realista
+COUNTRY_PREFIXES = ["US", "Japan", "Euro Area", "UK", "Canada", "Australia", "Germany", "China"]
+UNMATCHED_HEADLINES = ["Building Permits", "Consumer Confidence", "Trade Balance",
+                       "Industrial Production", "Housing Starts", "Current Account",
+                       "Jobless Claims", "Central Bank Speech"]
+TIMES = [f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in (0, 15, 30, 45)]
+
+
+def generate_calendar(events, days, seed=42, start=date(2000, 1, 1)):
+    """Gera `events` notícias sintéticas distribuídas em ordem por `days` dias"""
+    rng = random.Random(seed)
+    headlines = [f"{prefix} {key}" for prefix in COUNTRY_PREFIXES for key in NEWS_IMPACT_DATABASE]
+    headlines += [f"{prefix} {name}" for prefix in COUNTRY_PREFIXES for name in UNMATCHED_HEADLINES]
+    dates = [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+    values = [f"{value / 10:.1f}%" for value in range(-50, 51)] + [f"{value}K" for value in range(0, 400, 5)]
+    for index in range(events):
+        yield NewsEvent(rng.choice(headlines), rng.choice(values), rng.choice(values),
+                        rng.choice(TIMES), dates[index * days // events])
+
+
+def _timed(function, repeat):
+    """Melhor tempo de `repeat` execuções (GC desligado durante a medição)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            result = function()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return best, result
+
+
+def _peak_memory(function):
+    """Pico de memória alocada (bytes) durante uma execução extra"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _analyzer(calendar):
+    analyzer = NewsAnalyzer(cache_size=0)
+    analyzer.extend_news(calendar)
+    return analyzer
+
+
+def bench_impact_lookup(calendar, analyzer, options):
+    names = [news.name for news in calendar[:options.lookup_limit]]
+    lookup = analyzer.get_news_impact
+
+    def run():
+        for name in names:
+            lookup(name)
+        return len(names)
+    return run, "lookups/s"
+
+
+def bench_single_day(calendar, analyzer, options):
+    rng = random.Random(options.seed)
+    dates = analyzer.dates
+    sample = [rng.choice(dates) for _ in range(min(options.day_samples, len(dates) * 10))]
+
+    def run():
+        for day in sample:
+            analyzer.analyze_confluence(day)
+        return len(sample)
+    return run, "days/s"
+
+
+def bench_range(calendar, analyzer, options):
+    dates = analyzer.dates
+
+    def run():
+        count = 0
+        for _ in analyzer.analyze_range(dates[0], dates[-1], workers=options.workers):
+            count += 1
+        return count
+    return run, "days/s"
+
+
+def bench_rolling(calendar, analyzer, options):
+    dates = analyzer.dates
+
+    def run():
+        count = 0
+        for _ in analyzer.rolling_confluence(dates[0], dates[-1], days=options.window_days):
+            count += 1
+        return count
+    return run, "windows/s"
+
+
+def bench_import(calendar, analyzer, options):
+    handle, path = tempfile.mkstemp(suffix=".csv", prefix="bench_calendar_")
+    with os.fdopen(handle, "w", newline="", encoding="utf-8") as output:
+        writer = csv.writer(output)
+        writer.writerow(["date", "time", "name", "previous", "consensus"])
+        for news in calendar:
+            writer.writerow([news.date, news.time, news.name, news.previous, news.consensus])
+    options.cleanup.append(path)
+
+    from calendar_importer import import_calendar
+
+    def run():
+        return import_calendar(path, NewsAnalyzer(cache_size=0)).rows_accepted
+    return run, "rows/s"
+
+
+BENCHMARK_FUNCTIONS = {
+    "impact_lookup": bench_impact_lookup,
+    "single_day": bench_single_day,
+    "range": bench_range,
+    "rolling": bench_rolling,
+    "import": bench_import
+}
+
+
+def run_benchmarks(sizes, names, options):
+    """Executa os benchmarks em cada tamanho; retorna a lista de resultados"""
+    results = []
+    for events, days in sizes:
+        calendar = list(generate_calendar(events, days, options.seed))
+        analyzer = _analyzer(calendar)
+        for name in names:
+            options.cleanup = []
+            try:
+                run, unit = BENCHMARK_FUNCTIONS[name](calendar, analyzer, options)
+                seconds, operations = _timed(run, options.repeat)
+                peak = None if options.no_memory else _peak_memory(run)
+            finally:
+                for path in options.cleanup:
+                    os.remove(path)
+            result = {
+                "benchmark": name,
+                "events": events,
+                "days": days,
+                "operations": operations,
+                "seconds": round(seconds, 6),
+                "throughput": round(operations / seconds, 2) if seconds > 0 else None,
+                "unit": unit,
+                "peak_memory_bytes": peak
+            }
+            results.append(result)
+            print(_format_result(result), file=sys.stderr)
+        del analyzer, calendar
+    return results
+
+
+def _startup_once(env):
+    """Abre a interface uma vez; retorna as marcas (segundos) vistas pelo processo pai e pelo filho"""
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, STARTUP_SCRIPT], env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True)
+    # Sem display a janela pode não abrir nunca
+    watchdog = threading.Timer(STARTUP_TIMEOUT, process.kill)
+    watchdog.start()
+    marks = {}
+    try:
+        for line in process.stdout:
+            stage, _, seconds = line.strip().partition(" ")
+            if stage in STARTUP_STAGES:
+                marks["process_" + stage] = time.perf_counter() - started
+                marks[stage] = float(seconds)
+        _, errors = process.communicate()
+    finally:
+        watchdog.cancel()
+    if "ready" not in marks:
+        detail = errors.strip().splitlines()[-1:] or [f"código {process.returncode}"]
+        raise RuntimeError(f"a interface não abriu: {detail[0]}")
+    return marks
+
+
+def run_startup_benchmark(options):
+    """Abertura da interface em `repeat` processos novos; vale a melhor primeira pintura
+    
+    seconds é o tempo do lançamento do processo até a primeira pintura da
+    janela (interpretador, imports e construção); stages traz as marcas de
+    dentro do processo (desde antes do import do PyQt5) e o tempo até a
+    aplicação ficar pronta, com o histórico aberto.
+    """
+    env = dict(os.environ, TRADING_ANALYZER_STARTUP_REPORT="1")
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    directory = tempfile.mkdtemp(prefix="bench_startup_")
+    # Histórico próprio: a primeira execução cria o banco, as outras o reabrem
+    env["TRADING_ANALYZER_DB"] = os.path.join(directory, "historico.sqlite3")
+    try:
+        runs = [_startup_once(env) for _ in range(options.repeat)]
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    seconds = min(run["process_first_paint"] for run in runs)
+    result = {
+        "benchmark": "startup",
+        "events": 0,
+        "days": 0,
+        "operations": 1,
+        "seconds": round(seconds, 6),
+        "throughput": round(1 / seconds, 2) if seconds > 0 else None,
+        "unit": "starts/s",
+        "peak_memory_bytes": None,
+        "stages": {key: round(min(run[key] for run in runs), 6) for key in sorted(runs[0])}
+    }
+    print(_format_result(result), file=sys.stderr)
+    return [result]
+
+
+def _format_result(result, baseline=None):
+    memory = result["peak_memory_bytes"]
+    memory_text = f"{memory / 2**20:9.1f} MiB" if memory is not None else "        -    "
+    text = (f"{result['benchmark']:<14} {result['events']:>10} ev {result['days']:>6} d "
+            f"{result['throughput'] or 0:>14,.0f} {result['unit']:<10} {memory_text}")
+    if baseline is not None:
+        text += f"  {baseline:+.1%}"
+    return text
+
+
+def _result_key(result):
+    return result["benchmark"], result["events"], result["days"]
+
+
+def compare_with_baseline(results, baseline_results, tolerance):
+    """Compara vazões com a baseline; retorna a lista de regressões"""
+    baseline = {_result_key(result): result for result in baseline_results}
+    regressions = []
+    for result in results:
+        previous = baseline.get(_result_key(result))
+        if not previous or not previous.get("throughput") or not result["throughput"]:
+            continue
+        change = result["throughput"] / previous["throughput"] - 1
+        result["baseline_change"] = round(change, 4)
+        print(_format_result(result, change), file=sys.stderr)
+        if change < -tolerance:
+            regressions.append(result)
+    return regressions
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(","):
+        events, _, days = item.partition(":")
+        sizes.append((int(events), int(days or 1)))
+    return sizes
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks do NewsAnalyzer com calendários sintéticos.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--sizes", type=parse_sizes, help="tamanhos eventos:dias separados por vírgula")
+    parser.add_argument("--only", help="benchmarks a executar, separados por vírgula: "
+                        + ", ".join(BENCHMARKS + GUI_BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3, help="repetições por benchmark (vale a melhor)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="processos no benchmark de intervalo")
+    parser.add_argument("--lookup-limit", type=int, default=200_000, help="máximo de buscas de impacto")
+    parser.add_argument("--day-samples", type=int, default=1_000, help="dias sorteados na análise de um dia")
+    parser.add_argument("--window-days", type=int, default=7, help="dias da janela no benchmark rolling")
+    parser.add_argument("--no-memory", action="store_true", help="não medir pico de memória")
+    parser.add_argument("-o", "--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--baseline", help="baseline JSON para comparação")
+    parser.add_argument("--save-baseline", help="salva os resultados como baseline neste arquivo")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="queda de vazão tolerada antes de acusar regressão (padrão 0.10)")
+    options = parser.parse_args(argv)
+
+    names = options.only.split(",") if options.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS + GUI_BENCHMARKS)
+    if unknown:
+        parser.error(f"benchmark desconhecido: {', '.join(sorted(unknown))}")
+
+    calendar_names = [name for name in names if name in BENCHMARKS]
+    results = []
+    if calendar_names:
+        results = run_benchmarks(options.sizes or PRESETS[options.preset], calendar_names, options)
+    if "startup" in names:
+        try:
+            results += run_startup_benchmark(options)
+        except RuntimeError as exc:
+            parser.error(str(exc))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": options.seed,
+        "results": results
+    }
+
+    status = 0
+    if options.baseline:
+        with open(options.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare_with_baseline(results, baseline["results"], options.tolerance)
+        report["regressions"] = [_result_key(result) for result in regressions]
+        if regressions:
+            print(f"{len(regressions)} regressão(ões) acima de {options.tolerance:.0%}", file=sys.stderr)
+            status = 1
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if options.save_baseline:
+        with open(options.save_baseline, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Importação em streaming de calendários econômicos (CSV e JSON Lines)
+
+O arquivo é lido por mmap, linha a linha, e as notícias são geradas sob
+demanda; a carga no NewsAnalyzer é feita em lotes, então a memória usada pela
+importação não cresce com o tamanho do arquivo.
+
+    from calendar_importer import import_calendar
+    stats = import_calendar("calendario.csv", analyzer)
+    print(stats.summary())
+"""
+import csv
+import io
+import json
+import mmap
+import os
+import time
+from datetime import date as Date
+
+# Nomes de coluna/campo aceitos para cada campo da notícia
+FIELD_ALIASES = {
+    "name": "name", "event": "name", "news": "name", "notícia": "name", "noticia": "name",
+    "previous": "previous", "prev": "previous", "anterior": "previous",
+    "consensus": "consensus", "forecast": "consensus", "consenso": "consensus",
+    "time": "time", "horário": "time", "horario": "time", "hora": "time",
+    "date": "date", "data": "date"
+}
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}
+
+
+class ImportStats:
+    """Contadores de uma importação: linhas lidas, aceitas, rejeitadas e taxa"""
+
+    # Só as primeiras rejeições são guardadas, para manter a memória constante
+    MAX_REJECTED_SAMPLES = 100
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_accepted = 0
+        self.rows_rejected = 0
+        self.rejected = []
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def reject(self, line_number, reason):
+        self.rows_rejected += 1
+        if len(self.rejected) < self.MAX_REJECTED_SAMPLES:
+            self.rejected.append((line_number, reason))
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows_read / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Resumo de uma linha para log/terminal"""
+        text = (f"{self.rows_accepted} notícias importadas de {self.rows_read} linhas "
+                f"em {self.elapsed:.2f}s ({self.rows_per_second:,.0f} linhas/s)")
+        if self.rows_rejected:
+            text += f", {self.rows_rejected} rejeitadas"
+            for line_number, reason in self.rejected[:5]:
+                text += f"\n  linha {line_number}: {reason}"
+        return text
+
+
+def detect_format(path):
+    """Formato do calendário pela extensão do arquivo"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"formato de calendário não suportado: {path} (use .csv, .jsonl ou .json)")
+    return FORMATS[extension]
+
+
+def decode_lines(raw_lines, stats=None):
+    """Decodifica linhas em bytes como UTF-8, uma a uma
+
+    Uma linha que não é UTF-8 válido é rejeitada em stats e vira uma linha
+    vazia, para não interromper a importação nem deslocar a numeração.
+    """
+    for line_number, raw in enumerate(raw_lines, 1):
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            if stats is not None:
+                stats.rows_read += 1
+                stats.reject(line_number, f"bytes inválidos para UTF-8 (posição {exc.start})")
+            line = "\n"
+        if line_number == 1:
+            line = line.lstrip("\ufeff")
+        yield line
+
+
+def mapped_lines(path, stats=None):
+    """Gera as linhas do arquivo (texto) via mmap, sem carregá-lo inteiro (ver decode_lines)"""
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from decode_lines(iter(mapped.readline, b""), stats)
+
+
+def is_iso_date(text):
+    """Se text é uma data YYYY-MM-DD válida (o formato das datas do calendário)"""
+    if not isinstance(text, str) or len(text) != 10 or text[4] != "-" or text[7] != "-":
+        return False
+    try:
+        Date.fromisoformat(text)
+    except ValueError:
+        return False
+    return True
+
+
+def date_argument(text):
+    """Tipo de argparse para datas YYYY-MM-DD (--date, --start, --end)"""
+    if not is_iso_date(text):
+        import argparse
+        raise argparse.ArgumentTypeError(f"data inválida: {text!r} (use YYYY-MM-DD)")
+    return text
+
+
+def normalize_event(record):
+    """Valida um registro já com campos canônicos; retorna (notícia, motivo da rejeição)"""
+    name = (record.get("name") or "").strip()
+    if not name:
+        return None, "notícia sem nome"
+    date = (record.get("date") or "").strip()
+    if not is_iso_date(date):
+        return None, f"data inválida: {date!r} (use YYYY-MM-DD)"
+    return {
+        "name": name,
+        "previous": str(record.get("previous") or "").strip(),
+        "consensus": str(record.get("consensus") or "").strip(),
+        "time": str(record.get("time") or "").strip(),
+        "date": date
+    }, None
+
+
+def _canonical_fields(record):
+    fields = {}
+    for key, value in record.items():
+        field = FIELD_ALIASES.get(str(key).strip().lower())
+        if field is not None and field not in fields:
+            fields[field] = value if value is None or isinstance(value, str) else str(value)
+    return fields
+
+
+def _iter_csv(lines, stats, source):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [FIELD_ALIASES.get(column.strip().lower()) for column in header]
+    missing = {"name", "date"} - set(columns)
+    if missing:
+        raise ValueError(f"{source}: colunas obrigatórias ausentes no cabeçalho: {', '.join(sorted(missing))}")
+
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        stats.rows_read += 1
+        record = {}
+        for field, value in zip(columns, row):
+            if field is not None and field not in record:
+                record[field] = value
+        yield reader.line_num, record
+
+
+def _iter_jsonl(lines, stats, source):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        stats.rows_read += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            stats.reject(line_number, f"JSON inválido ({exc})")
+            continue
+        if not isinstance(record, dict):
+            stats.reject(line_number, "a linha não é um objeto JSON")
+            continue
+        yield line_number, _canonical_fields(record)
+
+
+def _iter_json(lines, stats, source):
+    # Lista JSON única: não há como ler em streaming, o conteúdo é carregado inteiro
+    records = json.loads("".join(lines))
+    if not isinstance(records, list):
+        raise ValueError(f"{source}: o arquivo JSON deve conter uma lista de notícias")
+    for index, record in enumerate(records, 1):
+        stats.rows_read += 1
+        if not isinstance(record, dict):
+            stats.reject(index, "o item não é um objeto JSON")
+            continue
+        yield index, _canonical_fields(record)
+
+
+_READERS = {"csv": _iter_csv, "jsonl": _iter_jsonl, "json": _iter_json}
+
+
+def iter_calendar(path, stats=None, format=None):
+    """Gera as notícias válidas do calendário, uma a uma
+
+    Linhas inválidas não interrompem a leitura: são contadas e registradas em
+    stats (ImportStats) com o número da linha e o motivo.
+    """
+    if stats is None:
+        stats = ImportStats()
+    return iter_calendar_lines(mapped_lines(path, stats), format or detect_format(path), stats, source=path)
+
+
+def iter_calendar_text(text, format, stats=None):
+    """Como iter_calendar, para um calendário já em memória (ex.: upload)"""
+    if format not in _READERS:
+        raise ValueError(f"formato de calendário não suportado: {format} (use csv, jsonl ou json)")
+    return iter_calendar_lines(io.StringIO(text.lstrip("\ufeff")), format, stats, source="<upload>")
+
+
+def iter_calendar_lines(lines, format, stats=None, source="<calendário>"):
+    """Gera as notícias válidas de um iterável de linhas de texto no formato dado"""
+    if stats is None:
+        stats = ImportStats()
+    reader = _READERS[format]
+    try:
+        for line_number, record in reader(lines, stats, source):
+            event, reason = normalize_event(record)
+            if event is None:
+                stats.reject(line_number, reason)
+                continue
+            stats.rows_accepted += 1
+            yield event
+    finally:
+        stats.finished = time.perf_counter()
+
+
+def import_calendar(path, analyzer, batch_size=10000, format=None, stats=None):
+    """Carrega o calendário no analisador em lotes (NewsAnalyzer.extend_news)"""
+    if stats is None:
+        stats = ImportStats()
+    batch = []
+    for event in iter_calendar(path, stats, format):
+        batch.append(event)
+        if len(batch) >= batch_size:
+            analyzer.extend_news(batch)
+            batch = []
+    if batch:
+        analyzer.extend_news(batch)
+    return stats
@@ -0,0 +1,407 @@
+"""Modo de acompanhamento (watch) de um calendário atualizado ao longo do dia
+
+Acompanha um arquivo de calendário (ou um diretório de calendários) e aplica
+no NewsAnalyzer só o que mudou: linhas acrescentadas a arquivos CSV/JSON Lines
+são lidas a partir do ponto onde a leitura anterior parou; arquivos reescritos
+são relidos e comparados data a data. Só as datas alteradas são reanalisadas,
+e cada mudança na análise sai como um AnalysisDiff:
+
+    watcher = CalendarWatcher("calendario_hoje.csv", analyzer)
+    for diff in watcher.poll():
+        print(format_diff(diff))
+
+    python calendar_watch.py calendario_hoje.csv          # CLI: imprime as mudanças
+"""
+import csv
+import io
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+
+from calendar_importer import FORMATS, ImportStats, decode_lines, detect_format, iter_calendar_text
+from news_analyzer import NEWS_LISTS, NewsEvent
+
+# Mudança na análise de uma data: análise anterior (None na primeira vez),
+# análise nova e as diferenças campo a campo
+AnalysisDiff = namedtuple("AnalysisDiff", "date before after changes")
+
+# Bytes comparados para decidir se um arquivo maior só recebeu linhas no fim
+SIGNATURE_BYTES = 256
+
+# Intervalo entre verificações (segundos) enquanto os arquivos mudam: uma
+# verificação sem mudanças custa só alguns stat (~10-20 µs), então a mudança
+# chega ao analisador em poucos milissegundos
+POLL_INTERVAL = 0.005
+# Com os arquivos parados o intervalo dobra a cada verificação até este teto,
+# para não acordar 200 vezes por segundo à toa; a primeira mudança depois de
+# um período parado pode levar até esse tempo para ser vista
+IDLE_POLL_INTERVAL = 0.1
+
+# Tempo (segundos) que um arquivo precisa ficar sem mudar para que uma última
+# linha sem quebra de linha conte como completa e para que uma reescrita vazia
+# apague suas datas: bem mais longo que o intervalo de verificação, para não
+# confundir uma escrita em andamento (truncar e depois escrever) com o estado final
+SETTLE_TIME = 0.5
+
+# Erros de leitura de um arquivo ainda sendo escrito (ou bloqueado): o estado
+# anterior do arquivo é mantido e a leitura é refeita numa próxima verificação
+READ_ERRORS = (OSError, ValueError, csv.Error)
+
+NAME_LISTS = ("currencies_affected", "pairs_affected", "instruments_affected")
+STRATEGY_LISTS = ("recommended_pairs", "avoid_pairs", "recommended_instruments", "session_focus", "notes")
+
+
+def _news_key(news):
+    return news['name'], news['time']
+
+
+def _list_change(before, after):
+    removed = [item for item in before if item not in after]
+    added = [item for item in after if item not in before]
+    return {"added": added, "removed": removed} if added or removed else None
+
+
+def diff_analyses(before, after):
+    """Diferenças entre duas análises de analyze_confluence (dicionário vazio se iguais)"""
+    before = before or {}
+    changes = {}
+    if ("error" in before) != ("error" in after):
+        changes["error"] = (before.get("error"), after.get("error"))
+    for field in NEWS_LISTS:
+        old = {_news_key(news): news for news in before.get(field, ())}
+        new = {_news_key(news): news for news in after.get(field, ())}
+        change = _list_change(list(old), list(new)) or {"added": [], "removed": []}
+        # Mesma notícia (título e horário) com previous/consensus diferentes
+        change["changed"] = [key for key in new if key in old and new[key] != old[key]]
+        if change["added"] or change["removed"] or change["changed"]:
+            changes[field] = change
+    for field in NAME_LISTS:
+        change = _list_change(before.get(field, ()), after.get(field, ()))
+        if change:
+            changes[field] = change
+    old_strategy = before.get("strategy") or {}
+    new_strategy = after.get("strategy") or {}
+    for field in STRATEGY_LISTS:
+        change = _list_change(old_strategy.get(field, ()), new_strategy.get(field, ()))
+        if change:
+            changes[field] = change
+    if old_strategy.get("risk_level") != new_strategy.get("risk_level"):
+        changes["risk_level"] = (old_strategy.get("risk_level"), new_strategy.get("risk_level"))
+    return changes
+
+
+def format_diff(diff):
+    """Resumo de texto de um AnalysisDiff"""
+    lines = [f"{diff.date}: análise {'criada' if diff.before is None else 'atualizada'}"]
+    for field, change in diff.changes.items():
+        if isinstance(change, tuple):
+            lines.append(f"  {field}: {change[0]} → {change[1]}")
+            continue
+        parts = []
+        for kind, sign in (("added", "+"), ("removed", "-"), ("changed", "~")):
+            for item in change.get(kind, ()):
+                parts.append(sign + (f"{item[0]} ({item[1]})" if isinstance(item, tuple) else str(item)))
+        lines.append(f"  {field}: {', '.join(parts)}")
+    return "\n".join(lines)
+
+
+class _WatchedFile:
+    """Estado de leitura de um arquivo: posição, assinatura e notícias por data"""
+
+    def __init__(self, path, format):
+        self.path = path
+        self.format = format
+        self.stat_key = None
+        self.offset = 0
+        self.signature = b""
+        self.header = ""
+        self.events_by_date = {}
+        # Último stat visto, lido ou não (detecta atividade no arquivo), e
+        # desde quando (time.monotonic) ele não muda
+        self.seen_key = None
+        self.seen_since = 0.0
+        # Estado (stat) em que a leitura falhou ou em que o arquivo ficou sem
+        # notícias: só vale quando o arquivo para de mudar
+        self.failed_key = None
+        self.pending_key = None
+
+
+class CalendarWatcher:
+    """Aplica no analisador as mudanças de um calendário em arquivo ou diretório
+
+    Os arquivos acompanhados são donos das datas que contêm: a cada mudança,
+    as notícias dessas datas passam a ser exatamente as dos arquivos (em
+    ordem de caminho). Com um NewsStore no analisador as datas também são
+    regravadas nele. `lock` (opcional) é adquirido enquanto o analisador é
+    alterado e reanalisado, para uso com threads.
+
+    Um arquivo que não pôde ser lido ou interpretado (escrita pela metade,
+    arquivo bloqueado) mantém as notícias da última leitura boa e fica em
+    `errors` até ser lido de novo. Um arquivo reescrito que aparece vazio só
+    apaga suas datas depois que para de mudar.
+
+    `interval` é a espera até a próxima verificação: poll_interval logo
+    depois de uma mudança, dobrando a cada verificação sem mudanças até
+    idle_interval (idle_interval=poll_interval mantém o intervalo fixo).
+    Um arquivo só é considerado parado depois de settle_time segundos sem
+    mudar.
+    """
+
+    def __init__(self, source, analyzer, poll_interval=POLL_INTERVAL, lock=None, stats=None,
+                 idle_interval=IDLE_POLL_INTERVAL, settle_time=SETTLE_TIME):
+        self.source = source
+        self.analyzer = analyzer
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.idle_interval = max(idle_interval, poll_interval)
+        self.interval = poll_interval
+        self.lock = lock if lock is not None else nullcontext()
+        self.stats = stats if stats is not None else ImportStats()
+        self._files = {}
+        self._analyses = {}
+        # Caminho -> mensagem dos arquivos cuja última leitura falhou
+        self.errors = {}
+
+    def _paths(self):
+        if os.path.isdir(self.source):
+            paths = []
+            with os.scandir(self.source) as entries:
+                for entry in entries:
+                    if os.path.splitext(entry.name)[1].lower() in FORMATS and entry.is_file():
+                        paths.append(entry.path)
+            return sorted(paths)
+        return [self.source] if os.path.exists(self.source) else []
+
+    def poll(self):
+        """Verifica os arquivos uma vez; retorna os AnalysisDiff das datas alteradas"""
+        changed_dates = set()
+        paths = self._paths()
+        active = False
+        for path in set(self._files) - set(paths):
+            # Arquivo removido: suas datas ficam só com o que os demais trazem
+            changed_dates.update(self._files.pop(path).events_by_date)
+            active = True
+        for path in paths:
+            watched = self._files.get(path)
+            if watched is None:
+                watched = self._files[path] = _WatchedFile(path, detect_format(path))
+            seen_key = watched.seen_key
+            try:
+                changed_dates.update(self._refresh(watched))
+            except FileNotFoundError:
+                # Removido entre a listagem e a leitura: tratado na próxima verificação
+                active = True
+                continue
+            except READ_ERRORS as exc:
+                self.errors[path] = str(exc)
+                continue
+            finally:
+                active = active or watched.seen_key != seen_key
+            self.errors.pop(path, None)
+        for path in set(self.errors) - set(self._files):
+            del self.errors[path]
+        self.interval = self.poll_interval if active else min(self.interval * 2, self.idle_interval)
+        if not changed_dates:
+            return []
+        return self._apply(sorted(changed_dates))
+
+    def _refresh(self, watched):
+        """Lê o que mudou no arquivo; retorna as datas com notícias alteradas
+
+        O estado do arquivo só é atualizado depois de uma leitura completa:
+        um erro no meio deixa tudo como na leitura anterior.
+        """
+        stat = os.stat(watched.path)
+        stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        now = time.monotonic()
+        if stat_key != watched.seen_key:
+            watched.seen_key = stat_key
+            watched.seen_since = now
+        quiet = now - watched.seen_since >= self.settle_time
+        if stat_key == watched.failed_key:
+            # Mesmo conteúdo que já falhou: espera o arquivo mudar
+            return ()
+        unchanged = stat_key == watched.stat_key
+        if unchanged and (watched.format == "json" or watched.offset >= stat.st_size):
+            return ()
+        # Arquivo parado desde a última leitura com uma última linha sem
+        # quebra de linha: ela já está completa
+        settled = unchanged and quiet
+        with open(watched.path, "rb") as handle:
+            # Mesmo arquivo, maior e com os bytes antes da posição lida
+            # intactos: só recebeu linhas no fim
+            appended = unchanged or (watched.stat_key is not None and watched.format != "json"
+                                   and stat.st_ino == watched.stat_key[0] and stat.st_size >= watched.offset
+                                   and self._signature(handle, watched.offset) == watched.signature)
+            # _signature deixa o arquivo posicionado no fim da parte já lida
+            handle.seek(watched.offset if appended else 0)
+            data = handle.read()
+        if watched.format != "json" and not settled:
+            # Só linhas completas: uma linha ainda sendo escrita fica para depois
+            data = data[:data.rfind(b"\n") + 1]
+
+        try:
+            if appended:
+                return self._read_appended(watched, stat_key, data)
+            return self._read_rewritten(watched, stat_key, data, quiet)
+        except READ_ERRORS:
+            watched.failed_key = stat_key
+            raise
+
+    def _decode(self, data):
+        # Linhas com bytes inválidos são rejeitadas uma a uma, como na importação
+        return "".join(decode_lines(io.BytesIO(data), self.stats))
+
+    def _read_rewritten(self, watched, stat_key, data, quiet):
+        text = self._decode(data)
+        events_by_date = {}
+        for event in iter_calendar_text(text, watched.format, self.stats):
+            event = NewsEvent.coerce(event)
+            events_by_date.setdefault(event.date, []).append(event)
+        old = watched.events_by_date
+        if old and not events_by_date and not (stat_key == watched.pending_key and quiet):
+            # Reescrito e (ainda) vazio: pode ser um truncamento antes da
+            # escrita; só vale depois de settle_time sem mudar
+            watched.pending_key = stat_key
+            return ()
+
+        watched.stat_key = stat_key
+        watched.offset = len(data)
+        watched.signature = data[-SIGNATURE_BYTES:]
+        watched.header = text.partition("\n")[0] + "\n" if watched.format == "csv" and text else ""
+        watched.events_by_date = events_by_date
+        return [date for date in set(old) | set(events_by_date) if old.get(date) != events_by_date.get(date)]
+
+    def _read_appended(self, watched, stat_key, data):
+        if not data:
+            watched.stat_key = stat_key
+            return ()
+        text = self._decode(data)
+        header = watched.header
+        if watched.format == "csv":
+            if not header:
+                header, _, text = text.lstrip("\ufeff").partition("\n")
+                header += "\n"
+            text = header + text
+        events = [NewsEvent.coerce(event) for event in iter_calendar_text(text, watched.format, self.stats)]
+
+        watched.stat_key = stat_key
+        watched.offset += len(data)
+        watched.signature = (watched.signature + data)[-SIGNATURE_BYTES:]
+        watched.header = header
+        touched = set()
+        for event in events:
+            watched.events_by_date.setdefault(event.date, []).append(event)
+            touched.add(event.date)
+        return touched
+
+    @staticmethod
+    def _signature(handle, offset):
+        start = max(offset - SIGNATURE_BYTES, 0)
+        handle.seek(start)
+        return handle.read(offset - start)
+
+    def _events_for(self, date):
+        events = []
+        for path in sorted(self._files):
+            events.extend(self._files[path].events_by_date.get(date, ()))
+        return events
+
+    def _apply(self, dates):
+        analyzer = self.analyzer
+        diffs = []
+        with self.lock:
+            events_by_date = {date: self._events_for(date) for date in dates}
+            changed = analyzer.set_dates(events_by_date)
+            for date in changed:
+                after = analyzer.analyze_confluence(date)
+                before = self._analyses.get(date)
+                self._analyses[date] = after
+                changes = diff_analyses(before, after)
+                if changes or before is None:
+                    diffs.append(AnalysisDiff(date, before, after, changes))
+        return diffs
+
+    def run(self, callback, stop_event=None, on_error=None):
+        """Verifica continuamente até stop_event; chama callback(diffs) a cada mudança
+
+        on_error(caminho, mensagem), se informado, é chamado quando a leitura
+        de um arquivo passa a falhar (ou falha com outra mensagem).
+        """
+        stop_event = stop_event if stop_event is not None else threading.Event()
+        reported = {}
+        while not stop_event.is_set():
+            diffs = self.poll()
+            if diffs:
+                callback(diffs)
+            if on_error is not None:
+                for path, message in self.errors.items():
+                    if reported.get(path) != message:
+                        on_error(path, message)
+                reported = dict(self.errors)
+            stop_event.wait(self.interval)
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Acompanha um calendário (arquivo ou diretório) e imprime as mudanças na análise.")
+    parser.add_argument("source", help="arquivo .csv/.jsonl/.json ou diretório de calendários")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help=f"intervalo entre verificações em segundos (padrão {POLL_INTERVAL})")
+    parser.add_argument("--idle-interval", type=float, default=IDLE_POLL_INTERVAL,
+                        help="intervalo máximo com o calendário parado; o intervalo dobra a cada "
+                             f"verificação sem mudanças até ele (padrão {IDLE_POLL_INTERVAL})")
+    parser.add_argument("--json", action="store_true", help="uma linha JSON por mudança em vez de texto")
+    parser.add_argument("--db", help="histórico SQLite (news_store) onde as mudanças são gravadas")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.source):
+        parser.error(f"não encontrado: {args.source}")
+    if not os.path.isdir(args.source):
+        try:
+            detect_format(args.source)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    from news_analyzer import NewsAnalyzer
+
+    store = None
+    if args.db:
+        from news_store import NewsStore
+        store = NewsStore(args.db)
+    watcher = CalendarWatcher(args.source, NewsAnalyzer(store=store), args.interval,
+                              idle_interval=args.idle_interval)
+
+    def report(diffs):
+        for diff in diffs:
+            if args.json:
+                print(json.dumps({"date": diff.date, "changes": diff.changes, "analysis": diff.after},
+                                 ensure_ascii=False), flush=True)
+            else:
+                print(format_diff(diff), flush=True)
+
+    started = time.perf_counter()
+    report(watcher.poll())
+    print(f"acompanhando {args.source} ({(time.perf_counter() - started) * 1000:.1f} ms na carga inicial)",
+          file=sys.stderr)
+
+    def report_error(path, message):
+        print(f"{path}: leitura adiada ({message})", file=sys.stderr, flush=True)
+
+    try:
+        watcher.run(report, on_error=report_error)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Confluência em janelas móveis de vários dias
+
+analyze_confluence olha um dia por vez; semanas de bancos centrais ou um NFP
+seguido de CPI só aparecem somando vários dias. ConfluenceWindow mantém os
+agregados de uma janela de N dias (notícias por moeda, por nível de impacto,
+pares afetados e os pares a evitar) e os atualiza a cada passo somando o dia
+que entra e subtraindo o que sai, então varrer uma década de janelas custa o
+mesmo que analisar cada dia uma vez.
+
+    for end, window in analyzer.rolling_confluence("2015-01-01", "2024-12-31", days=7):
+        if window["impact_counts"].get("VERY_HIGH", 0) >= 2:
+            print(end, window["avoid_pairs"])
+"""
+from collections import deque
+from datetime import date as Date, timedelta
+
+from news_analyzer import HIGH_IMPACT_LEVELS, NEWS_LISTS, previous_day
+
+
+def day_contribution(analysis):
+    """Contagens de um dia a partir da análise de analyze_confluence
+
+    Retorna (impactos, moedas por notícia, pares/instrumentos por notícia,
+    moedas afetadas no dia, tem alto impacto), ou None se o dia não tem
+    notícias.
+    """
+    if "error" in analysis:
+        return None
+    impacts = {}
+    currencies = {}
+    pairs = {}
+    high = False
+    for field in NEWS_LISTS:
+        for news in analysis[field]:
+            impact_info = news['impact_info']
+            impact = str(impact_info['impact'])
+            impacts[impact] = impacts.get(impact, 0) + 1
+            high = high or impact in HIGH_IMPACT_LEVELS
+            for currency in impact_info.get('currencies', ()):
+                currencies[currency] = currencies.get(currency, 0) + 1
+            for field_name in ('pairs_affected', 'instruments', 'indices'):
+                for pair in impact_info.get(field_name, ()):
+                    pairs[pair] = pairs.get(pair, 0) + 1
+    return impacts, currencies, pairs, tuple(analysis['currencies_affected']), high
+
+
+def _add(totals, counts, sign):
+    """Soma (sign=1) ou subtrai (sign=-1) counts; retorna se alguma chave apareceu ou sumiu"""
+    changed = False
+    for key, value in counts.items():
+        total = totals.get(key, 0) + sign * value
+        if total:
+            totals[key] = total
+            changed = changed or total == sign * value
+        else:
+            del totals[key]
+            changed = True
+    return changed
+
+
+class ConfluenceWindow:
+    """Agregados de uma janela móvel de `days` dias, atualizados por dia
+
+    push(data, análise) acrescenta o dia mais recente e retira os que ficaram
+    mais de `days` dias para trás; as datas devem chegar em ordem. Dias sem
+    notícias não precisam ser empurrados. Os pares a evitar são os pares
+    forex com base e cotação entre as moedas afetadas em algum dia da janela
+    (com days=1, os mesmos de determine_trading_strategy) e só são
+    recalculados quando o conjunto de moedas muda.
+    """
+
+    def __init__(self, days, exposure):
+        if days < 1:
+            raise ValueError("a janela deve ter pelo menos 1 dia")
+        self.days = days
+        self.exposure = exposure
+        self.end = None
+        self.events = 0
+        self.impact_counts = {}
+        self.currency_counts = {}
+        self.currency_days = {}
+        self.pair_counts = {}
+        self._days = deque()
+        self._high_dates = deque()
+        self._avoid = []
+        self._avoid_stale = False
+
+    @property
+    def start(self):
+        """Primeiro dia da janela que termina em `end`"""
+        if self.end is None:
+            return None
+        return (Date.fromisoformat(self.end) - timedelta(days=self.days - 1)).isoformat()
+
+    def advance(self, end):
+        """Move o fim da janela para `end`, retirando os dias que saíram"""
+        if self.end is not None and end < self.end:
+            raise ValueError(f"janela não volta no tempo: {end} < {self.end}")
+        self.end = end
+        start = self.start
+        while self._days and self._days[0][0] < start:
+            self._apply(self._days.popleft()[1], -1)
+        while self._high_dates and self._high_dates[0] < start:
+            self._high_dates.popleft()
+
+    def push(self, date, analysis):
+        """Acrescenta um dia (a análise de analyze_confluence) e avança até ele"""
+        self.advance(date)
+        contribution = day_contribution(analysis)
+        if contribution is None:
+            return
+        self._days.append((date, contribution))
+        self._apply(contribution, 1)
+        if contribution[4]:
+            self._high_dates.append(date)
+
+    def _apply(self, contribution, sign):
+        impacts, currencies, pairs, currencies_affected, _ = contribution
+        self.events += sign * sum(impacts.values())
+        _add(self.impact_counts, impacts, sign)
+        _add(self.currency_counts, currencies, sign)
+        _add(self.pair_counts, pairs, sign)
+        if _add(self.currency_days, dict.fromkeys(currencies_affected, 1), sign):
+            self._avoid_stale = True
+
+    @property
+    def avoid_pairs(self):
+        if self._avoid_stale:
+            self._avoid = self.exposure.conflicting_pairs(self.currency_days)
+            self._avoid_stale = False
+        return self._avoid
+
+    def snapshot(self):
+        """Resumo da janela atual (dicionário novo, independente da janela)"""
+        return {
+            "start": self.start,
+            "end": self.end,
+            "days": self.days,
+            "events": self.events,
+            "impact_counts": dict(sorted(self.impact_counts.items())),
+            "currency_counts": dict(sorted(self.currency_counts.items())),
+            "currency_days": dict(sorted(self.currency_days.items())),
+            "pair_counts": dict(sorted(self.pair_counts.items())),
+            "avoid_pairs": list(self.avoid_pairs),
+            "high_impact_dates": list(self._high_dates)
+        }
+
+
+def rolling_confluence(analyzer, start, end, days=7, step=1):
+    """Gera (data final, resumo) das janelas de `days` dias que terminam de start a end
+
+    Uma janela a cada `step` dias; cada dia é analisado uma única vez (com o
+    cache do analisador) e entra e sai dos agregados uma vez só.
+    """
+    if step < 1:
+        raise ValueError("step deve ser pelo menos 1")
+    window = ConfluenceWindow(days, analyzer.rules.exposure)
+    first = (Date.fromisoformat(start) - timedelta(days=days - 1)).isoformat()
+    analyzer.load_range(first, end)
+    # Dias anteriores a start só preenchem a primeira janela
+    for date in analyzer.dates_between(first, previous_day(start)):
+        window.push(date, analyzer.analyze_confluence(date))
+
+    news_dates = iter(analyzer.dates_between(start, end))
+    next_news = next(news_dates, None)
+    day = Date.fromisoformat(start)
+    last = Date.fromisoformat(end)
+    one_day = timedelta(days=1)
+    offset = 0
+    while day <= last:
+        date = day.isoformat()
+        if next_news == date:
+            window.push(date, analyzer.analyze_confluence(date))
+            next_news = next(news_dates, None)
+        else:
+            window.advance(date)
+        if offset % step == 0:
+            yield date, window.snapshot()
+        day += one_day
+        offset += 1
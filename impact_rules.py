@@ -0,0 +1,516 @@
+"""Regras de impacto: banco de notícias e universo de instrumentos
+
+O banco de impacto (NEWS_IMPACT_DATABASE), os pares forex, commodities e
+índices ficam num arquivo JSON (impact_rules.json, ao lado deste módulo, ou o
+caminho em TRADING_ANALYZER_RULES). Ao carregar, o arquivo é validado e
+normalizado num RuleSet imutável, com as tabelas já compiladas: matcher de
+títulos, níveis de impacto (Impact) e máscaras de exposição.
+
+    rules = current_rules()
+    rules.match("US Non-Farm Payrolls")["impact"]   # Impact.VERY_HIGH
+    reload_rules()                                  # relê o arquivo sem reiniciar
+
+A troca é atômica: reload_rules monta e valida o RuleSet novo por inteiro e
+só então o publica; análises em andamento continuam com o RuleSet que
+pegaram no início, e um arquivo inválido não altera as regras em uso.
+"""
+import os
+import threading
+from collections import OrderedDict
+from enum import Enum
+
+RULES_ENV = "TRADING_ANALYZER_RULES"
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "impact_rules.json")
+
+# Campos aceitos numa entrada do banco; pairs_affected, instruments e indices
+# ficam como escritos, mas cada símbolo precisa estar no universo
+ENTRY_FIELDS = ("impact", "currencies", "pairs_affected", "instruments", "indices",
+                "description", "trading_strategy")
+SYMBOL_FIELDS = ("pairs_affected", "instruments", "indices")
+RULES_FIELDS = ("news", "forex_pairs", "commodities", "indices", "instrument_currencies")
+
+
+class Impact(str, Enum):
+    """Nível de impacto; compara igual ao texto ("HIGH") e sai como texto no JSON"""
+    VERY_HIGH = "VERY_HIGH"
+    HIGH = "HIGH"
+    MEDIUM = "MEDIUM"
+    LOW = "LOW"
+
+    def __str__(self):
+        return self.value
+
+    @property
+    def rank(self):
+        """Ordem de gravidade (LOW = 0 ... VERY_HIGH = 3)"""
+        return IMPACT_RANK[self]
+
+
+IMPACT_RANK = {Impact.LOW: 0, Impact.MEDIUM: 1, Impact.HIGH: 2, Impact.VERY_HIGH: 3}
+
+
+class RulesError(ValueError):
+    """Arquivo de regras inválido; `problems` lista cada problema encontrado"""
+
+    def __init__(self, source, problems):
+        self.source = source
+        self.problems = list(problems)
+        where = source or "regras"
+        super().__init__(f"{where}: {len(self.problems)} problema(s) nas regras de impacto\n"
+                         + "\n".join(f"  - {problem}" for problem in self.problems))
+
+
+def _impact_scope(impact_info):
+    """Quantidade de moedas/instrumentos que uma entrada do banco afeta"""
+    scope = 0
+    for field in ("currencies", "instruments", "indices"):
+        scope += len(impact_info.get(field, ()))
+    return scope or float("inf")
+
+
+class ImpactMatcher:
+    """Matcher Aho-Corasick sobre as chaves do banco de impacto
+    
+    O autômato é compilado uma única vez; cada consulta percorre o título
+    uma só vez, independente do número de chaves. Quando várias chaves
+    aparecem no mesmo título vence a mais específica: a que afeta menos
+    moedas/instrumentos, depois a chave mais longa, depois a ordem do banco.
+    Assim "Japan BoJ Interest Rate Decision" resolve para "BoJ Interest Rate"
+    e não para a entrada genérica "Interest Rate Decision".
+    """
+    
+    def __init__(self, database):
+        self.database = database
+        self._keys = list(database)
+        # Prioridade de cada chave (menor = mais específica)
+        self._rank = [(_impact_scope(database[key]), -len(key), order)
+                      for order, key in enumerate(self._keys)]
+        
+        # Trie: transições por nó e melhor chave que termina em cada nó
+        self._goto = [{}]
+        self._best = [None]
+        for index, key in enumerate(self._keys):
+            node = 0
+            for char in key.lower():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._best.append(None)
+                node = next_node
+            self._best[node] = self._better(self._best[node], index)
+            
+        # Links de falha (BFS) propagando a melhor chave dos sufixos
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._best[child] = self._better(self._best[child], self._best[self._fail[child]])
+                queue.append(child)
+                
+    def _better(self, first, second):
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return first if self._rank[first] <= self._rank[second] else second
+        
+    def match_key(self, text):
+        """Retorna a chave mais específica contida em text (ou None)"""
+        goto = self._goto
+        fail = self._fail
+        best_at = self._best
+        best = None
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            candidate = best_at[node]
+            if candidate is not None:
+                best = self._better(best, candidate)
+        return self._keys[best] if best is not None else None
+        
+    def match(self, text):
+        """Retorna a entrada do banco para o título (ou None)"""
+        key = self.match_key(text)
+        return self.database[key] if key is not None else None
+
+
+class ExposureTable:
+    """Matriz de exposição moedas × instrumentos, em bitsets
+    
+    Cada instrumento do universo (pares forex, commodities e índices) ocupa um
+    bit; para cada moeda há uma máscara dos instrumentos em que ela é base, é
+    cotação ou aparece de qualquer forma. Perguntas como "quais pares têm base
+    e cotação afetadas" viram algumas operações OR/AND por dia, seja qual for
+    o tamanho do universo.
+    """
+    
+    def __init__(self, forex_pairs, commodities=(), indices=(), instrument_currencies=None):
+        instrument_currencies = instrument_currencies or {}
+        self.instruments = list(dict.fromkeys(list(forex_pairs) + list(commodities) + list(indices)))
+        self.forex_mask = 0
+        self.base = {}
+        self.quote = {}
+        self.exposure = {}
+        forex = set(forex_pairs)
+        for index, instrument in enumerate(self.instruments):
+            bit = 1 << index
+            if instrument in forex:
+                self.forex_mask |= bit
+            if instrument in instrument_currencies:
+                currency = instrument_currencies[instrument]
+                self.exposure[currency] = self.exposure.get(currency, 0) | bit
+                continue
+            base_currency, quote_currency = instrument[:3], instrument[3:]
+            self.base[base_currency] = self.base.get(base_currency, 0) | bit
+            self.quote[quote_currency] = self.quote.get(quote_currency, 0) | bit
+            for currency in (base_currency, quote_currency):
+                self.exposure[currency] = self.exposure.get(currency, 0) | bit
+                
+    @staticmethod
+    def mask(table, currencies):
+        """OR das máscaras das moedas informadas"""
+        mask = 0
+        for currency in currencies:
+            mask |= table.get(currency, 0)
+        return mask
+        
+    def names(self, mask):
+        """Instrumentos de uma máscara, na ordem do universo"""
+        names = []
+        instruments = self.instruments
+        while mask:
+            low_bit = mask & -mask
+            names.append(instruments[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return names
+        
+    def conflicting_mask(self, currencies):
+        """Pares forex com base e cotação ambas entre as moedas informadas"""
+        return self.mask(self.base, currencies) & self.mask(self.quote, currencies) & self.forex_mask
+        
+    def conflicting_pairs(self, currencies):
+        return self.names(self.conflicting_mask(currencies))
+
+
+def _symbols(value, where, problems):
+    """Lista de textos em maiúsculas, sem repetição (ordem preservada)"""
+    if not isinstance(value, list) or not all(isinstance(item, str) and item.strip() for item in value):
+        problems.append(f"{where}: esperada uma lista de textos")
+        return []
+    return list(dict.fromkeys(item.strip().upper() for item in value))
+
+
+def _is_currency(code):
+    return len(code) == 3 and code.isalpha()
+
+
+def _normalize_universe(spec, problems):
+    forex_pairs = spec.get("forex_pairs")
+    if not isinstance(forex_pairs, dict) or not forex_pairs:
+        problems.append("forex_pairs: esperado um objeto {grupo: [pares]}")
+        forex_pairs = {}
+    forex_pairs = {group: _symbols(pairs, f"forex_pairs.{group}", problems)
+                   for group, pairs in forex_pairs.items()}
+    commodities = _symbols(spec.get("commodities", []), "commodities", problems)
+    indices = _symbols(spec.get("indices", []), "indices", problems)
+    instrument_currencies = spec.get("instrument_currencies", {})
+    if not isinstance(instrument_currencies, dict):
+        problems.append("instrument_currencies: esperado um objeto {instrumento: moeda}")
+        instrument_currencies = {}
+    instrument_currencies = {str(symbol).strip().upper(): str(currency).strip().upper()
+                             for symbol, currency in instrument_currencies.items()}
+
+    seen = {}
+    for group, symbols in [(f"forex_pairs.{group}", pairs) for group, pairs in forex_pairs.items()] + [
+            ("commodities", commodities), ("indices", indices)]:
+        for symbol in symbols:
+            if symbol in seen:
+                problems.append(f"{group}: {symbol} já aparece em {seen[symbol]}")
+            seen.setdefault(symbol, group)
+    for pairs in forex_pairs.values():
+        for pair in pairs:
+            if len(pair) != 6 or not pair.isalpha():
+                problems.append(f"forex_pairs: {pair!r} não é um par BASECOTAÇÃO")
+    for symbol, currency in instrument_currencies.items():
+        if symbol not in commodities and symbol not in indices:
+            problems.append(f"instrument_currencies: {symbol} não está em commodities nem em indices")
+        if not _is_currency(currency):
+            problems.append(f"instrument_currencies.{symbol}: moeda inválida {currency!r}")
+    for symbol in commodities + indices:
+        # Sem moeda de referência o instrumento é lido como BASECOTAÇÃO
+        if symbol not in instrument_currencies and (len(symbol) != 6 or not symbol.isalpha()):
+            problems.append(f"{symbol}: informe a moeda em instrument_currencies")
+    return {"forex_pairs": forex_pairs, "commodities": commodities, "indices": indices,
+            "instrument_currencies": instrument_currencies}
+
+
+def _universe_currencies(universe):
+    currencies = set(universe["instrument_currencies"].values())
+    for symbol in [pair for pairs in universe["forex_pairs"].values() for pair in pairs] + \
+            universe["commodities"] + universe["indices"]:
+        if symbol not in universe["instrument_currencies"]:
+            currencies.update((symbol[:3], symbol[3:]))
+    return currencies
+
+
+def _normalize_news(news, universe, problems):
+    """Entradas no formato único: impact, currencies, pairs_affected, instruments, indices, description, trading_strategy"""
+    if not isinstance(news, dict) or not news:
+        problems.append("news: esperado um objeto {título: regra}")
+        return {}
+    known = {pair for pairs in universe["forex_pairs"].values() for pair in pairs}
+    known.update(universe["commodities"], universe["indices"])
+    currencies_known = _universe_currencies(universe)
+    database = {}
+    lowered = {}
+    for key, entry in news.items():
+        where = f"news[{key!r}]"
+        key = key.strip() if isinstance(key, str) else ""
+        if not key:
+            problems.append(f"{where}: título vazio")
+            continue
+        # O matcher ignora maiúsculas: chaves que só diferem nisso colidiriam
+        if key.lower() in lowered:
+            problems.append(f"{where}: repete a chave {lowered[key.lower()]!r}")
+            continue
+        lowered[key.lower()] = key
+        if not isinstance(entry, dict):
+            problems.append(f"{where}: esperado um objeto")
+            continue
+        unknown = sorted(set(entry) - set(ENTRY_FIELDS))
+        if unknown:
+            problems.append(f"{where}: campos desconhecidos {', '.join(unknown)}")
+        try:
+            impact = Impact(str(entry.get("impact", "")).strip().upper())
+        except ValueError:
+            problems.append(f"{where}: impact deve ser um de {', '.join(level.value for level in Impact)}")
+            impact = None
+        currencies = _symbols(entry.get("currencies", []), f"{where}.currencies", problems)
+        for currency in currencies:
+            if currency not in currencies_known:
+                problems.append(f"{where}: moeda {currency} fora do universo de instrumentos")
+        # Cada lista mantém o campo de origem: a análise reporta só
+        # `instruments` em instruments_affected, como no banco original
+        symbols = {}
+        for field in SYMBOL_FIELDS:
+            symbols[field] = _symbols(entry.get(field, []), f"{where}.{field}", problems)
+            for symbol in symbols[field]:
+                if symbol not in known:
+                    problems.append(f"{where}: {symbol} não está em forex_pairs, commodities nem indices")
+        if not (currencies or any(symbols.values())):
+            problems.append(f"{where}: nenhuma moeda ou instrumento afetado")
+        text = {}
+        for field in ("description", "trading_strategy"):
+            value = entry.get(field, "")
+            if not isinstance(value, str):
+                problems.append(f"{where}.{field}: esperado um texto")
+                value = ""
+            text[field] = value
+        database[key] = {
+            "impact": impact,
+            "currencies": currencies,
+            "pairs_affected": symbols["pairs_affected"],
+            "instruments": symbols["instruments"],
+            "indices": symbols["indices"],
+            "description": text["description"],
+            "trading_strategy": text["trading_strategy"]
+        }
+    return database
+
+
+def normalize_rules(spec, source=None):
+    """Valida um dicionário de regras e retorna a forma normalizada (ou RulesError)"""
+    problems = []
+    if not isinstance(spec, dict):
+        raise RulesError(source, ["esperado um objeto JSON no topo do arquivo"])
+    unknown = sorted(set(spec) - set(RULES_FIELDS))
+    if unknown:
+        problems.append(f"campos desconhecidos: {', '.join(unknown)}")
+    normalized = _normalize_universe(spec, problems)
+    normalized["news"] = _normalize_news(spec.get("news"), normalized, problems)
+    if problems:
+        raise RulesError(source, problems)
+    return normalized
+
+
+class RuleSet:
+    """Regras de impacto validadas e compiladas (somente leitura)
+
+    - database: título -> entrada normalizada (impact é um Impact; listas
+      currencies, pairs_affected, instruments e indices sempre presentes)
+    - matcher, exposure: ImpactMatcher e ExposureTable compilados
+    """
+
+    _versions = iter(range(1, 2**63))
+
+    def __init__(self, spec, source=None, stat_key=None):
+        normalized = normalize_rules(spec, source)
+        self.source = source
+        self.stat_key = stat_key
+        self.version = next(RuleSet._versions)
+        self.database = normalized["news"]
+        self.forex_pairs = normalized["forex_pairs"]
+        self.commodities = normalized["commodities"]
+        self.indices = normalized["indices"]
+        self.instrument_currencies = normalized["instrument_currencies"]
+        self._spec = normalized
+
+        self.matcher = ImpactMatcher(self.database)
+        self.match = self.matcher.match
+        self.exposure = ExposureTable([pair for pairs in self.forex_pairs.values() for pair in pairs],
+                                      self.commodities, self.indices, self.instrument_currencies)
+
+    @property
+    def digest(self):
+        """Impressão digital do conteúdo normalizado (igual entre processos)"""
+        digest = self.__dict__.get("_digest")
+        if digest is None:
+            import hashlib
+            import json
+            encoded = json.dumps(self._spec, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            digest = self._digest = hashlib.sha1(encoded).hexdigest()
+        return digest
+
+    def to_dict(self):
+        """Regras normalizadas no formato do arquivo (para salvar ou enviar)"""
+        spec = dict(self._spec)
+        spec["news"] = {key: dict(entry, impact=entry["impact"].value) for key, entry in self.database.items()}
+        return spec
+
+    def with_database(self, database):
+        """Outro RuleSet com o mesmo universo e o banco de impacto informado"""
+        spec = self.to_dict()
+        spec["news"] = database
+        return RuleSet(spec)
+
+    def __reduce__(self):
+        # Vai para os processos do pool como regras normalizadas; cada processo
+        # compila uma vez por conteúdo (ver _restore_rules)
+        return _restore_rules, (self.to_dict(), self.digest, self.source)
+
+    def __repr__(self):
+        return f"RuleSet(source={self.source!r}, version={self.version}, news={len(self.database)})"
+
+
+# RuleSets recebidos pelo pool, por digest; só os mais recentes ficam (um
+# serviço que recarrega as regras sempre não acumula versões antigas)
+RESTORED_RULES_LIMIT = 4
+_restored = OrderedDict()
+
+
+def _restore_rules(spec, digest, source):
+    current = _current
+    if current is not None and current.digest == digest:
+        return current
+    rules = _restored.get(digest)
+    if rules is None:
+        rules = _restored[digest] = RuleSet(spec, source)
+        while len(_restored) > RESTORED_RULES_LIMIT:
+            _restored.popitem(last=False)
+    else:
+        _restored.move_to_end(digest)
+    return rules
+
+
+def rules_path():
+    """Arquivo de regras em uso: TRADING_ANALYZER_RULES ou impact_rules.json"""
+    return os.environ.get(RULES_ENV) or DEFAULT_RULES_PATH
+
+
+def _object_without_duplicates(pairs):
+    seen = set()
+    duplicated = set()
+    for key, _ in pairs:
+        if key in seen:
+            duplicated.add(key)
+        seen.add(key)
+    if duplicated:
+        raise RulesError(None, [f"chave repetida: {key!r}" for key in sorted(duplicated)])
+    return dict(pairs)
+
+
+def load_rules(path=None):
+    """Lê, valida e compila um arquivo de regras; não altera as regras em uso"""
+    import json
+
+    path = path or rules_path()
+    with open(path, "rb") as handle:
+        stat = os.fstat(handle.fileno())
+        data = handle.read()
+    try:
+        spec = json.loads(data.decode("utf-8-sig"), object_pairs_hook=_object_without_duplicates)
+    except RulesError as exc:
+        raise RulesError(path, exc.problems) from None
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise RulesError(path, [f"JSON inválido: {exc}"]) from None
+    return RuleSet(spec, path, (stat.st_ino, stat.st_size, stat.st_mtime_ns))
+
+
+_current = None
+_swap_lock = threading.Lock()
+
+
+def current_rules():
+    """RuleSet em uso no processo (carregado do arquivo na primeira chamada)"""
+    rules = _current
+    if rules is None:
+        with _swap_lock:
+            if _current is None:
+                _publish(load_rules())
+            rules = _current
+    return rules
+
+
+def _publish(rules):
+    global _current
+    _current = rules
+
+
+def set_rules(rules):
+    """Publica um RuleSet já montado; retorna o anterior"""
+    with _swap_lock:
+        previous = _current
+        _publish(rules)
+    return previous
+
+
+def reload_rules(path=None):
+    """Relê o arquivo de regras (o atual, se path=None) e troca as regras em uso
+
+    O RuleSet novo é montado fora da trava; se o arquivo for inválido a
+    RulesError sobe e as regras em uso continuam as mesmas.
+    """
+    if path is None and _current is not None:
+        path = _current.source
+    rules = load_rules(path)
+    set_rules(rules)
+    return rules
+
+
+def refresh_rules():
+    """Recarrega as regras se o arquivo mudou desde a última carga
+
+    Retorna o RuleSet novo, ou None se nada mudou (custa um stat).
+    """
+    rules = current_rules()
+    if rules.source is None:
+        return None
+    try:
+        stat = os.stat(rules.source)
+    except FileNotFoundError:
+        return None
+    if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == rules.stat_key:
+        return None
+    if _current is not rules:
+        # Outra thread já recarregou
+        return None
+    return reload_rules(rules.source)
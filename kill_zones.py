@@ -0,0 +1,197 @@
+"""Índice de kill zones sobre o horário das notícias
+
+Converte o campo `time` de cada notícia num timestamp com fuso horário e monta,
+para cada sessão de TRADING_SESSIONS (London, NY_AM, NY_PM, Overlap), uma
+linha do tempo ordenada das notícias que caem dentro da janela da sessão.
+Perguntas como "quais notícias de alto impacto caem em cada kill zone" ou
+"qual a próxima notícia da sessão" viram buscas binárias sobre o calendário.
+
+    index = analyzer.kill_zone_index()
+    index.high_impact_by_session("2025-06-01", "2025-06-30")
+    index.next_event("NY_AM", "2025-06-16")
+"""
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date as Date, datetime, time as Time, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+from news_analyzer import HIGH_IMPACT_LEVELS, TRADING_SESSIONS
+
+# "EST" nas sessões significa horário de Nova York (com horário de verão)
+TIMEZONE_NAMES = {"EST": "America/New_York", "ET": "America/New_York"}
+FALLBACK_OFFSETS = {"EST": -5, "ET": -5}
+
+_TIME_PATTERN = re.compile(r"^\s*(\d{1,2})(?::?(\d{2}))?\s*([ap]\.?m\.?)?\s*$", re.IGNORECASE)
+
+# Notícia dentro de uma kill zone: horário com fuso, a notícia e seu nível de impacto
+KillZoneEvent = namedtuple("KillZoneEvent", "timestamp event impact")
+
+
+def resolve_timezone(name):
+    """tzinfo para o nome usado nas sessões (IANA; offset fixo se indisponível)"""
+    if name is None or hasattr(name, "utcoffset"):
+        return name
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(TIMEZONE_NAMES.get(name, name))
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    # Sem base de fusos (ex.: Windows sem tzdata): offset fixo, sem horário de verão
+    return timezone(timedelta(hours=FALLBACK_OFFSETS.get(name, 0)), name)
+
+
+def parse_time(text):
+    """Converte "08:30", "8:30", "0830" ou "8:30 pm" em datetime.time (None se vazio/inválido)"""
+    match = _TIME_PATTERN.match(text or "")
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem[0].lower() == "p" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return Time(hour, minute)
+
+
+def event_timestamp(event, tz):
+    """Timestamp com fuso de uma notícia (None se ela não tiver horário válido)"""
+    event_time = parse_time(event['time'])
+    if event_time is None:
+        return None
+    return datetime.combine(Date.fromisoformat(event['date']), event_time, tzinfo=tz)
+
+
+def _minutes(text):
+    hours, minutes = text.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class KillZoneIndex:
+    """Linhas do tempo ordenadas das notícias por sessão (kill zone)
+
+    Janelas são [início, fim) no fuso da sessão. Notícias sem horário ficam de
+    fora e são contadas em `untimed`. `event_timezone` é o fuso dos horários do
+    calendário; por padrão, o mesmo das sessões.
+    """
+
+    def __init__(self, events, impact_of=None, sessions=None, event_timezone=None):
+        sessions = TRADING_SESSIONS if sessions is None else sessions
+        self.sessions = {}
+        self.untimed = 0
+        self._timezones = {}
+        timelines = {}
+        for name, window in sessions.items():
+            tz = resolve_timezone(window.get("timezone"))
+            self._timezones[name] = tz
+            self.sessions[name] = (_minutes(window["start"]), _minutes(window["end"]))
+            timelines[name] = []
+
+        source_timezone = resolve_timezone(event_timezone)
+        if source_timezone is None:
+            source_timezone = next(iter(self._timezones.values()), None)
+        # Calendários repetem os mesmos títulos: uma busca de impacto por título
+        impacts = {}
+        for sequence, event in enumerate(events):
+            timestamp = event_timestamp(event, source_timezone)
+            if timestamp is None:
+                self.untimed += 1
+                continue
+            epoch = timestamp.timestamp()
+            name = event['name']
+            impact = impacts.get(name, False)
+            if impact is False:
+                impact_info = impact_of(name) if impact_of is not None else None
+                impact = impacts[name] = impact_info['impact'] if impact_info else None
+            # Minuto do dia no fuso de cada sessão (um cálculo por fuso distinto)
+            local_minutes = {}
+            for session, (start, end) in self.sessions.items():
+                tz = self._timezones[session]
+                minute = local_minutes.get(tz)
+                if minute is None:
+                    local = timestamp if tz is source_timezone else timestamp.astimezone(tz)
+                    minute = local_minutes[tz] = local.hour * 60 + local.minute
+                if start <= minute < end:
+                    timelines[session].append((epoch, sequence, event, impact))
+
+        self._epochs = {}
+        self._items = {}
+        self._high_epochs = {}
+        self._high_items = {}
+        for name, timeline in timelines.items():
+            timeline.sort(key=lambda item: (item[0], item[1]))
+            self._epochs[name] = [item[0] for item in timeline]
+            self._items[name] = [(item[0], item[2], item[3]) for item in timeline]
+            high = [item for item in timeline if item[3] in HIGH_IMPACT_LEVELS]
+            self._high_epochs[name] = [item[0] for item in high]
+            self._high_items[name] = [(item[0], item[2], item[3]) for item in high]
+
+    def _bound(self, value, session, end=False):
+        """Converte data (YYYY-MM-DD) ou datetime em epoch no fuso da sessão"""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            day = Date.fromisoformat(value)
+            if end:
+                day += timedelta(days=1)
+            return datetime.combine(day, Time(0), tzinfo=self._timezones[session]).timestamp()
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=self._timezones[session])
+        return value.timestamp()
+
+    def _timeline(self, session, high_impact_only):
+        if session not in self.sessions:
+            raise KeyError(f"sessão desconhecida: {session}")
+        if high_impact_only:
+            return self._high_epochs[session], self._high_items[session]
+        return self._epochs[session], self._items[session]
+
+    def _result(self, session, item):
+        epoch, event, impact = item
+        return KillZoneEvent(datetime.fromtimestamp(epoch, self._timezones[session]), event, impact)
+
+    def events_in(self, session, start=None, end=None, high_impact_only=False):
+        """Notícias da sessão entre start e end (datas inclusivas ou datetimes)
+
+        Com datetimes o fim é exclusivo; com datas, inclui o dia inteiro.
+        """
+        epochs, items = self._timeline(session, high_impact_only)
+        lo = 0 if start is None else bisect_left(epochs, self._bound(start, session))
+        hi = len(epochs) if end is None else bisect_left(epochs, self._bound(end, session, end=True))
+        return [self._result(session, item) for item in items[lo:hi]]
+
+    def high_impact_by_session(self, start=None, end=None):
+        """Notícias de alto impacto por sessão no intervalo"""
+        return {session: self.events_in(session, start, end, high_impact_only=True)
+                for session in self.sessions}
+
+    def next_event(self, session, after, high_impact_only=False):
+        """Primeira notícia da sessão estritamente depois de `after` (ou None)
+
+        `after` como data (YYYY-MM-DD) significa a partir do início do dia.
+        """
+        epochs, items = self._timeline(session, high_impact_only)
+        if isinstance(after, str):
+            position = bisect_left(epochs, self._bound(after, session))
+        else:
+            position = bisect_right(epochs, self._bound(after, session))
+        return self._result(session, items[position]) if position < len(items) else None
+
+    def next_events(self, after, high_impact_only=False):
+        """Próxima notícia de cada sessão depois de `after`"""
+        return {session: self.next_event(session, after, high_impact_only) for session in self.sessions}
+
+    def sessions_at(self, timestamp):
+        """Sessões cuja janela contém o horário informado (datetime)"""
+        names = []
+        for name, (start, end) in self.sessions.items():
+            local = timestamp if timestamp.tzinfo is None else timestamp.astimezone(self._timezones[name])
+            if start <= local.hour * 60 + local.minute < end:
+                names.append(name)
+        return names
@@ -0,0 +1,920 @@
+"""Núcleo de análise de notícias (sem dependência de PyQt5)
+
+Pode ser importado por scripts e jobs em lote, ou executado direto como CLI:
+
+    python news_analyzer.py calendario.jsonl --start 2025-01-01 --end 2025-12-31
+"""
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, deque
+from datetime import date as Date, timedelta
+from time import perf_counter
+
+# ImpactMatcher e ExposureTable continuam importáveis daqui
+from calendar_importer import is_iso_date
+from impact_rules import ExposureTable, ImpactMatcher, current_rules
+
+# Sessões de trading
+TRADING_SESSIONS = {
+    "London": {"start": "03:00", "end": "12:00", "timezone": "EST"},
+    "NY_AM": {"start": "08:00", "end": "12:00", "timezone": "EST"},
+    "NY_PM": {"start": "13:00", "end": "17:00", "timezone": "EST"},
+    "Overlap": {"start": "08:00", "end": "12:00", "timezone": "EST"}
+}
+
+# Níveis tratados como alto impacto e listas de notícias de uma análise
+HIGH_IMPACT_LEVELS = ("VERY_HIGH", "HIGH")
+NEWS_LISTS = ("high_impact_news", "medium_impact_news")
+
+# Banco de impacto e universo de instrumentos vêm do arquivo de regras
+# (impact_rules.json); os nomes antigos continuam disponíveis e refletem as
+# regras em uso no momento do acesso
+_RULE_TABLES = {
+    "NEWS_IMPACT_DATABASE": lambda rules: rules.database,
+    "FOREX_PAIRS": lambda rules: rules.forex_pairs,
+    "COMMODITIES": lambda rules: rules.commodities,
+    "INDICES": lambda rules: rules.indices,
+    "INSTRUMENT_CURRENCIES": lambda rules: rules.instrument_currencies
+}
+
+
+def __getattr__(name):
+    if name in _RULE_TABLES:
+        return _RULE_TABLES[name](current_rules())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def default_impact_matcher():
+    """Matcher das regras em uso (compilado junto com o RuleSet)"""
+    return current_rules().matcher
+
+
+class NewsEvent:
+    """Notícia compacta: registro com __slots__ e textos internados
+    
+    Calendários repetem sem parar as mesmas datas, horários, nomes e valores;
+    com sys.intern cada texto distinto fica uma única vez na memória e cada
+    notícia custa só o registro. Também aceita leitura como dicionário
+    (news['name'], news.get('time')) para o código que trata notícias como
+    dict. Não deve ser alterada depois de entrar no analisador: use replace().
+    """
+    __slots__ = ("name", "previous", "consensus", "time", "date")
+    
+    def __init__(self, name, previous="", consensus="", time="", date=""):
+        intern = sys.intern
+        self.name = intern(name)
+        self.previous = intern(previous)
+        self.consensus = intern(consensus)
+        self.time = intern(time)
+        self.date = intern(date)
+        
+    @classmethod
+    def coerce(cls, news):
+        """Converte um dicionário de notícia (ou retorna a própria NewsEvent)"""
+        if isinstance(news, cls):
+            return news
+        return cls(news['name'], news.get('previous', ''), news.get('consensus', ''),
+                   news.get('time', ''), news['date'])
+        
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+        
+    def __contains__(self, key):
+        return key in self.__slots__
+        
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+        
+    def keys(self):
+        return self.__slots__
+        
+    def to_dict(self):
+        return {"name": self.name, "previous": self.previous, "consensus": self.consensus,
+                "time": self.time, "date": self.date}
+        
+    def replace(self, **changes):
+        """Cópia da notícia com os campos informados alterados"""
+        fields = self.to_dict()
+        fields.update(changes)
+        return NewsEvent(**fields)
+        
+    def __eq__(self, other):
+        if not isinstance(other, NewsEvent):
+            return NotImplemented
+        return (self.name == other.name and self.date == other.date and self.time == other.time
+                and self.previous == other.previous and self.consensus == other.consensus)
+        
+    __hash__ = None
+    
+    def __repr__(self):
+        return (f"NewsEvent(name={self.name!r}, previous={self.previous!r}, "
+                f"consensus={self.consensus!r}, time={self.time!r}, date={self.date!r})")
+
+
+class AnalysisProfiler:
+    """Tempos por etapa e contadores das análises (instrumentação opcional)
+    
+    Ativado com NewsAnalyzer.enable_profiling(). Cada análise gera um registro
+    com as durações das etapas (filter, impact, strategy, total e, na
+    interface, render) e os contadores (eventos filtrados, buscas de impacto,
+    acertos e faltas de cache); os totais acumulados ficam em summary().
+    """
+    
+    def __init__(self, history=100):
+        self.stage_seconds = {}
+        self.stage_calls = {}
+        self.counters = {}
+        self.records = deque(maxlen=history)
+        self._lock = threading.Lock()
+        
+    def add_record(self, date, stages, counts):
+        """Registra uma análise: durações por etapa (s) e contadores"""
+        with self._lock:
+            self.records.append({"date": date, "stages": dict(stages), "counts": dict(counts)})
+            self._accumulate(stages, counts)
+            
+    def record_stage(self, stage, seconds, **counts):
+        """Soma uma etapa avulsa (ex.: render) à última análise e aos totais"""
+        with self._lock:
+            if self.records:
+                last = self.records[-1]
+                last["stages"][stage] = last["stages"].get(stage, 0.0) + seconds
+                for name, value in counts.items():
+                    last["counts"][name] = last["counts"].get(name, 0) + value
+            self._accumulate({stage: seconds}, counts)
+            
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            
+    def _accumulate(self, stages, counts):
+        for stage, seconds in stages.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+        for name, value in counts.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+            
+    @property
+    def last(self):
+        """Registro da análise mais recente (ou None)"""
+        with self._lock:
+            return self.records[-1] if self.records else None
+            
+    def summary(self):
+        """Totais acumulados: segundos e chamadas por etapa, e contadores"""
+        with self._lock:
+            return {
+                "stages": {stage: {"seconds": seconds, "calls": self.stage_calls[stage]}
+                           for stage, seconds in self.stage_seconds.items()},
+                "counts": dict(self.counters)
+            }
+            
+    def format_record(self, record):
+        """Resumo de uma linha de um registro, para status/log"""
+        stages = " ".join(f"{stage}={seconds * 1000:.2f}ms" for stage, seconds in record["stages"].items())
+        counts = " ".join(f"{name}={value}" for name, value in record["counts"].items())
+        return f"{record['date']}: {stages} | {counts}"
+        
+    def format_summary(self):
+        """Resumo legível dos totais acumulados"""
+        summary = self.summary()
+        lines = ["Etapa            total (ms)  chamadas  média (ms)"]
+        for stage, data in summary["stages"].items():
+            lines.append(f"{stage:<16} {data['seconds'] * 1000:>10.2f} {data['calls']:>9} "
+                         f"{data['seconds'] * 1000 / data['calls']:>11.3f}")
+        lines.extend(f"{name}: {value}" for name, value in summary["counts"].items())
+        return "\n".join(lines)
+        
+    def reset(self):
+        with self._lock:
+            self.stage_seconds.clear()
+            self.stage_calls.clear()
+            self.counters.clear()
+            self.records.clear()
+
+
+def default_exposure_table():
+    """Tabela de exposição das regras em uso (pares forex, commodities e índices)"""
+    return current_rules().exposure
+
+
+def analyze_chunk(payload):
+    """Analisa um bloco de dias num processo do pool (ver plan_range)"""
+    rules, events = payload
+    analyzer = NewsAnalyzer(rules=rules)
+    analyzer.news_data = events
+    return [(date, analyzer.analyze_confluence(date)) for date in analyzer._sorted_dates]
+
+
+def _changed_dates(old_events, new_events):
+    """Datas cujas notícias diferem entre dois índices por data"""
+    return [date for date in set(old_events) | set(new_events)
+            if old_events.get(date) != new_events.get(date)]
+
+
+def next_day(date):
+    """Dia seguinte a uma data YYYY-MM-DD"""
+    return (Date.fromisoformat(date) + timedelta(days=1)).isoformat()
+
+
+def previous_day(date):
+    """Dia anterior a uma data YYYY-MM-DD"""
+    return (Date.fromisoformat(date) - timedelta(days=1)).isoformat()
+
+
+class NewsAnalyzer:
+    def __init__(self, impact_database=None, cache_size=1024, store=None, rules=None):
+        # Regras de impacto: None segue as regras em uso no processo
+        # (reload_rules); as análises em cache valem para _active_rules
+        if impact_database is not None:
+            rules = (rules or current_rules()).with_database(impact_database)
+        self._rules = rules
+        self._active_rules = None
+        self._news_data = []
+        # Índice por data: data -> notícias do dia, mais as datas ordenadas
+        # para consultas por intervalo
+        self._events_by_date = {}
+        self._sorted_dates = []
+        # Cache LRU de análises por data, invalidado por data alterada
+        self.cache_size = cache_size
+        self._analysis_cache = OrderedDict()
+        self._revision = 0
+        # Instrumentação desligada por padrão (custo: um teste por análise)
+        self.profiler = None
+        self._kill_zone_index = None
+        # Histórico persistente (NewsStore): intervalos [início, fim] de
+        # datas já carregados do disco, disjuntos e em ordem
+        self.news_store = store
+        self._loaded_ranges = []
+        
+    @property
+    def rules(self):
+        """RuleSet usado pelas próximas análises"""
+        return self._rules if self._rules is not None else current_rules()
+        
+    def set_rules(self, rules):
+        """Fixa um RuleSet no analisador (None volta a seguir as regras em uso)"""
+        self._rules = rules
+        self._sync_rules()
+        
+    def _sync_rules(self):
+        """RuleSet da próxima análise; se as regras mudaram descarta o cache
+        
+        Análises em andamento continuam com o RuleSet que já pegaram.
+        """
+        rules = self.rules
+        active = self._active_rules
+        if rules is not active:
+            self._active_rules = rules
+            if active is not None:
+                self.invalidate()
+        return rules
+        
+    @property
+    def impact_database(self):
+        return self.rules.database
+        
+    @property
+    def impact_matcher(self):
+        return self.rules.matcher
+        
+    @property
+    def exposure(self):
+        return self.rules.exposure
+        
+    @property
+    def news_data(self):
+        if self._news_data is None:
+            # Reconstruída depois de replace_dates, em ordem de data
+            self._news_data = [news for date in self._sorted_dates for news in self._events_by_date[date]]
+        return self._news_data
+        
+    @news_data.setter
+    def news_data(self, news_list):
+        """Substitui todas as notícias e reconstrói o índice por data"""
+        self.swap_news_data(self.prepare_news_data(news_list))
+        
+    def prepare_news_data(self, news_list):
+        """Monta a substituição de news_data sem alterar o analisador
+        
+        Converte as notícias, monta o índice por data e compara com o atual;
+        só lê o analisador, então pode rodar numa thread enquanto ele segue
+        em uso. O resultado entra com swap_news_data.
+        """
+        revision = self._revision
+        old_events = self._events_by_date
+        news_data = [NewsEvent.coerce(news) for news in news_list]
+        events_by_date = {}
+        for news in news_data:
+            events_by_date.setdefault(news['date'], []).append(news)
+        changed = _changed_dates(old_events, events_by_date)
+        return news_data, events_by_date, sorted(events_by_date), changed, revision
+        
+    def swap_news_data(self, prepared):
+        """Aplica uma substituição de prepare_news_data (custo constante)
+        
+        Se o analisador mudou depois da preparação, as datas alteradas são
+        comparadas de novo.
+        """
+        news_data, events_by_date, sorted_dates, changed, revision = prepared
+        if revision != self._revision:
+            changed = _changed_dates(self._events_by_date, events_by_date)
+        self._news_data = news_data
+        self._events_by_date = events_by_date
+        self._sorted_dates = sorted_dates
+        # Só as datas cujas notícias mudaram perdem a análise em cache
+        self.invalidate(changed)
+        
+    def add_news(self, news_item):
+        news_item = NewsEvent.coerce(news_item)
+        if self._news_data is not None:
+            self._news_data.append(news_item)
+        date = news_item['date']
+        bucket = self._events_by_date.get(date)
+        if bucket is None:
+            self._events_by_date[date] = [news_item]
+            insort(self._sorted_dates, date)
+        else:
+            bucket.append(news_item)
+        self.invalidate((date,))
+        
+    def extend_news(self, news_items):
+        """Adiciona várias notícias de uma vez (carga em lote)
+        
+        Aceita qualquer iterável, inclusive geradores; as datas novas são
+        ordenadas uma única vez no final em vez de a cada notícia.
+        """
+        touched = set()
+        new_dates = []
+        coerce = NewsEvent.coerce
+        news_data = self.news_data
+        for news in news_items:
+            news = coerce(news)
+            news_data.append(news)
+            date = news['date']
+            bucket = self._events_by_date.get(date)
+            if bucket is None:
+                self._events_by_date[date] = [news]
+                new_dates.append(date)
+            else:
+                bucket.append(news)
+            touched.add(date)
+        if new_dates:
+            self._sorted_dates.extend(new_dates)
+            self._sorted_dates.sort()
+        self.invalidate(touched)
+        
+    def replace_dates(self, events_by_date):
+        """Substitui as notícias das datas informadas (lista vazia remove a data)
+        
+        Só as datas cujas notícias de fato mudaram perdem a análise em cache;
+        retorna essas datas.
+        """
+        changed = []
+        for date, events in events_by_date.items():
+            events = [NewsEvent.coerce(news) for news in events]
+            old = self._events_by_date.get(date)
+            if old == (events or None):
+                continue
+            if events:
+                if old is None:
+                    insort(self._sorted_dates, date)
+                self._events_by_date[date] = events
+            else:
+                del self._events_by_date[date]
+                del self._sorted_dates[bisect_left(self._sorted_dates, date)]
+            changed.append(date)
+        if changed:
+            self._news_data = None
+            self.invalidate(changed)
+        return changed
+        
+    def set_dates(self, events_by_date):
+        """Como replace_dates, gravando também no NewsStore (se houver)
+        
+        As datas informadas passam a valer como carregadas: o que está em
+        memória é o mesmo que foi gravado.
+        """
+        if self.news_store is not None:
+            self.news_store.replace_dates(events_by_date)
+            for date in sorted(events_by_date):
+                self._mark_loaded(date, date)
+        return self.replace_dates(events_by_date)
+        
+    # Histórico persistente
+    
+    def load_range(self, start, end):
+        """Carrega do NewsStore as datas de start a end ainda não carregadas
+        
+        Retorna quantas notícias foram lidas do disco; intervalos já em
+        memória não são lidos de novo. Limites vazios (None ou "") vão até a
+        primeira/última data gravada; datas inválidas não carregam nada.
+        """
+        store = self.news_store
+        if store is None:
+            return 0
+        if not start or not end:
+            first, last = store.date_bounds()
+            if first is None:
+                return 0
+            start = start or first
+            end = end or last
+        if not (is_iso_date(start) and is_iso_date(end)) or start > end:
+            return 0
+            
+        loaded = 0
+        for gap_start, gap_end in self._missing_ranges(start, end):
+            events = store.events(gap_start, gap_end)
+            self.extend_news(events)
+            loaded += len(events)
+        self._mark_loaded(start, end)
+        return loaded
+        
+    def _missing_ranges(self, start, end):
+        gaps = []
+        cursor = start
+        for loaded_start, loaded_end in self._loaded_ranges:
+            if loaded_end < cursor:
+                continue
+            if loaded_start > end:
+                break
+            if loaded_start > cursor:
+                gaps.append((cursor, previous_day(loaded_start)))
+            cursor = next_day(loaded_end)
+            if cursor > end:
+                return gaps
+        gaps.append((cursor, end))
+        return gaps
+        
+    def _mark_loaded(self, start, end):
+        # Intervalos sobrepostos ou vizinhos viram um só
+        before, after = previous_day(start), next_day(end)
+        merged = []
+        for loaded_start, loaded_end in self._loaded_ranges:
+            if loaded_end < before or loaded_start > after:
+                merged.append((loaded_start, loaded_end))
+            else:
+                start = min(start, loaded_start)
+                end = max(end, loaded_end)
+        merged.append((start, end))
+        merged.sort()
+        self._loaded_ranges = merged
+        
+    def _unmark_loaded(self, start, end):
+        # Tira [start, end] dos intervalos carregados, partindo os que o contêm
+        remaining = []
+        for loaded_start, loaded_end in self._loaded_ranges:
+            if loaded_end < start or loaded_start > end:
+                remaining.append((loaded_start, loaded_end))
+                continue
+            if loaded_start < start:
+                remaining.append((loaded_start, previous_day(start)))
+            if loaded_end > end:
+                remaining.append((next_day(end), loaded_end))
+        self._loaded_ranges = remaining
+        
+    def release_range(self, start, end, keep=()):
+        """Descarta da memória as datas de start a end (continuam no NewsStore)
+        
+        As datas voltam a ser lidas do disco se forem analisadas de novo;
+        as datas em `keep` ficam em memória. Retorna quantas notícias foram
+        descartadas.
+        """
+        if self.news_store is None:
+            raise RuntimeError("nenhum NewsStore associado ao analisador")
+        keep = set(keep)
+        dates = [date for date in self.dates_between(start, end) if date not in keep]
+        released = sum(len(self._events_by_date[date]) for date in dates)
+        self.replace_dates({date: [] for date in dates})
+        self._unmark_loaded(start, end)
+        for date in sorted(keep):
+            if start <= date <= end:
+                self._mark_loaded(date, date)
+        return released
+        
+    def _is_loaded(self, date):
+        # Último intervalo que começa em date ou antes
+        ranges = self._loaded_ranges
+        position = bisect_right(ranges, (date, "\uffff")) - 1
+        return position >= 0 and ranges[position][1] >= date
+        
+    def save_news(self, news_items, replace_dates=False):
+        """Grava notícias no NewsStore numa transação e atualiza a memória
+        
+        Com replace_dates=True cada data recebida passa a ter exatamente as
+        notícias informadas. Datas já carregadas são relidas do disco (só
+        as alteradas perdem a análise em cache); as demais são carregadas
+        sob demanda. Retorna as datas gravadas.
+        """
+        if self.news_store is None:
+            raise RuntimeError("nenhum NewsStore associado ao analisador")
+        touched = self.news_store.insert_many(news_items, replace_dates=replace_dates)
+        loaded = sorted(date for date in touched if self._is_loaded(date))
+        if loaded:
+            reloaded = {date: [] for date in loaded}
+            for news in self.news_store.events(loaded[0], loaded[-1]):
+                if news.date in reloaded:
+                    reloaded[news.date].append(news)
+            self.replace_dates(reloaded)
+        return touched
+        
+    def invalidate(self, dates=None):
+        """Descarta as análises em cache das datas informadas (ou de todas)"""
+        self._revision += 1
+        self._kill_zone_index = None
+        if dates is None:
+            self._analysis_cache.clear()
+            return
+        for date in dates:
+            self._analysis_cache.pop(date, None)
+            
+    def _cache_result(self, date, analysis):
+        if self.cache_size <= 0:
+            return
+        self._analysis_cache[date] = analysis
+        self._analysis_cache.move_to_end(date)
+        while len(self._analysis_cache) > self.cache_size:
+            self._analysis_cache.popitem(last=False)
+            
+    @property
+    def dates(self):
+        """Datas com notícias, em ordem"""
+        return list(self._sorted_dates)
+        
+    def events_on(self, date):
+        """Retorna as notícias de uma data (lista vazia se não houver)"""
+        return list(self._events_by_date.get(date, ()))
+        
+    def events_between(self, start, end):
+        """Retorna as notícias entre start e end (inclusive), em ordem de data"""
+        lo = bisect_left(self._sorted_dates, start)
+        hi = bisect_right(self._sorted_dates, end)
+        events = []
+        for date in self._sorted_dates[lo:hi]:
+            events.extend(self._events_by_date[date])
+        return events
+        
+    def dates_between(self, start, end):
+        """Retorna as datas com notícias entre start e end (inclusive)"""
+        lo = bisect_left(self._sorted_dates, start)
+        hi = bisect_right(self._sorted_dates, end)
+        return self._sorted_dates[lo:hi]
+        
+    def analyze_confluence(self, date):
+        """Analisa confluência de notícias para uma data específica
+        
+        Resultados ficam em cache até a data ser alterada; o dicionário
+        retornado é compartilhado e deve ser tratado como somente leitura.
+        """
+        if self.news_store is not None and is_iso_date(date) and not self._is_loaded(date):
+            self.load_range(date, date)
+        rules = self._sync_rules()
+        profiler = self.profiler
+        if profiler is not None:
+            return self._analyze_profiled(date, profiler, rules)
+            
+        cached = self._analysis_cache.get(date)
+        if cached is not None:
+            self._analysis_cache.move_to_end(date)
+            return cached
+            
+        analysis = self._compute_confluence(date, rules)
+        self._cache_result(date, analysis)
+        return analysis
+        
+    def kill_zone_index(self):
+        """Índice de kill zones do calendário (reconstruído após alterações)"""
+        rules = self._sync_rules()
+        index = self._kill_zone_index
+        if index is None:
+            from kill_zones import KillZoneIndex
+            index = self._kill_zone_index = KillZoneIndex(self.news_data, rules.match)
+        return index
+        
+    def rolling_confluence(self, start, end, days=7, step=1):
+        """Confluência em janelas móveis de `days` dias (ver confluence_window)
+        
+        Gera (data final, resumo) para cada janela que termina entre start e
+        end; os agregados são atualizados dia a dia, sem reagregar a janela.
+        """
+        from confluence_window import rolling_confluence
+        return rolling_confluence(self, start, end, days, step)
+        
+    def surprise_scores(self, start=None, end=None):
+        """Surpresa esperada e desvio das notícias do intervalo (ver surprise; requer NumPy)"""
+        from surprise import SurpriseTable
+        self.load_range(start, end)
+        # Pelo índice de datas: a tabela busca intervalos por data (news_data
+        # está na ordem de inserção)
+        events = self.events_between(start or "", end or "\uffff")
+        return SurpriseTable(events, self._sync_rules().match)
+        
+    def enable_profiling(self, profiler=None):
+        """Liga a instrumentação por etapa; retorna o AnalysisProfiler em uso"""
+        self.profiler = profiler if profiler is not None else AnalysisProfiler()
+        return self.profiler
+        
+    def disable_profiling(self):
+        self.profiler = None
+        
+    def _analyze_profiled(self, date, profiler, rules):
+        started = perf_counter()
+        cached = self._analysis_cache.get(date)
+        if cached is not None:
+            self._analysis_cache.move_to_end(date)
+            profiler.add_record(date, {"total": perf_counter() - started}, {"cache_hits": 1})
+            return cached
+            
+        stages = {}
+        counts = {"cache_misses": 1}
+        analysis = self._compute_confluence(date, rules, stages, counts)
+        self._cache_result(date, analysis)
+        stages["total"] = perf_counter() - started
+        profiler.add_record(date, stages, counts)
+        return analysis
+        
+    def _compute_confluence(self, date, rules, stages=None, counts=None):
+        # stages/counts só são passados com a instrumentação ligada
+        if stages is not None:
+            mark = perf_counter()
+        daily_news = self._events_by_date.get(date, [])
+        if stages is not None:
+            now = perf_counter()
+            stages["filter"] = now - mark
+            mark = now
+            counts["events_filtered"] = len(daily_news)
+        
+        if not daily_news:
+            return {"error": "Nenhuma notícia encontrada para esta data"}
+            
+        # Análise de impacto
+        high_impact_news = []
+        medium_impact_news = []
+        currencies_affected = set()
+        pairs_affected = set()
+        instruments_affected = set()
+        
+        match = rules.match
+        for news in daily_news:
+            impact_info = match(news['name'])
+            if impact_info:
+                # Cópia: a notícia armazenada não é alterada pela análise
+                news = news.to_dict()
+                news['impact_info'] = impact_info
+                
+                if impact_info['impact'] in HIGH_IMPACT_LEVELS:
+                    high_impact_news.append(news)
+                elif impact_info['impact'] == 'MEDIUM':
+                    medium_impact_news.append(news)
+                    
+                # Coletar moedas e pares afetados
+                if 'currencies' in impact_info:
+                    currencies_affected.update(impact_info['currencies'])
+                if 'pairs_affected' in impact_info:
+                    pairs_affected.update(impact_info['pairs_affected'])
+                if 'instruments' in impact_info:
+                    instruments_affected.update(impact_info['instruments'])
+        
+        if stages is not None:
+            now = perf_counter()
+            stages["impact"] = now - mark
+            mark = now
+            counts["lookups"] = len(daily_news)
+            counts["matched"] = len(high_impact_news) + len(medium_impact_news)
+            
+        # Determinar melhor estratégia
+        strategy = self.determine_trading_strategy(high_impact_news, medium_impact_news, 
+                                                 currencies_affected, pairs_affected, rules.exposure)
+        if stages is not None:
+            stages["strategy"] = perf_counter() - mark
+        
+        return {
+            "date": date,
+            "high_impact_news": high_impact_news,
+            "medium_impact_news": medium_impact_news,
+            "currencies_affected": sorted(currencies_affected),
+            "pairs_affected": sorted(pairs_affected),
+            "instruments_affected": sorted(instruments_affected),
+            "strategy": strategy
+        }
+    
+    def analyze_range(self, start, end, workers=1, chunk_size=None):
+        """Analisa todas as datas com notícias entre start e end (inclusive)
+        
+        Gera tuplas (data, análise) à medida que cada dia fica pronto, com o
+        mesmo resultado de analyze_confluence dia a dia. Com workers > 1 as
+        datas são divididas em blocos num pool de processos e os dias chegam
+        fora de ordem; workers=None usa um processo por CPU.
+        """
+        self.load_range(start, end)
+        dates = self.dates_between(start, end)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(dates) < 2:
+            for date in dates:
+                yield date, self.analyze_confluence(date)
+            return
+            
+        # Alguns blocos por processo para balancear dias mais carregados
+        cached, payloads, revision = self.plan_range(start, end, chunks=workers * 4, chunk_size=chunk_size)
+        yield from cached
+        if not payloads:
+            return
+            
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=min(workers, len(payloads))) as executor:
+            futures = [executor.submit(analyze_chunk, payload) for payload in payloads]
+            try:
+                for future in as_completed(futures):
+                    results = future.result()
+                    self.store_results(results, revision)
+                    yield from results
+            finally:
+                # Consumidor parou antes do fim: não processar o restante
+                for future in futures:
+                    future.cancel()
+                    
+    def stream_range(self, start, end, chunk_dates=256):
+        """Como analyze_range em série, lendo o NewsStore em blocos de datas
+        
+        Cada bloco de `chunk_dates` datas é carregado, analisado e descartado
+        antes do próximo, então a memória não cresce com o intervalo; o que
+        já estava em memória antes da chamada fica. Sem NewsStore é o próprio
+        analyze_range.
+        """
+        store = self.news_store
+        if store is None:
+            yield from self.analyze_range(start, end)
+            return
+        dates = set(store.dates(start or None, end or None))
+        dates.update(self.dates_between(start or "", end or "\uffff"))
+        dates = sorted(dates)
+        for offset in range(0, len(dates), chunk_dates):
+            chunk = dates[offset:offset + chunk_dates]
+            gaps = self._missing_ranges(chunk[0], chunk[-1])
+            # Notícias em memória que podem não estar no NewsStore (add_news,
+            # extend_news): nunca são descartadas
+            resident = self.dates_between(chunk[0], chunk[-1])
+            self.load_range(chunk[0], chunk[-1])
+            try:
+                for date in chunk:
+                    yield date, self.analyze_confluence(date)
+            finally:
+                for gap_start, gap_end in gaps:
+                    self.release_range(gap_start, gap_end, keep=resident)
+                    
+    def plan_range(self, start, end, chunks=1, chunk_size=None):
+        """Prepara a análise de um intervalo para execução fora do processo
+        
+        Retorna (em_cache, blocos, revisão): os pares (data, análise) já em
+        cache, os blocos de trabalho para analyze_chunk (picklable, só com as
+        notícias dos dias pendentes) e a revisão do calendário a ser passada
+        a store_results quando os blocos terminarem.
+        """
+        self.load_range(start, end)
+        rules = self._sync_rules()
+        cached = []
+        pending = []
+        for date in self.dates_between(start, end):
+            analysis = self._analysis_cache.get(date)
+            if analysis is None:
+                pending.append(date)
+            else:
+                cached.append((date, analysis))
+        if self.profiler is not None:
+            # Os processos do pool não são instrumentados: só acertos/faltas de cache
+            self.profiler.count("cache_hits", len(cached))
+            self.profiler.count("cache_misses", len(pending))
+            
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(pending) // max(1, chunks)))
+        payloads = []
+        for i in range(0, len(pending), chunk_size):
+            events = []
+            for date in pending[i:i + chunk_size]:
+                events.extend(self._events_by_date[date])
+            payloads.append((rules, events))
+        return cached, payloads, self._revision
+        
+    def store_results(self, results, revision):
+        """Guarda no cache resultados de analyze_chunk, se o calendário não mudou"""
+        # Não guardar resultados de dias alterados (ou de regras trocadas)
+        # no meio do caminho
+        self._sync_rules()
+        if self._revision != revision:
+            return False
+        for date, analysis in results:
+            self._cache_result(date, analysis)
+        return True
+    
+    def get_news_impact(self, news_name):
+        """Identifica o impacto de uma notícia específica"""
+        return self.rules.match(news_name)
+    
+    def determine_trading_strategy(self, high_impact, medium_impact, currencies, pairs, exposure=None):
+        """Determina a melhor estratégia de trading baseada na confluência"""
+        if exposure is None:
+            exposure = self.exposure
+        strategy = {
+            "recommended_pairs": [],
+            "avoid_pairs": [],
+            "recommended_instruments": [],
+            "session_focus": [],
+            "risk_level": "MEDIUM",
+            "notes": []
+        }
+        
+        if len(high_impact) >= 2:
+            strategy["risk_level"] = "HIGH"
+            strategy["notes"].append("Múltiplas notícias de alto impacto - volatilidade esperada")
+            
+        # Recomendar pares baseado nas moedas afetadas
+        if "USD" in currencies:
+            usd_high_impact = 0
+            for news in high_impact:
+                if "USD" in news.get('impact_info', {}).get('currencies', ()):
+                    usd_high_impact += 1
+            if usd_high_impact >= 2:
+                strategy["recommended_pairs"].extend(["EURUSD", "GBPUSD", "USDJPY"])
+                strategy["session_focus"].append("NY_AM")
+                
+        if "JPY" in currencies:
+            strategy["recommended_pairs"].extend(["USDJPY", "EURJPY", "GBPJPY"])
+            strategy["session_focus"].append("London")
+            
+        # Evitar pares com conflito de notícias (base e cotação afetadas)
+        strategy["avoid_pairs"] = exposure.conflicting_pairs(currencies)
+        
+        # Remover duplicatas
+        strategy["recommended_pairs"] = list(dict.fromkeys(strategy["recommended_pairs"]))
+        
+        return strategy
+
+
+def main(argv=None):
+    """Entrada de linha de comando: analisa um calendário e escreve JSON por data"""
+    import argparse
+    import json
+    
+    from calendar_importer import date_argument
+    
+    parser = argparse.ArgumentParser(
+        description="Analisa a confluência de notícias de um calendário e escreve o resultado por data em JSON.")
+    parser.add_argument("calendar", nargs="?", help="arquivo do calendário (.csv, .jsonl ou .json)")
+    parser.add_argument("--date", type=date_argument, help="analisar apenas esta data (YYYY-MM-DD)")
+    parser.add_argument("--start", type=date_argument, help="primeira data do intervalo (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date_argument, help="última data do intervalo (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processos para análise do intervalo (0 = um por CPU)")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--profile", action="store_true",
+                        help="mostra no stderr o tempo por etapa da análise")
+    parser.add_argument("--db", help="histórico SQLite: o calendário é gravado nele e só o "
+                                     "intervalo analisado é carregado em memória")
+    parser.add_argument("--rules", help="arquivo de regras de impacto (padrão: impact_rules.json)")
+    parser.add_argument("--window", type=int, metavar="DIAS",
+                        help="confluência em janelas móveis de DIAS dias (resultado por data final)")
+    args = parser.parse_args(argv)
+    if args.window is not None and args.window < 1:
+        parser.error("--window deve ser pelo menos 1")
+    if args.rules:
+        from impact_rules import reload_rules
+        try:
+            reload_rules(args.rules)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        
+    from news_store import open_cli_analyzer
+    
+    analyzer, store, start, end = open_cli_analyzer(parser, args.calendar, args.db,
+                                                    args.date or args.start, args.date or args.end)
+    if args.profile:
+        analyzer.enable_profiling()
+        
+    if args.window:
+        results = dict(analyzer.rolling_confluence(start, end, days=args.window)) if start else {}
+    else:
+        results = dict(sorted(analyzer.analyze_range(start, end, workers=args.workers or None)))
+    if args.date and not results:
+        results[args.date] = analyzer.analyze_confluence(args.date)
+        
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        json.dump(results, output, ensure_ascii=False, indent=2)
+        output.write("\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if args.profile:
+        print(analyzer.profiler.format_summary(), file=sys.stderr)
+    if store is not None:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""Histórico persistente de notícias em SQLite
+
+Guarda o calendário em disco, indexado por data, moeda e impacto, para que o
+analisador carregue só o intervalo que vai analisar e para que reinícios e
+consultas históricas não exijam importar o calendário de novo.
+
+    store = NewsStore("historico.sqlite3")
+    store.insert_many(iter_calendar("calendario.csv"))
+    analyzer = NewsAnalyzer(store=store)
+    analyzer.analyze_confluence("2025-06-16")   # carrega só este dia do disco
+
+A classificação de impacto é feita uma vez por título distinto (tabela
+headlines), não por notícia, e acompanha as regras de impacto em uso: quando
+elas mudam (reload_rules ou outro arquivo de regras) os títulos são
+reclassificados na próxima gravação ou consulta por impacto/moeda.
+"""
+import sqlite3
+import sys
+import threading
+
+from impact_rules import current_rules
+from news_analyzer import NewsEvent
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    previous TEXT NOT NULL DEFAULT '',
+    consensus TEXT NOT NULL DEFAULT '',
+    occurrence INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (date, time, name, previous, consensus, occurrence)
+);
+CREATE INDEX IF NOT EXISTS events_name_date ON events (name, date);
+CREATE TABLE IF NOT EXISTS headlines (
+    name TEXT PRIMARY KEY,
+    impact TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS headlines_impact ON headlines (impact, name);
+CREATE TABLE IF NOT EXISTS headline_currencies (
+    currency TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (currency, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+# Notícias de uma gravação passam por uma tabela temporária; cópias
+# idênticas dentro da mesma gravação (mesmo título e valores publicados para
+# países diferentes, em calendários sem a coluna de moeda) são numeradas em
+# `occurrence` e todas ficam gravadas, como na análise em memória. Uma
+# notícia já gravada com o mesmo número é ignorada: reimportar o mesmo
+# calendário não duplica notícias
+STAGING_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS incoming (
+    date TEXT, time TEXT, name TEXT, previous TEXT, consensus TEXT
+);
+"""
+STAGE_EVENT = "INSERT INTO incoming (date, time, name, previous, consensus) VALUES (?, ?, ?, ?, ?)"
+INSERT_STAGED = """
+INSERT OR IGNORE INTO events (date, time, name, previous, consensus, occurrence)
+SELECT date, time, name, previous, consensus,
+       ROW_NUMBER() OVER (PARTITION BY date, time, name, previous, consensus ORDER BY rowid) - 1
+FROM incoming ORDER BY rowid
+"""
+
+EVENT_COLUMNS = "e.name, e.previous, e.consensus, e.time, e.date"
+
+
+def _date_filter(column, start, end, conditions, params):
+    if start is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append(f"{column} <= ?")
+        params.append(end)
+
+
+def _where(conditions):
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+class NewsStore:
+    """Notícias persistidas em SQLite, com consultas por data, moeda e impacto
+
+    Uma conexão compartilhada entre threads e protegida por trava: a
+    interface grava e lê a partir das threads de trabalho. Sem `impact_of`
+    os títulos são classificados pelas regras de impacto em uso.
+    """
+
+    def __init__(self, path=":memory:", impact_of=None):
+        self.path = path
+        self.impact_of = impact_of
+        # RuleSet que classificou os títulos (com impact_of=None)
+        self._rules = None
+        self._match = impact_of
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            cursor = self._connection.cursor()
+            if path != ":memory:":
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.executescript(SCHEMA + STAGING_SCHEMA)
+            cursor.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._headlines = {name for (name,) in cursor.execute("SELECT name FROM headlines")}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _sync_classification(self):
+        """Reclassifica os títulos se as regras de impacto em uso mudaram
+        
+        O conteúdo das regras que classificaram o arquivo fica na tabela meta,
+        então um histórico aberto com outro arquivo de regras também é refeito.
+        """
+        if self.impact_of is not None:
+            return
+        rules = current_rules()
+        if rules is self._rules:
+            return
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'rules_digest'").fetchone()
+            self._match = rules.match
+            self._rules = rules
+            if row is None or row[0] != rules.digest:
+                self._reclassify()
+                
+    def _classify(self, cursor, names):
+        """Registra impacto e moedas dos títulos ainda não vistos
+
+        Só grava no banco: quem chama acrescenta os títulos a _headlines
+        depois do COMMIT, para que um ROLLBACK não os deixe marcados como
+        classificados sem a linha em headlines.
+        """
+        headlines = []
+        currencies = []
+        for name in names:
+            impact_info = self._match(name)
+            headlines.append((name, impact_info['impact'] if impact_info else None))
+            if impact_info:
+                currencies.extend((currency, name) for currency in impact_info.get('currencies', ()))
+        cursor.executemany("INSERT OR REPLACE INTO headlines (name, impact) VALUES (?, ?)", headlines)
+        cursor.executemany("INSERT OR IGNORE INTO headline_currencies (currency, name) VALUES (?, ?)",
+                           currencies)
+
+    def insert_many(self, events, batch_size=10000, replace_dates=False):
+        """Grava as notícias numa única transação; retorna as datas alteradas
+
+        Aceita qualquer iterável (inclusive geradores), gravado em lotes.
+        Com replace_dates=True as notícias já gravadas nas datas recebidas são
+        apagadas antes, e cada data passa a ter exatamente as notícias novas.
+        """
+        touched = set()
+        classified = set()
+        self._sync_classification()
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                batch = []
+                for news in events:
+                    news = NewsEvent.coerce(news)
+                    batch.append((news.date, news.time, news.name, news.previous, news.consensus))
+                    if len(batch) >= batch_size:
+                        self._write_batch(cursor, batch, touched, replace_dates, classified)
+                        batch = []
+                if batch:
+                    self._write_batch(cursor, batch, touched, replace_dates, classified)
+                self._insert_staged(cursor)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            self._headlines.update(classified)
+        return touched
+
+    def _write_batch(self, cursor, batch, touched, replace_dates, classified):
+        dates = {row[0] for row in batch}
+        if replace_dates:
+            cursor.executemany("DELETE FROM events WHERE date = ?",
+                               [(date,) for date in dates - touched])
+        touched.update(dates)
+        cursor.executemany(STAGE_EVENT, batch)
+        new_names = {row[2] for row in batch} - self._headlines - classified
+        if new_names:
+            self._classify(cursor, new_names)
+            classified.update(new_names)
+
+    @staticmethod
+    def _insert_staged(cursor):
+        cursor.execute(INSERT_STAGED)
+        cursor.execute("DELETE FROM incoming")
+
+    def replace_dates(self, events_by_date):
+        """Numa transação, cada data informada passa a ter exatamente as notícias dadas"""
+        self._sync_classification()
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.executemany("DELETE FROM events WHERE date = ?", [(date,) for date in events_by_date])
+                batch = [(news.date, news.time, news.name, news.previous, news.consensus)
+                         for events in events_by_date.values() for news in map(NewsEvent.coerce, events)]
+                classified = set()
+                if batch:
+                    self._write_batch(cursor, batch, set(), False, classified)
+                    self._insert_staged(cursor)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            self._headlines.update(classified)
+
+    def delete_dates(self, dates):
+        """Apaga as notícias das datas informadas"""
+        with self._lock:
+            with self._connection:
+                self._connection.executemany("DELETE FROM events WHERE date = ?",
+                                             [(date,) for date in dates])
+
+    def reclassify(self, impact_of=None):
+        """Refaz a classificação de todos os títulos com impact_of (ou a atual)
+        
+        Com as regras em uso (impact_of=None) não é preciso chamar: a troca de
+        regras é detectada sozinha.
+        """
+        with self._lock:
+            if impact_of is not None:
+                self.impact_of = self._match = impact_of
+                self._rules = None
+            elif self.impact_of is None:
+                self._rules = current_rules()
+                self._match = self._rules.match
+            self._reclassify()
+            
+    def _reclassify(self):
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("DELETE FROM headline_currencies")
+                cursor.execute("DELETE FROM headlines")
+                names = [name for (name,) in cursor.execute("SELECT DISTINCT name FROM events")]
+                self._classify(cursor, names)
+                if self._rules is not None:
+                    cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rules_digest', ?)",
+                                   (self._rules.digest,))
+                else:
+                    cursor.execute("DELETE FROM meta WHERE key = 'rules_digest'")
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            self._headlines = set(names)
+
+    def events(self, start=None, end=None, currency=None, impacts=None):
+        """Notícias por intervalo (inclusive), moeda e/ou nível de impacto
+
+        `impacts` é um nível ("HIGH") ou uma sequência de níveis. Ordem de
+        data e, dentro do dia, de gravação.
+        """
+        if currency is not None or impacts is not None:
+            self._sync_classification()
+        joins = []
+        conditions = []
+        params = []
+        if currency is not None:
+            joins.append("JOIN headline_currencies c ON c.name = e.name AND c.currency = ?")
+            params.append(currency)
+        if impacts is not None:
+            if isinstance(impacts, str):
+                impacts = (impacts,)
+            joins.append(f"JOIN headlines h ON h.name = e.name AND h.impact IN ({', '.join('?' * len(impacts))})")
+            params.extend(impacts)
+        _date_filter("e.date", start, end, conditions, params)
+        query = f"SELECT {EVENT_COLUMNS} FROM events e {' '.join(joins)}{_where(conditions)} ORDER BY e.date, e.id"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [NewsEvent(*row) for row in rows]
+
+    def dates(self, start=None, end=None):
+        """Datas com notícias gravadas, em ordem"""
+        conditions = []
+        params = []
+        _date_filter("date", start, end, conditions, params)
+        query = f"SELECT DISTINCT date FROM events{_where(conditions)} ORDER BY date"
+        with self._lock:
+            return [date for (date,) in self._connection.execute(query, params)]
+
+    def date_bounds(self):
+        """(primeira, última) data gravada, ou (None, None) se vazio"""
+        with self._lock:
+            return self._connection.execute("SELECT MIN(date), MAX(date) FROM events").fetchone()
+
+    def impact_counts(self, start=None, end=None):
+        """Quantidade de notícias por nível de impacto no intervalo (None = sem impacto)"""
+        self._sync_classification()
+        conditions = []
+        params = []
+        _date_filter("e.date", start, end, conditions, params)
+        query = (f"SELECT h.impact, COUNT(*) FROM events e JOIN headlines h ON h.name = e.name"
+                 f"{_where(conditions)} GROUP BY h.impact")
+        with self._lock:
+            return dict(self._connection.execute(query, params).fetchall())
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+def open_cli_analyzer(parser, calendar=None, db=None, start=None, end=None, **options):
+    """Analisador das CLIs com calendário e/ou --db; retorna (analisador, store, início, fim)
+
+    Com --db o calendário é gravado no histórico (e carregado sob demanda);
+    sem, é importado em memória. Início e fim ausentes vão da primeira à
+    última data disponível ("" se não há nenhuma). Erros saem por
+    parser.error; `options` vão para o NewsAnalyzer.
+    """
+    from calendar_importer import ImportStats, import_calendar, iter_calendar
+    from news_analyzer import NewsAnalyzer
+
+    if not calendar and not db:
+        parser.error("informe um calendário e/ou --db")
+    store = None
+    if db:
+        try:
+            store = NewsStore(db)
+        except (OSError, sqlite3.Error) as exc:
+            parser.error(f"histórico indisponível em {db}: {exc}")
+    analyzer = NewsAnalyzer(store=store, **options)
+    if calendar:
+        try:
+            if store is None:
+                stats = import_calendar(calendar, analyzer)
+            else:
+                stats = ImportStats()
+                store.insert_many(iter_calendar(calendar, stats))
+        except (OSError, ValueError) as exc:
+            if store is not None:
+                store.close()
+            parser.error(str(exc))
+        print(stats.summary(), file=sys.stderr)
+
+    if store is not None:
+        first, last = store.date_bounds()
+    else:
+        dates = analyzer.dates
+        first, last = (dates[0], dates[-1]) if dates else (None, None)
+    return analyzer, store, start or first or "", end or last or ""
@@ -0,0 +1,320 @@
+"""Exportação de relatórios em lote (JSON Lines, CSV e HTML)
+
+Escreve as análises de um intervalo direto no arquivo, dia a dia, sem montar
+o resultado completo nem nenhum widget: a memória fica limitada a uma linha
+(relatório diário) ou ao resumo do período corrente (semanal, mensal, anual),
+seja o intervalo de uma semana ou de décadas. Com histórico (NewsStore) as
+notícias também são lidas do disco em blocos de datas e descartadas depois de
+escritas.
+
+    export_report(analyzer, "relatorio_2024.html", "2024-01-01", "2024-12-31", period="weekly")
+
+    python report_export.py calendario.csv --period yearly -o anual.csv
+    python report_export.py --db historico.sqlite3 --start 2024-01-01 -o dias.jsonl
+
+No JSON Lines diário cada linha é a análise completa de analyze_confluence; no
+CSV e no HTML, e nos relatórios por período, as linhas são resumos.
+"""
+import csv
+import html
+import json
+import os
+import sys
+from datetime import date as Date
+
+from confluence_window import day_contribution
+
+PERIODS = ("daily", "weekly", "monthly", "yearly")
+PERIOD_TITLES = {"daily": "diário", "weekly": "semanal", "monthly": "mensal", "yearly": "anual"}
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".html": "html", ".htm": "html"}
+
+DAILY_COLUMNS = ("date", "risk_level", "high_impact", "medium_impact", "currencies_affected",
+                 "pairs_affected", "instruments_affected", "recommended_pairs", "avoid_pairs",
+                 "session_focus", "high_impact_news")
+PERIOD_COLUMNS = ("period", "start", "end", "days", "events", "impact_counts", "currency_counts",
+                  "high_risk_days", "high_impact_days", "recommended_pairs", "avoid_pairs")
+
+COLUMN_TITLES = {
+    "date": "Data", "risk_level": "Risco", "high_impact": "Alto impacto", "medium_impact": "Médio impacto",
+    "currencies_affected": "Moedas", "pairs_affected": "Pares afetados",
+    "instruments_affected": "Instrumentos", "recommended_pairs": "Pares recomendados",
+    "avoid_pairs": "Pares a evitar", "session_focus": "Sessões", "high_impact_news": "Notícias de alto impacto",
+    "period": "Período", "start": "Início", "end": "Fim", "days": "Dias", "events": "Notícias",
+    "impact_counts": "Por impacto", "currency_counts": "Por moeda", "high_risk_days": "Dias de risco alto",
+    "high_impact_days": "Dias com alto impacto"
+}
+
+
+def period_key(date, period):
+    """Rótulo do período de uma data: 2024-06-17, 2024-W25, 2024-06 ou 2024"""
+    if period == "daily":
+        return date
+    if period == "weekly":
+        year, week, _ = Date.fromisoformat(date).isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "monthly":
+        return date[:7]
+    if period == "yearly":
+        return date[:4]
+    raise ValueError(f"período desconhecido: {period} (use {', '.join(PERIODS)})")
+
+
+def daily_row(analysis):
+    """Resumo de uma linha de uma análise de analyze_confluence"""
+    strategy = analysis.get("strategy", {})
+    return {
+        "date": analysis["date"],
+        "risk_level": strategy.get("risk_level"),
+        "high_impact": len(analysis["high_impact_news"]),
+        "medium_impact": len(analysis["medium_impact_news"]),
+        "currencies_affected": analysis["currencies_affected"],
+        "pairs_affected": analysis["pairs_affected"],
+        "instruments_affected": analysis["instruments_affected"],
+        "recommended_pairs": strategy.get("recommended_pairs", []),
+        "avoid_pairs": strategy.get("avoid_pairs", []),
+        "session_focus": strategy.get("session_focus", []),
+        "high_impact_news": [f"{news['time']} {news['name']}".strip() for news in analysis["high_impact_news"]]
+    }
+
+
+class PeriodSummary:
+    """Resumo de um período, acumulado dia a dia (só contagens)"""
+
+    def __init__(self, key):
+        self.key = key
+        self.start = None
+        self.end = None
+        self.days = 0
+        self.events = 0
+        self.impact_counts = {}
+        self.currency_counts = {}
+        self.high_risk_days = 0
+        self.high_impact_days = 0
+        self.recommended_pairs = {}
+        self.avoid_pairs = {}
+
+    def add(self, date, analysis):
+        contribution = day_contribution(analysis)
+        if contribution is None:
+            return
+        impacts, currencies, _, _, high = contribution
+        self.start = self.start or date
+        self.end = date
+        self.days += 1
+        self.events += sum(impacts.values())
+        _count(self.impact_counts, impacts)
+        _count(self.currency_counts, currencies)
+        strategy = analysis.get("strategy", {})
+        self.high_risk_days += strategy.get("risk_level") == "HIGH"
+        self.high_impact_days += high
+        # Pares contados em dias: quantos dias do período recomendaram/evitaram cada um
+        _count(self.recommended_pairs, dict.fromkeys(strategy.get("recommended_pairs", ()), 1))
+        _count(self.avoid_pairs, dict.fromkeys(strategy.get("avoid_pairs", ()), 1))
+
+    def record(self):
+        return {
+            "period": self.key, "start": self.start, "end": self.end, "days": self.days,
+            "events": self.events,
+            "impact_counts": dict(sorted(self.impact_counts.items())),
+            "currency_counts": _by_count(self.currency_counts),
+            "high_risk_days": self.high_risk_days,
+            "high_impact_days": self.high_impact_days,
+            "recommended_pairs": _by_count(self.recommended_pairs),
+            "avoid_pairs": _by_count(self.avoid_pairs)
+        }
+
+
+def _count(totals, counts):
+    for key, value in counts.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+def _by_count(counts):
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def iter_records(results, period="daily", full=False):
+    """Registros do relatório a partir de pares (data, análise) em ordem de data
+
+    Diário: um resumo por dia (ou a análise completa com full=True). Demais
+    períodos: um resumo por período, emitido assim que o período termina.
+    """
+    if period == "daily":
+        for _, analysis in results:
+            if "error" not in analysis:
+                yield analysis if full else daily_row(analysis)
+        return
+    summary = None
+    for date, analysis in results:
+        key = period_key(date, period)
+        if summary is None or key != summary.key:
+            if summary is not None and summary.days:
+                yield summary.record()
+            summary = PeriodSummary(key)
+        summary.add(date, analysis)
+    if summary is not None and summary.days:
+        yield summary.record()
+
+
+def format_cell(value):
+    """Texto de uma célula: listas separadas por vírgula, contagens como "USD 12" """
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return ", ".join(f"{key} {count}" for key, count in value.items())
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+class JsonLinesWriter:
+    def __init__(self, stream, columns=None, title=None):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False))
+        self.stream.write("\n")
+
+    def close(self, count):
+        pass
+
+
+class CsvWriter:
+    def __init__(self, stream, columns, title=None):
+        self.columns = columns
+        self.writer = csv.writer(stream, lineterminator="\n")
+        self.writer.writerow(columns)
+
+    def write(self, record):
+        self.writer.writerow([format_cell(record.get(column)) for column in self.columns])
+
+    def close(self, count):
+        pass
+
+
+HTML_STYLE = """
+body { font-family: "Segoe UI", Arial, sans-serif; margin: 24px; color: #1f2933; background: #f5f7fa; }
+h1 { font-size: 20px; margin: 0 0 4px; }
+p.meta { color: #616e7c; margin: 0 0 16px; font-size: 13px; }
+table { border-collapse: collapse; width: 100%; background: #fff; font-size: 13px; }
+th { position: sticky; top: 0; background: #243b53; color: #fff; text-align: left; padding: 6px 8px; }
+td { border-bottom: 1px solid #e4e7eb; padding: 5px 8px; vertical-align: top; }
+tr:nth-child(even) td { background: #f8fafc; }
+tr.risk-high td { background: #fff1f0; }
+td.number { text-align: right; font-variant-numeric: tabular-nums; }
+"""
+
+
+class HtmlWriter:
+    """HTML autocontido (estilo embutido, sem scripts nem arquivos externos)"""
+
+    NUMBER_COLUMNS = {"high_impact", "medium_impact", "days", "events", "high_risk_days", "high_impact_days"}
+
+    def __init__(self, stream, columns, title=None):
+        self.stream = stream
+        self.columns = columns
+        title = html.escape(title or "Relatório de notícias")
+        head = "".join(f"<th>{html.escape(COLUMN_TITLES.get(column, column))}</th>" for column in columns)
+        stream.write("<!DOCTYPE html>\n<html lang=\"pt-BR\">\n<head>\n<meta charset=\"utf-8\">\n"
+                     f"<title>{title}</title>\n<style>{HTML_STYLE}</style>\n</head>\n<body>\n"
+                     f"<h1>{title}</h1>\n<table>\n<thead><tr>{head}</tr></thead>\n<tbody>\n")
+
+    def write(self, record):
+        cells = []
+        for column in self.columns:
+            css = ' class="number"' if column in self.NUMBER_COLUMNS else ""
+            cells.append(f"<td{css}>{html.escape(format_cell(record.get(column)))}</td>")
+        risk = ' class="risk-high"' if record.get("risk_level") == "HIGH" else ""
+        self.stream.write(f"<tr{risk}>{''.join(cells)}</tr>\n")
+
+    def close(self, count):
+        self.stream.write(f"</tbody>\n</table>\n<p class=\"meta\">{count} linha(s)</p>\n</body>\n</html>\n")
+
+
+WRITERS = {"jsonl": JsonLinesWriter, "csv": CsvWriter, "html": HtmlWriter}
+
+
+def detect_report_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"formato de relatório não suportado: {extension or path} "
+                         f"(use {', '.join(sorted(FORMATS))})")
+    return FORMATS[extension]
+
+
+def write_report(results, output, period="daily", format="jsonl", title=None):
+    """Escreve os registros de `results` (pares data, análise) num arquivo aberto
+
+    Retorna quantas linhas foram escritas.
+    """
+    if format not in WRITERS:
+        raise ValueError(f"formato de relatório desconhecido: {format} (use {', '.join(WRITERS)})")
+    if period not in PERIODS:
+        raise ValueError(f"período desconhecido: {period} (use {', '.join(PERIODS)})")
+    columns = DAILY_COLUMNS if period == "daily" else PERIOD_COLUMNS
+    writer = WRITERS[format](output, columns, title)
+    count = 0
+    for record in iter_records(results, period, full=format == "jsonl"):
+        writer.write(record)
+        count += 1
+    writer.close(count)
+    return count
+
+
+def export_report(analyzer, path, start, end, period="daily", format=None, title=None):
+    """Analisa de start a end e grava o relatório em `path` (formato pela extensão)
+
+    Os dias são analisados e escritos um a um, em ordem de data
+    (stream_range); retorna quantas linhas foram escritas.
+    """
+    format = format or detect_report_format(path)
+    if title is None:
+        title = f"Relatório {PERIOD_TITLES.get(period, period)} de notícias: {start} a {end}"
+    with open(path, "w", encoding="utf-8", newline="") as output:
+        return write_report(analyzer.stream_range(start, end), output, period, format, title)
+
+
+def main(argv=None):
+    import argparse
+
+    from calendar_importer import date_argument
+
+    parser = argparse.ArgumentParser(description="Exporta análises diárias, semanais, mensais ou anuais "
+                                                 "para JSON Lines, CSV ou HTML.")
+    parser.add_argument("calendar", nargs="?", help="calendário (.csv, .jsonl ou .json)")
+    parser.add_argument("--db", help="histórico SQLite (news_store) em vez de, ou além do, calendário")
+    parser.add_argument("--start", type=date_argument, help="primeira data (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date_argument, help="última data (YYYY-MM-DD)")
+    parser.add_argument("--period", choices=PERIODS, default="daily")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="formato (padrão: pela extensão de -o; "
+                                                                   "jsonl na saída padrão)")
+    parser.add_argument("--title", help="título do relatório HTML")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+    report_format = args.format
+    if report_format is None:
+        try:
+            report_format = detect_report_format(args.output) if args.output else "jsonl"
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    from news_store import open_cli_analyzer
+
+    # Cache pequeno: cada dia é analisado e escrito uma única vez
+    analyzer, store, start, end = open_cli_analyzer(parser, args.calendar, args.db, args.start, args.end,
+                                                    cache_size=64)
+    title = args.title or f"Relatório {PERIOD_TITLES[args.period]} de notícias: {start} a {end}"
+    results = analyzer.stream_range(start, end)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            count = write_report(results, output, args.period, report_format, title)
+    else:
+        count = write_report(results, sys.stdout, args.period, report_format, title)
+    print(f"{count} linha(s) escritas", file=sys.stderr)
+    if store is not None:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
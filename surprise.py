@@ -0,0 +1,275 @@
+"""Leitura numérica de previous/consensus e pontuação da surpresa esperada
+
+Os campos previous e consensus chegam como texto ("0.3%", "-1,2%", "215K",
+"1.234,5M", "(0.4)"). parse_values converte colunas inteiras em arrays
+NumPy, interpretando unidades (%, K, M, B, T), sinais e separador decimal de
+qualquer locale; cada texto distinto é interpretado uma única vez (os
+calendários repetem sem parar os mesmos valores).
+
+SurpriseTable calcula, para todas as notícias de uma vez:
+
+- surprise: consensus - previous (a mudança que o mercado espera)
+- surprise_pct: surprise relativa ao previous
+- deviation: quantos desvios-padrão a surprise está da média histórica do
+  mesmo título (o quanto essa expectativa é incomum)
+
+e agrega por moeda com as moedas de cada título no banco de impacto:
+
+    table = analyzer.surprise_scores("2024-01-01", "2024-12-31")
+    table.by_currency()      # {"USD": {"events": ..., "mean_deviation": ...}, ...}
+
+Usa NumPy; surprise_scores só importa este módulo quando é chamado.
+"""
+import re
+import sys
+
+import numpy as np
+
+UNIT_MULTIPLIERS = {"": 1.0, "K": 1e3, "M": 1e6, "MN": 1e6, "MM": 1e6, "B": 1e9, "BN": 1e9, "T": 1e12}
+
+_VALUE_PATTERN = re.compile(r"^([+\-\u2212\u2013]?)\s*[$\u20ac\u00a3\u00a5]?\s*"
+                            r"(\d[\d.,'\u00a0\u2009\u202f ]*?)\s*(%|[KMBT]|BN|MN|MM)?$", re.IGNORECASE)
+# Separadores de milhar que nunca são decimais (apóstrofo e espaços)
+_GROUPING = str.maketrans("", "", "'\u00a0\u2009\u202f ")
+
+# Texto -> (valor, é percentual); valor NaN se o texto não é numérico
+_parsed = {}
+MAX_CACHED = 1_000_000
+
+
+def _to_float(digits):
+    digits = digits.translate(_GROUPING)
+    comma, dot = digits.rfind(","), digits.rfind(".")
+    if comma >= 0 and dot >= 0:
+        # Os dois separadores: o último é o decimal ("1,234.5" / "1.234,5")
+        decimal, grouping = (",", ".") if comma > dot else (".", ",")
+        digits = digits.replace(grouping, "").replace(decimal, ".")
+    elif comma >= 0:
+        groups = digits.split(",")
+        # "1,234" e "12,345,678" são milhares; "0,25" e "1,5" são decimais
+        if len(groups) > 2 or (len(groups[1]) == 3 and groups[0] != "0"):
+            digits = _ungroup(groups)
+        else:
+            digits = digits.replace(",", ".")
+    elif digits.count(".") > 1:
+        digits = _ungroup(digits.split("."))
+    return float(digits)
+
+
+def _ungroup(groups):
+    if any(len(group) != 3 for group in groups[1:]):
+        raise ValueError("separador de milhar fora de lugar")
+    return "".join(groups)
+
+
+def _parse_uncached(text):
+    text = text.strip()
+    negative = False
+    if text.startswith("(") and text.endswith(")"):
+        # Notação contábil: (0.4) = -0.4
+        text = text[1:-1].strip()
+        negative = True
+    match = _VALUE_PATTERN.match(text)
+    if not match:
+        return float("nan"), False
+    sign, digits, unit = match.groups()
+    try:
+        value = _to_float(digits)
+    except ValueError:
+        return float("nan"), False
+    unit = (unit or "").upper()
+    if unit != "%":
+        value *= UNIT_MULTIPLIERS[unit]
+    if negative != (sign not in ("", "+")):
+        value = -value
+    return value, unit == "%"
+
+
+def parse_value(text):
+    """(valor, é percentual) de um texto como "0.3%", "215K" ou "-1,2" (NaN se não numérico)"""
+    parsed = _parsed.get(text)
+    if parsed is None:
+        if len(_parsed) >= MAX_CACHED:
+            _parsed.clear()
+        parsed = _parsed[text] = _parse_uncached(text)
+    return parsed
+
+
+def parse_values(texts):
+    """Converte uma coluna de textos em (valores float64, máscara de percentuais)
+
+    Cada texto distinto é interpretado uma vez; as notícias só recebem o
+    índice do seu texto.
+    """
+    codes = {}
+    index = np.fromiter((codes.setdefault(text, len(codes)) for text in texts), dtype=np.intp)
+    parsed = [parse_value(text) for text in codes]
+    values = np.array([value for value, _ in parsed], dtype=np.float64)
+    percent = np.array([is_percent for _, is_percent in parsed], dtype=bool)
+    return values[index], percent[index]
+
+
+def _nan_to_none(value):
+    return None if value != value else float(value)
+
+
+class SurpriseTable:
+    """Surpresa esperada e desvio de todas as notícias, em arrays NumPy
+
+    As notícias são ordenadas por data (estável; já vêm em ordem de
+    events_between) para as consultas por intervalo; `impact_of` (título ->
+    entrada do banco) define as moedas de cada notícia nas agregações por
+    moeda.
+    """
+
+    def __init__(self, events, impact_of=None):
+        events = list(events)
+        if any(events[index]['date'] < events[index - 1]['date'] for index in range(1, len(events))):
+            events.sort(key=lambda news: news['date'])
+        self.events = events
+        self.dates = np.array([news['date'] for news in events], dtype="U10")
+        self.previous, previous_percent = parse_values([news['previous'] for news in events])
+        self.consensus, consensus_percent = parse_values([news['consensus'] for news in events])
+
+        # Um título por código: o desvio compara cada notícia com o histórico do próprio título
+        name_codes = {}
+        self.name_codes = np.fromiter((name_codes.setdefault(news['name'], len(name_codes)) for news in events),
+                                      dtype=np.intp, count=len(events))
+        self.names = list(name_codes)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            surprise = self.consensus - self.previous
+            # Unidades diferentes (ex.: "0.3%" contra "215K") não se comparam
+            surprise[previous_percent != consensus_percent] = np.nan
+            self.surprise = surprise
+            self.surprise_pct = np.where(self.previous != 0, surprise / np.abs(self.previous), np.nan)
+        self.deviation = self._deviation(surprise, self.name_codes, len(self.names))
+
+        self.currencies, self._currency_ptr, self._currency_codes = self._name_currencies(impact_of)
+
+    @staticmethod
+    def _deviation(values, groups, group_count):
+        """z-score de cada valor dentro do seu grupo (NaN com menos de 2 valores ou sem variação)"""
+        valid = ~np.isnan(values)
+        valid_groups = groups[valid]
+        count = np.bincount(valid_groups, minlength=group_count)
+        total = np.bincount(valid_groups, weights=values[valid], minlength=group_count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            # Duas passadas: a média primeiro, para não perder precisão na variância
+            squares = np.bincount(valid_groups, weights=(values[valid] - mean[valid_groups]) ** 2,
+                                  minlength=group_count)
+            std = np.sqrt(squares / count)
+            std[(count < 2) | (std <= 1e-12 * np.maximum(np.abs(mean), 1.0))] = np.nan
+            return (values - mean[groups]) / std[groups]
+
+    def _name_currencies(self, impact_of):
+        """Moedas de cada título em formato CSR: códigos de moeda a partir de ptr[título]"""
+        currencies = {}
+        ptr = [0]
+        codes = []
+        for name in self.names:
+            impact_info = impact_of(name) if impact_of is not None else None
+            for currency in (impact_info.get('currencies', ()) if impact_info else ()):
+                codes.append(currencies.setdefault(currency, len(currencies)))
+            ptr.append(len(codes))
+        return list(currencies), np.array(ptr, dtype=np.intp), np.array(codes, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.events)
+
+    def _span(self, start, end):
+        lo = 0 if start is None else int(np.searchsorted(self.dates, start, "left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, "right"))
+        return lo, hi
+
+    def by_currency(self, start=None, end=None):
+        """Agregados por moeda no intervalo: notícias com valor, surpresa relativa e desvio médios"""
+        lo, hi = self._span(start, end)
+        names = self.name_codes[lo:hi]
+        # Cada notícia repetida uma vez por moeda do seu título
+        lengths = np.diff(self._currency_ptr)[names]
+        event_index = np.repeat(np.arange(lo, hi), lengths)
+        starts = np.repeat(self._currency_ptr[names], lengths)
+        offsets = np.arange(len(event_index)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        currency = self._currency_codes[starts + offsets]
+
+        result = {}
+        size = len(self.currencies)
+        stats = {}
+        for field, values in (("surprise_pct", self.surprise_pct), ("deviation", self.deviation)):
+            values = values[event_index]
+            valid = ~np.isnan(values)
+            count = np.bincount(currency[valid], minlength=size)
+            total = np.bincount(currency[valid], weights=values[valid], minlength=size)
+            absolute = np.bincount(currency[valid], weights=np.abs(values[valid]), minlength=size)
+            stats[field] = (count, total, absolute)
+        events = np.bincount(currency, minlength=size)
+        for code, name in enumerate(self.currencies):
+            if not events[code]:
+                continue
+            entry = {"events": int(events[code])}
+            for field, (count, total, absolute) in stats.items():
+                entry[f"mean_{field}"] = float(total[code] / count[code]) if count[code] else None
+                entry[f"mean_abs_{field}"] = float(absolute[code] / count[code]) if count[code] else None
+            result[name] = entry
+        return dict(sorted(result.items()))
+
+    def row(self, index):
+        """Valores e pontuações de uma notícia (dicionário; None onde não há número)"""
+        news = self.events[index]
+        return {
+            "date": news['date'], "time": news['time'], "name": news['name'],
+            "previous": news['previous'], "consensus": news['consensus'],
+            "previous_value": _nan_to_none(self.previous[index]),
+            "consensus_value": _nan_to_none(self.consensus[index]),
+            "surprise": _nan_to_none(self.surprise[index]),
+            "surprise_pct": _nan_to_none(self.surprise_pct[index]),
+            "deviation": _nan_to_none(self.deviation[index])
+        }
+
+    def rows(self, start=None, end=None):
+        """Uma linha por notícia no intervalo (ver row)"""
+        lo, hi = self._span(start, end)
+        for index in range(lo, hi):
+            yield self.row(index)
+
+    def top(self, count=20, start=None, end=None):
+        """As `count` notícias com maior |desvio| no intervalo"""
+        lo, hi = self._span(start, end)
+        magnitude = np.abs(self.deviation[lo:hi])
+        order = np.argsort(np.where(np.isnan(magnitude), -1.0, magnitude), kind="stable")[::-1][:count]
+        return [self.row(lo + int(index)) for index in order if not np.isnan(magnitude[index])]
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    from calendar_importer import date_argument
+
+    parser = argparse.ArgumentParser(description="Surpresa esperada (consensus - previous) por notícia e por moeda.")
+    parser.add_argument("calendar", help="calendário (.csv, .jsonl ou .json)")
+    parser.add_argument("--start", type=date_argument, help="primeira data (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date_argument, help="última data (YYYY-MM-DD)")
+    parser.add_argument("--top", type=int, default=20, help="notícias de maior desvio no relatório")
+    args = parser.parse_args(argv)
+
+    from calendar_importer import import_calendar
+    from news_analyzer import NewsAnalyzer
+
+    analyzer = NewsAnalyzer()
+    try:
+        stats = import_calendar(args.calendar, analyzer)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    print(stats.summary(), file=sys.stderr)
+    table = analyzer.surprise_scores(args.start, args.end)
+    report = {"by_currency": table.by_currency(), "top_deviation": table.top(args.top)}
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
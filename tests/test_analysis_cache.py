@@ -0,0 +1,62 @@
+from news_analyzer import NewsAnalyzer, NewsEvent
+
+NFP = NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", "2024-05-03")
+CPI = NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-15")
+GDP = NewsEvent("UK GDP q/q", "0.1%", "0.2%", "02:00", "2024-05-10")
+
+
+def _cached_analyzer():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [NFP, CPI]
+    for date in ("2024-05-03", "2024-05-15"):
+        analyzer.analyze_confluence(date)
+    assert set(analyzer._analysis_cache) == {"2024-05-03", "2024-05-15"}
+    return analyzer
+
+
+def test_add_news_invalidates_only_its_date():
+    analyzer = _cached_analyzer()
+
+    analyzer.add_news(NFP.replace(name="UK GDP q/q", time="02:00"))
+
+    assert set(analyzer._analysis_cache) == {"2024-05-15"}
+    # A nova análise enxerga a notícia adicionada
+    assert "GBP" in analyzer.analyze_confluence("2024-05-03")["currencies_affected"]
+
+
+def test_news_data_assignment_invalidates_changed_dates():
+    analyzer = _cached_analyzer()
+
+    analyzer.news_data = [NFP, CPI]
+    assert set(analyzer._analysis_cache) == {"2024-05-03", "2024-05-15"}
+
+    analyzer.news_data = [NFP, CPI.replace(consensus="0.5%")]
+    assert set(analyzer._analysis_cache) == {"2024-05-03"}
+
+    analyzer.news_data = [CPI]
+    assert analyzer._analysis_cache == {}
+    assert "error" in analyzer.analyze_confluence("2024-05-03")
+
+
+def test_replace_dates_invalidates_only_changed_dates():
+    analyzer = _cached_analyzer()
+
+    assert analyzer.replace_dates({"2024-05-03": [NFP]}) == []
+    assert set(analyzer._analysis_cache) == {"2024-05-03", "2024-05-15"}
+
+    assert analyzer.replace_dates({"2024-05-15": [], "2024-05-10": [GDP]}) == ["2024-05-15", "2024-05-10"]
+    assert set(analyzer._analysis_cache) == {"2024-05-03"}
+    assert analyzer.dates == ["2024-05-03", "2024-05-10"]
+    assert [news["name"] for news in analyzer.news_data] == ["US Non-Farm Payrolls", "UK GDP q/q"]
+
+
+def test_cache_evicts_least_recently_used():
+    analyzer = NewsAnalyzer(cache_size=2)
+    analyzer.news_data = [NFP, GDP, CPI]
+
+    analyzer.analyze_confluence("2024-05-03")
+    analyzer.analyze_confluence("2024-05-10")
+    analyzer.analyze_confluence("2024-05-03")
+    analyzer.analyze_confluence("2024-05-15")
+
+    assert list(analyzer._analysis_cache) == ["2024-05-03", "2024-05-15"]
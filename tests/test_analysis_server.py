@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from analysis_server import AnalysisServer
+from benchmark import generate_calendar
+from impact_rules import current_rules, set_rules
+from news_analyzer import NewsAnalyzer
+
+CALENDAR = list(generate_calendar(300, 20))
+START, END = "2000-01-03", "2000-01-20"
+
+
+async def _request(port, method, target, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = (f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status_line, _, payload = response.partition(b"\r\n\r\n")
+    return int(status_line.split(b" ")[1]), json.loads(payload)
+
+
+def _serve(analyzer, scenario):
+    """Sobe o servidor numa porta livre, roda o cenário e encerra"""
+    async def run():
+        server = AnalysisServer(analyzer, workers=1, chunks_per_worker=3)
+        listening = await server.start(port=0)
+        port = listening.sockets[0].getsockname()[1]
+        try:
+            return await scenario(port)
+        finally:
+            server.close()
+    return asyncio.run(run())
+
+
+def _json(value):
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    return analyzer
+
+
+def test_health_analysis_and_range_match_the_library(analyzer):
+    expected = NewsAnalyzer()
+    expected.news_data = CALENDAR
+    date = expected.dates[3]
+
+    async def scenario(port):
+        return await asyncio.gather(_request(port, "GET", "/health"),
+                                    _request(port, "GET", f"/analysis?date={date}"),
+                                    _request(port, "GET", f"/range?start={START}&end={END}"))
+
+    (_, health), (status, analysis), (range_status, results) = _serve(analyzer, scenario)
+
+    assert health["events"] == len(CALENDAR)
+    assert health["dates"] == len(expected.dates)
+    assert status == 200 and analysis == _json(expected.analyze_confluence(date))
+    assert range_status == 200
+    assert list(results) == expected.dates_between(START, END)
+    assert results == _json({day: expected.analyze_confluence(day) for day in expected.dates_between(START, END)})
+    # O resultado do pool fica no cache do analisador compartilhado
+    assert set(expected.dates_between(START, END)) <= set(analyzer._analysis_cache)
+
+
+@pytest.mark.parametrize("method, target, status", [
+    ("GET", "/unknown", 404),
+    ("POST", "/analysis?date=2000-01-03", 405),
+    ("GET", "/analysis", 400),
+    ("GET", "/analysis?date=03/01/2000", 400),
+    ("GET", "/range?start=2000-01-10&end=2000-01-01", 400),
+])
+def test_bad_requests(analyzer, method, target, status):
+    code, payload = _serve(analyzer, lambda port: _request(port, method, target))
+
+    assert code == status
+    assert payload["error"]
+
+
+def test_calendar_upload_appends_or_replaces(analyzer):
+    rows = [{"date": "2001-05-01", "time": "08:30", "name": "Non-Farm Payrolls"},
+            {"date": "2001-05-02", "time": "10:00", "name": "ISM Manufacturing PMI"},
+            {"date": "not-a-date", "time": "10:00", "name": "CPI m/m"}]
+    body = "\n".join(json.dumps(row) for row in rows).encode("utf-8")
+
+    async def scenario(port):
+        appended = await _request(port, "POST", "/calendar?format=jsonl", body)
+        replaced = await _request(port, "POST", "/calendar?format=jsonl&replace=1", body)
+        analysis = await _request(port, "GET", "/analysis?date=2001-05-01")
+        return appended, replaced, analysis
+
+    (status, appended), (_, replaced), (_, analysis) = _serve(analyzer, scenario)
+
+    assert status == 200
+    assert appended["accepted"] == 2 and appended["rejected"] == 1
+    assert appended["rejected_rows"][0]["line"] == 3
+    assert appended["events"] == len(CALENDAR) + 2
+    assert replaced["events"] == 2 and replaced["dates"] == 2
+    assert analyzer.dates == ["2001-05-01", "2001-05-02"]
+    assert analysis["date"] == "2001-05-01"
+    assert [news["name"] for news in analysis["high_impact_news"]] == ["Non-Farm Payrolls"]
+
+
+def test_replace_upload_builds_the_index_off_the_loop(analyzer, monkeypatch):
+    threads = []
+    prepare = analyzer.prepare_news_data
+
+    def recording_prepare(news_list):
+        threads.append(threading.current_thread())
+        return prepare(news_list)
+
+    monkeypatch.setattr(analyzer, "prepare_news_data", recording_prepare)
+    body = json.dumps({"date": "2001-05-01", "time": "08:30", "name": "CPI m/m"}).encode("utf-8")
+
+    status, payload = _serve(analyzer, lambda port: _request(port, "POST", "/calendar?replace=1", body))
+
+    assert status == 200 and payload["events"] == 1
+    assert threads and all(thread is not threading.main_thread() for thread in threads)
+
+
+def test_swap_after_concurrent_change_invalidates_the_changed_dates(analyzer):
+    kept, changed = analyzer.dates[:2]
+    for date in (kept, changed):
+        analyzer.analyze_confluence(date)
+    replacement = [news for news in analyzer.news_data if news["date"] != changed]
+
+    prepared = analyzer.prepare_news_data(replacement)
+    # Alteração entre a preparação (na thread) e a troca (no loop)
+    analyzer.add_news({"date": kept, "time": "23:00", "name": "Non-Farm Payrolls"})
+    analyzer.analyze_confluence(kept)
+    analyzer.swap_news_data(prepared)
+
+    assert changed not in analyzer.dates
+    assert kept not in analyzer._analysis_cache
+    expected = NewsAnalyzer()
+    expected.news_data = replacement
+    assert analyzer.analyze_confluence(kept) == expected.analyze_confluence(kept)
+
+
+def test_calendar_upload_must_be_utf8(analyzer):
+    status, payload = _serve(analyzer, lambda port: _request(port, "POST", "/calendar", b"\xff\xfe"))
+
+    assert status == 400
+    assert len(analyzer.news_data) == len(CALENDAR)
+
+
+def test_rules_upload_replaces_the_rules(analyzer):
+    original = current_rules()
+    spec = original.to_dict()
+    spec["news"] = {"Custom Release": {"impact": "HIGH", "currencies": ["USD"]}}
+    body = json.dumps(spec).encode("utf-8")
+
+    async def scenario(port):
+        uploaded = await _request(port, "POST", "/rules", body)
+        invalid = await _request(port, "POST", "/rules", b"{not json")
+        return uploaded, invalid
+
+    try:
+        (status, uploaded), (invalid_status, _) = _serve(analyzer, scenario)
+        assert status == 200 and uploaded["news"] == 1
+        assert invalid_status == 400
+        assert analyzer.rules.database.keys() == {"Custom Release"}
+    finally:
+        set_rules(original)
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from news_analyzer import NewsAnalyzer, NewsEvent
+
+ROWS = [
+    NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", ""),
+    NewsEvent(""),
+    NewsEvent("UK GDP q/q", "0.1%", "0.2%", "02:00", "2024-05-10"),
+]
+
+
+@pytest.fixture
+def trading_analyzer(qapp):
+    import trading_analyzer
+    return trading_analyzer
+
+
+def _collect(worker):
+    signals = []
+    worker.progress.connect(lambda done, total: signals.append(("progress", done, total)))
+    worker.analysis_ready.connect(lambda analysis: signals.append(("ready", analysis)))
+    worker.no_news.connect(lambda: signals.append(("no_news",)))
+    worker.failed.connect(lambda message: signals.append(("failed", message)))
+    return signals
+
+
+def test_worker_fills_missing_dates_and_analyzes(trading_analyzer):
+    analyzer = NewsAnalyzer()
+    worker = trading_analyzer.AnalysisWorker(analyzer, threading.Lock(), ROWS, "2024-05-03")
+    signals = _collect(worker)
+
+    worker.run()
+
+    assert signals[0] == ("progress", 0, 3) and signals[1] == ("progress", 3, 3)
+    assert signals[2] == ("ready", analyzer.analyze_confluence("2024-05-03"))
+    # Linhas sem data ficam com a data selecionada; linhas vazias são ignoradas
+    assert analyzer.dates == ["2024-05-03", "2024-05-10"]
+    assert analyzer.events_on("2024-05-03") == [ROWS[0].replace(date="2024-05-03")]
+
+
+def test_worker_without_news_reports_empty_table(trading_analyzer):
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [ROWS[2]]
+    worker = trading_analyzer.AnalysisWorker(analyzer, threading.Lock(), [NewsEvent("")] * 3, "2024-05-03")
+    signals = _collect(worker)
+
+    worker.run()
+
+    assert signals[-1] == ("no_news",)
+    assert analyzer.dates == ["2024-05-10"]
+
+
+def test_cancelled_worker_leaves_analyzer_untouched(trading_analyzer, qapp):
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [ROWS[2]]
+    lock = threading.Lock()
+    worker = trading_analyzer.AnalysisWorker(analyzer, lock, ROWS, "2024-05-03")
+    signals = _collect(worker)
+
+    # Cancelada enquanto esperava a trava (outra análise em andamento)
+    with lock:
+        worker.start()
+        while not worker.isRunning():
+            qapp.processEvents()
+        worker.requestInterruption()
+    assert worker.wait(5000)
+    qapp.processEvents()
+
+    assert not any(signal[0] == "ready" for signal in signals)
+    assert analyzer.dates == ["2024-05-10"]
+
+
+def test_keep_other_dates_replaces_only_table_dates(trading_analyzer):
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-15"),
+                          NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-03")]
+    worker = trading_analyzer.AnalysisWorker(analyzer, threading.Lock(), ROWS, "2024-05-03",
+                                             keep_other_dates=True)
+
+    worker.run()
+
+    assert analyzer.dates == ["2024-05-03", "2024-05-10", "2024-05-15"]
+    assert [news.name for news in analyzer.events_on("2024-05-03")] == ["US Non-Farm Payrolls"]
+
+
+def test_worker_thread_delivers_result_to_gui_thread(trading_analyzer, qapp):
+    analyzer = NewsAnalyzer()
+    lock = threading.Lock()
+    worker = trading_analyzer.AnalysisWorker(analyzer, lock, ROWS, "2024-05-03")
+    signals = _collect(worker)
+
+    # A análise espera a trava: a thread da interface segue livre enquanto isso
+    with lock:
+        worker.start()
+        qapp.processEvents()
+        assert not any(signal[0] == "ready" for signal in signals)
+    assert worker.wait(5000)
+    qapp.processEvents()
+
+    assert signals[-1] == ("ready", analyzer.analyze_confluence("2024-05-03"))
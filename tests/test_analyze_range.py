@@ -0,0 +1,59 @@
+from benchmark import generate_calendar
+from news_analyzer import NewsAnalyzer, NewsEvent, analyze_chunk
+
+CALENDAR = list(generate_calendar(600, 40))
+START, END = "2000-01-05", "2000-02-03"
+
+
+def _sequential(start, end):
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    return {date: analyzer.analyze_confluence(date) for date in analyzer.dates_between(start, end)}
+
+
+def test_serial_range_matches_day_by_day():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+
+    results = list(analyzer.analyze_range(START, END))
+
+    assert [date for date, _ in results] == analyzer.dates_between(START, END)
+    assert dict(results) == _sequential(START, END)
+
+
+def test_process_pool_matches_day_by_day():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    # Alguns dias já em cache: saem direto, sem ir para o pool
+    analyzer.analyze_confluence("2000-01-10")
+
+    results = list(analyzer.analyze_range(START, END, workers=2, chunk_size=4))
+
+    assert len(results) == len(analyzer.dates_between(START, END))
+    assert dict(results) == _sequential(START, END)
+    # Os resultados do pool ficam no cache
+    assert set(analyzer._analysis_cache) == set(analyzer.dates_between(START, END))
+
+
+def test_plan_range_chunks_and_stale_results():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    dates = analyzer.dates_between(START, END)
+
+    cached, payloads, revision = analyzer.plan_range(START, END, chunk_size=7)
+    assert cached == []
+    assert len(payloads) == -(-len(dates) // 7)
+    results = [result for payload in payloads for result in analyze_chunk(payload)]
+    assert dict(results) == _sequential(START, END)
+
+    # Calendário alterado enquanto os blocos rodavam: resultados descartados
+    analyzer.add_news(NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", dates[0]))
+    assert not analyzer.store_results(results, revision)
+    assert analyzer._analysis_cache == {}
+
+
+def test_empty_range_yields_nothing():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+
+    assert list(analyzer.analyze_range("2010-01-01", "2010-12-31", workers=2)) == []
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backtest import (BAR_DTYPE, PriceHistory, convert_csv, format_report, reaction_metrics,
+                      run_backtest)
+from news_analyzer import NewsAnalyzer
+
+T0 = 1_700_000_000 - 1_700_000_000 % 60
+
+
+def _bars(count=3000, seed=3):
+    rng = np.random.default_rng(seed)
+    # Barras de 1 minuto com buracos (fim de semana, falta de ticks)
+    steps = rng.choice([60, 60, 60, 120, 3600], size=count)
+    bars = np.empty(count, dtype=BAR_DTYPE)
+    bars["time"] = T0 + np.cumsum(steps)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-4, count)))
+    bars["open"] = np.concatenate(([close[0]], close[:-1]))
+    bars["close"] = close
+    bars["high"] = np.maximum(bars["open"], close) + rng.uniform(0, 1e-4, count)
+    bars["low"] = np.minimum(bars["open"], close) - rng.uniform(0, 1e-4, count)
+    return bars
+
+
+def _naive(bars, epoch, window_minutes):
+    # Uma notícia por vez, direto da definição
+    span = window_minutes * 60
+    times = bars["time"]
+    before = np.flatnonzero(times < epoch)
+    window = np.flatnonzero((times >= epoch) & (times < epoch + span))
+    if not len(before) or not len(window):
+        return None
+    reference = bars["close"][before[-1]]
+    log_close = np.log(bars["close"])
+    log_returns = log_close[window] - log_close[window - 1]
+    pre = np.flatnonzero((times >= epoch - span) & (times < epoch))
+    pre_range = ((bars["high"][pre].max() - bars["low"][pre].min()) / reference) if len(pre) else np.nan
+    return {
+        "return": bars["close"][window[-1]] / reference - 1,
+        "range": (bars["high"][window].max() - bars["low"][window].min()) / reference,
+        "volatility": np.std(log_returns),
+        "pre_range": pre_range
+    }
+
+
+def test_reaction_metrics_match_naive_windows():
+    bars = _bars()
+    times = bars["time"]
+    rng = np.random.default_rng(4)
+    epochs = np.concatenate((
+        rng.integers(times[0] - 7200, times[-1] + 7200, 400),
+        times[rng.integers(0, len(times), 50)],    # exatamente no início de uma barra
+        [times[0], times[0] - 1, times[-1] + 1]    # sem barra anterior / sem barras depois
+    ))
+
+    for window in (1, 15, 60):
+        measured = reaction_metrics(bars, epochs, window)
+        for position, epoch in enumerate(epochs):
+            expected = _naive(bars, int(epoch), window)
+            assert measured["valid"][position] == (expected is not None)
+            if expected is None:
+                assert np.isnan(measured["return"][position])
+                continue
+            for name, value in expected.items():
+                assert measured[name][position] == pytest.approx(value, rel=1e-6, abs=1e-9, nan_ok=True)
+
+
+def test_reaction_metrics_without_bars():
+    empty = reaction_metrics(None, [T0, T0 + 60])
+
+    assert not empty["valid"].any()
+    assert np.isnan(empty["range"]).all()
+    assert len(reaction_metrics(_bars(), [])["valid"]) == 0
+
+
+def test_convert_ohlc_csv_sorts_bars(tmp_path):
+    source = tmp_path / "EURUSD.csv"
+    source.write_text("Date,Time,Open,High,Low,Close\n"
+                      "2024-01-02,10:01,1.2,1.3,1.1,1.25\n"
+                      "2024-01-02,10:00,1.0,1.1,0.9,1.05\n", encoding="utf-8")
+    target = tmp_path / "EURUSD.npy"
+
+    assert convert_csv(source, target) == 2
+    bars = np.load(target)
+    assert bars.dtype == BAR_DTYPE
+    assert bars["time"].tolist() == [1704189600, 1704189660]
+    assert bars["close"].tolist() == [1.05, 1.25]
+
+
+def test_convert_tick_csv_with_millisecond_epochs(tmp_path):
+    source = tmp_path / "ticks.csv"
+    source.write_text("timestamp,bid\n1704189600500,1.1\n1704189601,1.2\n", encoding="utf-8")
+    target = tmp_path / "ticks.npy"
+
+    convert_csv(source, target, chunk_rows=1)
+    bars = np.load(target)
+    assert bars["time"].tolist() == [1704189600, 1704189601]
+    assert bars["open"].tolist() == bars["high"].tolist() == bars["close"].tolist() == [1.1, 1.2]
+
+
+def test_convert_requires_time_and_price_columns(tmp_path):
+    source = tmp_path / "bad.csv"
+    source.write_text("open,close\n1,2\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        convert_csv(source, tmp_path / "bad.npy")
+    source.write_text("time,volume\n1704189600,2\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        convert_csv(source, tmp_path / "bad.npy")
+
+
+def test_run_backtest_groups_samples(tmp_path):
+    bars = _bars()
+    np.save(tmp_path / "EURUSD.npy", bars)
+    days = sorted({str(np.datetime64(int(t), "s").astype("datetime64[D]"))
+                   for t in bars["time"][100:-100:200]})
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [{"date": day, "time": "10:00", "name": "Non-Farm Payrolls"} for day in days]
+
+    report = run_backtest(analyzer, PriceHistory(str(tmp_path)), days[0], days[-1],
+                          window_minutes=30, event_timezone="UTC")
+
+    assert report["events"] == len(days)
+    # Non-Farm Payrolls afeta pares sem arquivo de preços: só EURUSD é medido
+    assert "EURUSD" not in report["missing_instruments"]
+    assert "GBPUSD" in report["missing_instruments"]
+    stats = report["by_impact"]["VERY_HIGH"]
+    assert stats["samples"] == report["by_impact_instrument"]["VERY_HIGH"]["EURUSD"]["samples"]
+    assert 0 < stats["samples"] <= len(days)
+    assert report["samples"] == sum(group["samples"] for group in report["by_role"].values())
+    json.dumps(report)
+    assert "VERY_HIGH" in format_report(report)
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import benchmark
+
+
+def test_generated_calendar_is_reproducible_and_ordered():
+    first = list(benchmark.generate_calendar(500, 20, seed=7))
+    second = list(benchmark.generate_calendar(500, 20, seed=7))
+
+    assert first == second
+    assert first != list(benchmark.generate_calendar(500, 20, seed=8))
+    dates = [news.date for news in first]
+    assert dates == sorted(dates) and len(set(dates)) == 20
+
+
+def test_main_runs_every_benchmark_and_saves_a_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+
+    status = benchmark.main(["--sizes", "300:5", "--repeat", "1", "--day-samples", "10",
+                             "--window-days", "2", "-o", str(tmp_path / "out.json"),
+                             "--save-baseline", str(baseline)])
+
+    assert status == 0
+    results = json.loads(baseline.read_text(encoding="utf-8"))["results"]
+    assert [result["benchmark"] for result in results] == list(benchmark.BENCHMARKS)
+    by_name = {result["benchmark"]: result for result in results}
+    assert by_name["range"]["operations"] == 5
+    assert by_name["rolling"]["operations"] == 5
+    assert by_name["import"]["operations"] == 300
+    assert all(result["throughput"] > 0 and result["peak_memory_bytes"] > 0 for result in results)
+
+
+def test_baseline_comparison_flags_regressions():
+    baseline = [{"benchmark": "range", "events": 10, "days": 1, "throughput": 100.0},
+                {"benchmark": "import", "events": 10, "days": 1, "throughput": 100.0}]
+    results = [{"benchmark": "range", "events": 10, "days": 1, "throughput": 85.0,
+                "unit": "days/s", "peak_memory_bytes": None},
+               {"benchmark": "import", "events": 10, "days": 1, "throughput": 95.0,
+                "unit": "rows/s", "peak_memory_bytes": None},
+               {"benchmark": "rolling", "events": 10, "days": 1, "throughput": 1.0,
+                "unit": "windows/s", "peak_memory_bytes": None}]
+
+    regressions = benchmark.compare_with_baseline(results, baseline, tolerance=0.10)
+
+    assert [result["benchmark"] for result in regressions] == ["range"]
+    assert results[1]["baseline_change"] == -0.05
+    assert "baseline_change" not in results[2]
+
+
+def test_sizes_and_unknown_benchmarks(capsys):
+    assert benchmark.parse_sizes("1000:1,50:7,20") == [(1000, 1), (50, 7), (20, 1)]
+    with pytest.raises(SystemExit):
+        benchmark.main(["--only", "nope"])
+    assert "benchmark desconhecido: nope" in capsys.readouterr().err
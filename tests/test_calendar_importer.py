@@ -0,0 +1,32 @@
+import pytest
+
+from calendar_importer import ImportStats, iter_calendar
+
+
+@pytest.mark.parametrize("name, lines", [
+    ("calendario.csv", [b"date,time,name", b"2024-05-03,12:30,US NFP",
+                        b"2024-05-04,12:30,Caf\xe9 \xff", b"2024-05-15,12:30,US CPI"]),
+    ("calendario.jsonl", [b'{"date": "2024-05-03", "time": "12:30", "name": "US NFP"}',
+                          b'{"date": "2024-05-04", "name": "Caf\xe9 \xff"}',
+                          b'{"date": "2024-05-15", "time": "12:30", "name": "US CPI"}']),
+])
+def test_invalid_utf8_line_is_rejected_not_fatal(tmp_path, name, lines):
+    path = tmp_path / name
+    path.write_bytes(b"\n".join(lines) + b"\n")
+    stats = ImportStats()
+
+    events = list(iter_calendar(str(path), stats))
+
+    assert [event["name"] for event in events] == ["US NFP", "US CPI"]
+    # A linha ruim é contada como lida e rejeitada, com o número certo
+    assert (stats.rows_read, stats.rows_accepted, stats.rows_rejected) == (3, 2, 1)
+    line_number, reason = stats.rejected[0]
+    assert line_number == (3 if name.endswith(".csv") else 2)
+    assert "UTF-8" in reason
+
+
+def test_bom_is_stripped(tmp_path):
+    path = tmp_path / "calendario.csv"
+    path.write_bytes(b"\xef\xbb\xbfdate,name\n2024-05-03,US NFP\n")
+
+    assert [event["name"] for event in iter_calendar(str(path))] == ["US NFP"]
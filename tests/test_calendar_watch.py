@@ -0,0 +1,244 @@
+import os
+
+from calendar_watch import CalendarWatcher
+from news_analyzer import NewsAnalyzer
+from news_store import NewsStore
+
+HEADER = "date,time,name,previous,consensus\n"
+NFP = "2024-05-03,08:30,US Non-Farm Payrolls,200K,180K\n"
+CPI = "2024-05-15,08:30,US CPI,0.3%,0.4%\n"
+GDP = "2024-05-30,08:30,US GDP,1.6%,1.3%\n"
+
+
+def _write(path, text, mode="w"):
+    with open(path, mode, encoding="utf-8", newline="") as handle:
+        handle.write(text)
+    # Garante um stat diferente mesmo em sistemas de arquivos com mtime grosseiro
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def _names(analyzer):
+    return sorted(news.name for news in analyzer.news_data)
+
+
+def test_appended_lines_are_read_incrementally(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-03"]
+    offset = watcher._files[str(path)].offset
+
+    _write(path, CPI, "a")
+    diffs = watcher.poll()
+
+    assert [diff.date for diff in diffs] == ["2024-05-15"]
+    assert watcher._files[str(path)].offset == offset + len(CPI.encode())
+    assert _names(analyzer) == ["US CPI", "US Non-Farm Payrolls"]
+    assert watcher.poll() == []
+
+
+def test_partial_line_waits_for_newline(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+
+    _write(path, CPI[:20], "a")
+    assert watcher.poll() == []
+    _write(path, CPI[20:], "a")
+
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-15"]
+    assert analyzer.events_on("2024-05-15")[0].consensus == "0.4%"
+
+
+def test_rewrite_replaces_dates(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP + CPI)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+
+    _write(path, HEADER + GDP)
+    diffs = watcher.poll()
+
+    assert sorted(diff.date for diff in diffs) == ["2024-05-03", "2024-05-15", "2024-05-30"]
+    assert _names(analyzer) == ["US GDP"]
+
+
+def test_rewrite_in_place_same_size_or_larger_rereads_whole_file(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP + CPI)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+    inode = os.stat(path).st_ino
+
+    # Mesmo tamanho, mesmo inode, só o consensus do NFP mudou
+    _write(path, HEADER + NFP.replace("180K", "190K") + CPI)
+    assert os.stat(path).st_ino == inode
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-03"]
+    assert analyzer.events_on("2024-05-03")[0].consensus == "190K"
+    assert watcher.errors == {}
+
+    # Maior, com o começo diferente
+    _write(path, HEADER + GDP + NFP + CPI)
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-03", "2024-05-30"]
+    assert _names(analyzer) == ["US CPI", "US GDP", "US Non-Farm Payrolls"]
+    assert watcher.errors == {}
+
+
+def test_jsonl_rewrite_in_place_never_wipes_the_store(tmp_path):
+    path = tmp_path / "calendario.jsonl"
+    lines = [f'{{"date": "2024-05-{day:02d}", "name": "US CPI", "consensus": "0.{day % 10}%"}}\n'
+             for day in range(1, 29)]
+    _write(path, "".join(lines))
+    analyzer = NewsAnalyzer(store=NewsStore(":memory:"))
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+    assert len(analyzer.news_store.dates()) == 28
+
+    _write(path, "".join(reversed(lines)) + lines[0])
+    for _ in range(3):
+        watcher.poll()
+        assert len(analyzer.dates) == 28
+        assert len(analyzer.news_store.dates()) == 28
+    assert len(analyzer.events_on("2024-05-01")) == 2
+
+
+def test_partial_json_keeps_previous_events_and_retries(tmp_path):
+    path = tmp_path / "calendario.json"
+    _write(path, '[{"date": "2024-05-03", "name": "US Non-Farm Payrolls"}]')
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+
+    _write(path, '[{"date": "2024-05-15", "na')
+    assert watcher.poll() == []
+    assert str(path) in watcher.errors
+    assert _names(analyzer) == ["US Non-Farm Payrolls"]
+
+    _write(path, '[{"date": "2024-05-15", "name": "US CPI"}]')
+    assert sorted(diff.date for diff in watcher.poll()) == ["2024-05-03", "2024-05-15"]
+    assert watcher.errors == {}
+    assert _names(analyzer) == ["US CPI"]
+
+
+def test_bad_bytes_reject_only_their_line(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+
+    with open(path, "ab") as handle:
+        handle.write(b"2024-05-15,08:30,US CPI \xff,0.3%,0.4%\n" + GDP.encode())
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-30"]
+    assert watcher.errors == {}
+    assert _names(analyzer) == ["US GDP", "US Non-Farm Payrolls"]
+    assert watcher.stats.rows_rejected == 1
+    assert "UTF-8" in watcher.stats.rejected[0][1]
+
+
+def test_bad_bytes_in_a_rewrite_match_the_importer(tmp_path):
+    from calendar_importer import ImportStats, import_calendar
+
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+
+    with open(path, "wb") as handle:
+        handle.write((HEADER + CPI).encode() + b"2024-05-15,10:00,US PPI \xff,0.1%,0.2%\n" + GDP.encode())
+    watcher.poll()
+    imported = NewsAnalyzer()
+    stats = ImportStats()
+    import_calendar(str(path), imported, stats=stats)
+
+    assert _names(analyzer) == _names(imported) == ["US CPI", "US GDP"]
+    assert watcher.stats.rows_rejected == stats.rows_rejected == 1
+
+
+def test_empty_rewrite_waits_until_settled(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer, settle_time=0)
+    watcher.poll()
+
+    # Truncado antes da escrita: ainda não apaga a data
+    _write(path, "")
+    assert watcher.poll() == []
+    assert _names(analyzer) == ["US Non-Farm Payrolls"]
+
+    # Continua vazio na verificação seguinte: agora vale
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-03"]
+    assert analyzer.news_data == []
+
+
+def test_truncate_then_write_never_deletes(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer)
+    watcher.poll()
+
+    _write(path, "")
+    assert watcher.poll() == []
+    _write(path, HEADER + NFP + CPI)
+
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-15"]
+    assert _names(analyzer) == ["US CPI", "US Non-Farm Payrolls"]
+
+
+def test_empty_rewrite_waits_for_settle_time(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer, settle_time=60)
+    watcher.poll()
+
+    # Verificações seguidas (a cada poucos ms) não bastam para apagar
+    _write(path, "")
+    for _ in range(3):
+        assert watcher.poll() == []
+    assert _names(analyzer) == ["US Non-Farm Payrolls"]
+
+    watcher.settle_time = 0
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-03"]
+
+
+def test_unterminated_last_line_counts_once_settled(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP + CPI.rstrip("\n"))
+    analyzer = NewsAnalyzer()
+    watcher = CalendarWatcher(str(path), analyzer, settle_time=60)
+
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-03"]
+    assert watcher.poll() == []
+
+    watcher.settle_time = 0
+    assert [diff.date for diff in watcher.poll()] == ["2024-05-15"]
+
+
+def test_interval_backs_off_while_idle(tmp_path):
+    path = tmp_path / "calendario.csv"
+    _write(path, HEADER + NFP)
+    watcher = CalendarWatcher(str(path), NewsAnalyzer(), poll_interval=0.005, idle_interval=0.04)
+
+    watcher.poll()
+    assert watcher.interval == 0.005
+    intervals = []
+    for _ in range(5):
+        watcher.poll()
+        intervals.append(watcher.interval)
+    assert intervals == [0.01, 0.02, 0.04, 0.04, 0.04]
+
+    # Qualquer mudança no arquivo, mesmo uma linha incompleta, volta ao mínimo
+    _write(path, CPI[:10], "a")
+    watcher.poll()
+    assert watcher.interval == 0.005
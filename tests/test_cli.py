@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import news_analyzer
+from news_analyzer import NewsAnalyzer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CALENDAR = """date,time,name,previous,consensus
+2024-05-03,08:30,US Non-Farm Payrolls,200K,180K
+2024-05-03,07:45,ECB Interest Rate Decision,4.50%,4.25%
+2024-05-15,08:30,US CPI m/m,0.4%,0.3%
+"""
+
+
+@pytest.fixture
+def calendar(tmp_path):
+    path = tmp_path / "calendario.csv"
+    path.write_text(CALENDAR, encoding="utf-8")
+    return str(path)
+
+
+def test_core_modules_never_import_pyqt(calendar):
+    code = ("import sys, news_analyzer, news_store, calendar_importer, calendar_watch, "
+            "kill_zones, confluence_window, report_export, analysis_server, impact_rules; "
+            "news_analyzer.main(sys.argv[1:]); "
+            "sys.exit(any(name.startswith('PyQt5') for name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code, calendar], cwd=ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert set(json.loads(result.stdout)) == {"2024-05-03", "2024-05-15"}
+
+
+def test_cli_output_matches_library(calendar, tmp_path):
+    output = tmp_path / "analise.json"
+
+    assert news_analyzer.main([calendar, "--start", "2024-05-01", "--end", "2024-05-31", "-o", str(output)]) == 0
+
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [{"date": "2024-05-03", "time": "08:30", "name": "US Non-Farm Payrolls",
+                           "previous": "200K", "consensus": "180K"},
+                          {"date": "2024-05-03", "time": "07:45", "name": "ECB Interest Rate Decision",
+                           "previous": "4.50%", "consensus": "4.25%"},
+                          {"date": "2024-05-15", "time": "08:30", "name": "US CPI m/m",
+                           "previous": "0.4%", "consensus": "0.3%"}]
+    expected = json.loads(json.dumps(dict(analyzer.analyze_range("2024-05-01", "2024-05-31"))))
+    assert json.loads(output.read_text(encoding="utf-8")) == expected
+
+
+def test_cli_single_date_without_news(calendar, capsys):
+    assert news_analyzer.main([calendar, "--date", "2024-05-04"]) == 0
+
+    results = json.loads(capsys.readouterr().out)
+    assert list(results) == ["2024-05-04"]
+    assert "error" in results["2024-05-04"]
+
+
+def test_cli_rejects_invalid_dates(calendar, capsys):
+    with pytest.raises(SystemExit) as exc:
+        news_analyzer.main([calendar, "--date", "2024-5-4"])
+
+    assert exc.value.code == 2
+    assert "data inválida" in capsys.readouterr().err
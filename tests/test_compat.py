@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+import news_analyzer
+from impact_rules import current_rules
+
+OLD_NAMES = ("NEWS_IMPACT_DATABASE", "TRADING_SESSIONS", "FOREX_PAIRS", "COMMODITIES", "INDICES")
+
+
+def test_news_analyzer_tables_follow_current_rules():
+    assert news_analyzer.NEWS_IMPACT_DATABASE is current_rules().database
+    assert news_analyzer.INSTRUMENT_CURRENCIES is current_rules().instrument_currencies
+
+
+def test_trading_analyzer_keeps_old_imports():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    pytest.importorskip("PyQt5.QtWidgets")
+    import trading_analyzer
+
+    for name in OLD_NAMES:
+        assert getattr(trading_analyzer, name) is getattr(news_analyzer, name)
+    with pytest.raises(AttributeError):
+        trading_analyzer.NO_SUCH_TABLE
@@ -0,0 +1,88 @@
+from collections import Counter
+from datetime import date as Date, timedelta
+
+import pytest
+
+from benchmark import generate_calendar
+from confluence_window import ConfluenceWindow
+from news_analyzer import NewsAnalyzer
+
+CALENDAR = list(generate_calendar(400, 60))
+
+
+def _days(start, end):
+    day, last = Date.fromisoformat(start), Date.fromisoformat(end)
+    while day <= last:
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+def _naive_window(analyzer, end, days):
+    # Janela somada do zero: todas as análises dos dias dela
+    start = (Date.fromisoformat(end) - timedelta(days=days - 1)).isoformat()
+    impacts, currencies, currency_days, pairs = Counter(), Counter(), Counter(), Counter()
+    events = 0
+    high_dates = []
+    for date in analyzer.dates_between(start, end):
+        analysis = analyzer.analyze_confluence(date)
+        news = analysis["high_impact_news"] + analysis["medium_impact_news"]
+        events += len(news)
+        for item in news:
+            info = item["impact_info"]
+            impacts[str(info["impact"])] += 1
+            currencies.update(info["currencies"])
+            pairs.update(info["pairs_affected"] + info["instruments"] + info["indices"])
+        currency_days.update(analysis["currencies_affected"])
+        if analysis["high_impact_news"]:
+            high_dates.append(date)
+    avoid = analyzer.exposure.conflicting_pairs(set(currency_days))
+    return {
+        "start": start,
+        "end": end,
+        "days": days,
+        "events": events,
+        "impact_counts": dict(sorted(impacts.items())),
+        "currency_counts": dict(sorted(currencies.items())),
+        "currency_days": dict(sorted(currency_days.items())),
+        "pair_counts": dict(sorted(pairs.items())),
+        "avoid_pairs": avoid,
+        "high_impact_dates": high_dates
+    }
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    return analyzer
+
+
+@pytest.mark.parametrize("days, step", [(1, 1), (7, 1), (30, 3)])
+def test_rolling_matches_naive_reaggregation(analyzer, days, step):
+    start, end = "2000-01-10", "2000-03-05"
+
+    windows = list(analyzer.rolling_confluence(start, end, days=days, step=step))
+
+    assert [date for date, _ in windows] == list(_days(start, end))[::step]
+    for date, window in windows:
+        assert window == _naive_window(analyzer, date, days)
+
+
+def test_one_day_window_avoids_the_same_pairs_as_the_strategy(analyzer):
+    for date, window in analyzer.rolling_confluence("2000-01-01", "2000-01-31", days=1):
+        analysis = analyzer.analyze_confluence(date)
+        if "error" in analysis:
+            assert window["events"] == 0
+        else:
+            assert window["avoid_pairs"] == analysis["strategy"]["avoid_pairs"]
+
+
+def test_window_rejects_bad_arguments(analyzer):
+    with pytest.raises(ValueError):
+        ConfluenceWindow(0, analyzer.exposure)
+    with pytest.raises(ValueError):
+        list(analyzer.rolling_confluence("2000-01-01", "2000-01-10", step=0))
+    window = ConfluenceWindow(3, analyzer.exposure)
+    window.advance("2000-01-05")
+    with pytest.raises(ValueError):
+        window.advance("2000-01-04")
@@ -0,0 +1,50 @@
+from news_analyzer import NewsAnalyzer, NewsEvent
+
+# Fora de ordem de data, com várias notícias no mesmo dia
+CALENDAR = [
+    NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-15"),
+    NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", "2024-05-03"),
+    NewsEvent("UK GDP q/q", "0.1%", "0.2%", "02:00", "2024-05-10"),
+    NewsEvent("ECB Interest Rate Decision", "4.50%", "4.25%", "07:45", "2024-05-03"),
+    NewsEvent("US Retail Sales m/m", "0.7%", "0.4%", "08:30", "2024-05-15"),
+]
+
+
+def _scan(news_data, start, end):
+    # Varredura completa, como antes do índice por data
+    return sorted((news for news in news_data if start <= news['date'] <= end),
+                  key=lambda news: news['date'])
+
+
+def test_index_matches_full_scan():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+
+    assert analyzer.dates == ["2024-05-03", "2024-05-10", "2024-05-15"]
+    for date in analyzer.dates + ["2024-05-04"]:
+        assert analyzer.events_on(date) == _scan(CALENDAR, date, date)
+    for start, end in [("2024-05-01", "2024-05-31"), ("2024-05-04", "2024-05-15"),
+                       ("2024-05-10", "2024-05-10"), ("2024-06-01", "2024-06-30")]:
+        assert analyzer.events_between(start, end) == _scan(CALENDAR, start, end)
+        assert analyzer.dates_between(start, end) == sorted({news.date for news in _scan(CALENDAR, start, end)})
+
+
+def test_add_and_extend_keep_the_index_sorted():
+    analyzer = NewsAnalyzer()
+    for news in CALENDAR[:2]:
+        analyzer.add_news(news)
+    analyzer.extend_news(news for news in CALENDAR[2:])
+
+    assert analyzer.dates == ["2024-05-03", "2024-05-10", "2024-05-15"]
+    assert analyzer.events_between("", "\uffff") == _scan(CALENDAR, "", "\uffff")
+    # news_data continua na ordem de inserção
+    assert analyzer.news_data == CALENDAR
+
+
+def test_dict_news_are_accepted():
+    analyzer = NewsAnalyzer()
+    analyzer.add_news({"name": "US CPI m/m", "date": "2024-05-15", "time": "08:30"})
+
+    news = analyzer.events_on("2024-05-15")[0]
+    assert (news["name"], news["time"], news["previous"]) == ("US CPI m/m", "08:30", "")
+    assert analyzer.events_on("2024-05-16") == []
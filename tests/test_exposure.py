@@ -0,0 +1,46 @@
+import itertools
+import random
+
+from impact_rules import ExposureTable, current_rules
+from news_analyzer import NewsAnalyzer
+
+CURRENCIES = ["USD", "EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "NZD", "XAU", "CNY"]
+
+
+def _naive_conflicting_pairs(forex_pairs, currencies):
+    # Laço original: cada par forex com base e cotação afetadas
+    conflicting = []
+    for pair in forex_pairs["majors"] + forex_pairs["secondary"]:
+        if pair[:3] in currencies and pair[3:] in currencies:
+            conflicting.append(pair)
+    return conflicting
+
+
+def test_conflicting_pairs_match_naive_loop():
+    rules = current_rules()
+    table = rules.exposure
+    subsets = [set(subset) for size in range(4) for subset in itertools.combinations(CURRENCIES, size)]
+    rng = random.Random(1)
+    subsets += [set(rng.sample(CURRENCIES, rng.randint(4, len(CURRENCIES)))) for _ in range(200)]
+
+    for currencies in subsets:
+        assert table.conflicting_pairs(currencies) == _naive_conflicting_pairs(rules.forex_pairs, currencies)
+
+
+def test_non_forex_instruments_never_conflict():
+    table = ExposureTable(["EURUSD"], commodities=["XAUUSD", "USOIL"], indices=["US30"],
+                          instrument_currencies={"USOIL": "USD", "US30": "USD"})
+
+    assert table.conflicting_pairs({"XAU", "USD", "EUR"}) == ["EURUSD"]
+    assert table.names(table.exposure["USD"]) == ["EURUSD", "XAUUSD", "USOIL", "US30"]
+    assert table.names(table.mask(table.base, ["XAU", "EUR"])) == ["EURUSD", "XAUUSD"]
+    assert table.conflicting_pairs(()) == []
+
+
+def test_strategy_avoid_pairs_match_naive_loop():
+    rules = current_rules()
+    analyzer = NewsAnalyzer()
+    for size in range(len(CURRENCIES) + 1):
+        currencies = set(CURRENCIES[:size])
+        strategy = analyzer.determine_trading_strategy([], [], currencies, set())
+        assert strategy["avoid_pairs"] == _naive_conflicting_pairs(rules.forex_pairs, currencies)
@@ -0,0 +1,81 @@
+from impact_rules import ImpactMatcher, current_rules
+
+TITLES = [
+    "US Non-Farm Payrolls",
+    "Japan BoJ Interest Rate Decision",
+    "ECB Interest Rate Decision",
+    "US FOMC Rate Decision",
+    "US Core CPI m/m",
+    "UK GDP q/q",
+    "Crude Oil Inventories",
+    "US Retail Sales m/m",
+    "German Ifo Business Climate",
+    "",
+]
+
+
+def _substring_lookup(database, title):
+    # Busca antiga: primeira chave do banco contida no título
+    for key, value in database.items():
+        if key.lower() in title.lower():
+            return key
+    return None
+
+
+def test_matcher_agrees_with_substring_lookup_when_unambiguous():
+    database = current_rules().database
+    matcher = ImpactMatcher(database)
+    for title in TITLES:
+        contained = [key for key in database if key.lower() in title.lower()]
+        key = matcher.match_key(title)
+        if len(contained) <= 1:
+            assert key == _substring_lookup(database, title)
+        else:
+            # Com várias chaves no título, a escolhida continua sendo uma delas
+            assert key in contained
+
+
+def test_matcher_prefers_most_specific_key():
+    database = current_rules().database
+    title = "Japan BoJ Interest Rate Decision"
+
+    # A busca antiga parava na entrada genérica, que vem antes no banco
+    assert _substring_lookup(database, title) == "Interest Rate Decision"
+    assert ImpactMatcher(database).match_key(title) == "BoJ Interest Rate"
+
+
+def test_tie_breaks_scope_then_length_then_order():
+    database = {
+        "rate": {"currencies": ["USD", "EUR"]},
+        "rate decision": {"currencies": ["USD", "EUR"]},
+        "decision": {"currencies": ["USD"]},
+        "sales": {"currencies": ["USD"]},
+        "retail": {"currencies": ["USD"]},
+    }
+    matcher = ImpactMatcher(database)
+
+    assert matcher.match_key("Rate Decision") == "decision"
+    assert matcher.match_key("the rate decision is") == "decision"
+    assert matcher.match_key("RATE") == "rate"
+    assert matcher.match_key("Retail Sales") == "retail"
+    assert matcher.match_key("nothing here") is None
+
+
+def test_overlapping_keys_follow_failure_links():
+    database = {"abcd": {"currencies": ["USD"]}, "bce": {"currencies": ["USD"]}}
+    matcher = ImpactMatcher(database)
+
+    # "abc" casa parcialmente com "abcd"; o autômato precisa voltar para "bc"
+    assert matcher.match_key("xabce") == "bce"
+    assert matcher.match("xABCD") is database["abcd"]
+    assert matcher.match("abc") is None
+
+
+def test_get_news_impact_uses_the_matcher():
+    from news_analyzer import NewsAnalyzer
+
+    analyzer = NewsAnalyzer()
+    database = current_rules().database
+    for title in TITLES:
+        expected = ImpactMatcher(database).match(title)
+        assert analyzer.get_news_impact(title) == expected
@@ -0,0 +1,128 @@
+import json
+import os
+import pickle
+
+import pytest
+
+import impact_rules
+from impact_rules import (RESTORED_RULES_LIMIT, Impact, RuleSet, RulesError, current_rules, load_rules,
+                          refresh_rules, reload_rules, set_rules)
+from news_analyzer import NewsAnalyzer
+
+
+@pytest.fixture
+def restore_rules():
+    original = current_rules()
+    yield original
+    set_rules(original)
+
+
+def _spec(news=None):
+    spec = current_rules().to_dict()
+    if news is not None:
+        spec["news"] = news
+    return spec
+
+
+def _write(path, spec):
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def _analysis(name):
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [{"date": "2025-06-16", "time": "10:00", "name": name}]
+    return analyzer.analyze_confluence("2025-06-16")
+
+
+def test_symbol_fields_keep_the_original_semantics():
+    rules = current_rules()
+    oil = rules.database["Oil Inventories"]
+    retail = rules.database["Retail Sales"]
+
+    assert oil["instruments"] == ["XAUUSD", "USDCAD"] and oil["pairs_affected"] == []
+    assert retail["indices"] == ["US30", "SPX500", "NAS100"] and retail["instruments"] == []
+    # Como no banco original: instruments_affected traz só o campo instruments
+    assert _analysis("Crude Oil Inventories")["instruments_affected"] == ["USDCAD", "XAUUSD"]
+    assert _analysis("Crude Oil Inventories")["pairs_affected"] == []
+    assert _analysis("Core Retail Sales m/m")["instruments_affected"] == []
+
+
+def test_entries_are_normalized():
+    rules = RuleSet(_spec({" Custom ": {"impact": "high", "pairs_affected": ["eurusd"]}}))
+
+    entry = rules.database["Custom"]
+    assert entry["impact"] is Impact.HIGH and entry["impact"] == "HIGH"
+    assert entry["pairs_affected"] == ["EURUSD"]
+    assert entry["currencies"] == entry["instruments"] == entry["indices"] == []
+    assert entry["description"] == entry["trading_strategy"] == ""
+    assert RuleSet(rules.to_dict()).digest == rules.digest
+
+
+@pytest.mark.parametrize("entry, problem", [
+    ({"impact": "HUGE", "currencies": ["USD"]}, "impact deve ser"),
+    ({"impact": "HIGH", "instruments": ["ABCDEF"]}, "ABCDEF não está"),
+    ({"impact": "HIGH", "currencies": ["XYZ"]}, "moeda XYZ"),
+    ({"impact": "HIGH"}, "nenhuma moeda"),
+    ({"impact": "HIGH", "currencies": ["USD"], "pairs": ["EURUSD"]}, "campos desconhecidos"),
+])
+def test_invalid_entries_are_reported(entry, problem):
+    with pytest.raises(RulesError) as raised:
+        RuleSet(_spec({"Custom": entry}))
+
+    assert any(problem in item for item in raised.value.problems)
+
+
+def test_keys_differing_only_in_case_collide():
+    with pytest.raises(RulesError, match="repete a chave"):
+        RuleSet(_spec({"CPI": {"impact": "HIGH", "currencies": ["USD"]},
+                       "cpi": {"impact": "LOW", "currencies": ["USD"]}}))
+
+
+def test_duplicated_json_keys_are_rejected(tmp_path):
+    path = tmp_path / "rules.json"
+    text = json.dumps(_spec())
+    path.write_text(text[:-1] + ', "commodities": [], "indices": [], "commodities": []}', encoding="utf-8")
+
+    with pytest.raises(RulesError) as raised:
+        load_rules(str(path))
+    assert raised.value.problems == ["chave repetida: 'commodities'", "chave repetida: 'indices'"]
+    assert raised.value.source == str(path)
+
+
+def test_reload_swaps_rules_and_keeps_them_on_errors(tmp_path, restore_rules):
+    path = _write(tmp_path / "rules.json", _spec({"Custom": {"impact": "LOW", "currencies": ["USD"]}}))
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [{"date": "2025-06-16", "time": "10:00", "name": "Custom"}]
+    assert analyzer.analyze_confluence("2025-06-16")["medium_impact_news"] == []
+
+    loaded = reload_rules(path)
+    assert current_rules() is loaded
+    assert refresh_rules() is None
+
+    _write(tmp_path / "rules.json", _spec({"Custom": {"impact": "MEDIUM", "currencies": ["USD"]}}))
+    os.utime(path, ns=(0, 0))
+    refreshed = refresh_rules()
+    assert refreshed is not None and current_rules() is refreshed
+    # O analisador troca de regras e descarta o cache
+    assert len(analyzer.analyze_confluence("2025-06-16")["medium_impact_news"]) == 1
+
+    (tmp_path / "rules.json").write_text("{", encoding="utf-8")
+    with pytest.raises(RulesError):
+        reload_rules()
+    assert current_rules() is refreshed
+
+
+def test_restored_rules_cache_is_bounded():
+    copies = []
+    for level in range(RESTORED_RULES_LIMIT + 3):
+        rules = RuleSet(_spec({f"Custom {level}": {"impact": "HIGH", "currencies": ["USD"]}}))
+        first = pickle.loads(pickle.dumps(rules))
+        # Mesmo conteúdo: o RuleSet já compilado é reaproveitado
+        assert pickle.loads(pickle.dumps(rules)) is first
+        assert first.match(f"Custom {level}")["impact"] is Impact.HIGH
+        copies.append(first)
+
+    assert len(impact_rules._restored) <= RESTORED_RULES_LIMIT
+    # As regras em uso voltam como elas mesmas, sem entrar no cache
+    assert pickle.loads(pickle.dumps(current_rules())) is current_rules()
@@ -0,0 +1,124 @@
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+
+from kill_zones import KillZoneIndex, parse_time, resolve_timezone
+
+UTC = timezone.utc
+SESSIONS = {
+    "AM": {"start": "08:00", "end": "12:00", "timezone": UTC},
+    "PM": {"start": "13:00", "end": "17:00", "timezone": UTC},
+}
+IMPACTS = {"CPI": "VERY_HIGH", "NFP": "HIGH", "PMI": "MEDIUM"}
+
+
+def _event(date, hour, name="CPI"):
+    return {"date": date, "time": hour, "name": name}
+
+
+def _index(events):
+    return KillZoneIndex(events, lambda name: {"impact": IMPACTS[name]} if name in IMPACTS else None,
+                         sessions=SESSIONS)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("08:30", time(8, 30)),
+    ("8:30", time(8, 30)),
+    ("0830", time(8, 30)),
+    ("8:30 pm", time(20, 30)),
+    ("12 am", time(0, 0)),
+    ("", None),
+    ("24:00", None),
+    ("13 pm", None),
+    ("All Day", None),
+])
+def test_parse_time(text, expected):
+    assert parse_time(text) == expected
+
+
+def test_window_start_is_inclusive_and_end_exclusive():
+    events = [_event("2025-06-16", hour) for hour in ("07:59", "08:00", "11:59", "12:00", "13:00", "17:00")]
+    index = _index(events)
+
+    assert [item.event["time"] for item in index.events_in("AM")] == ["08:00", "11:59"]
+    assert [item.event["time"] for item in index.events_in("PM")] == ["13:00"]
+
+
+def test_untimed_events_are_counted_and_left_out():
+    index = _index([_event("2025-06-16", ""), _event("2025-06-16", "Tentative"), _event("2025-06-16", "09:00")])
+
+    assert index.untimed == 2
+    assert len(index.events_in("AM")) == 1
+
+
+def test_date_bounds_include_whole_days():
+    events = [_event(day, "09:00") for day in ("2025-06-15", "2025-06-16", "2025-06-17", "2025-06-18")]
+    index = _index(events)
+
+    days = [item.event["date"] for item in index.events_in("AM", "2025-06-16", "2025-06-17")]
+    assert days == ["2025-06-16", "2025-06-17"]
+    assert index.events_in("AM", "2025-06-19") == []
+
+
+def test_datetime_end_is_exclusive():
+    index = _index([_event("2025-06-16", "09:00"), _event("2025-06-16", "10:00")])
+    start = datetime(2025, 6, 16, 9, 0, tzinfo=UTC)
+
+    times = [item.event["time"] for item in index.events_in("AM", start, start + timedelta(hours=1))]
+    assert times == ["09:00"]
+
+
+def test_high_impact_filter():
+    events = [_event("2025-06-16", "09:00", "CPI"), _event("2025-06-16", "09:30", "PMI"),
+              _event("2025-06-16", "10:00", "NFP"), _event("2025-06-16", "10:30", "Unknown")]
+    index = _index(events)
+
+    assert [item.impact for item in index.events_in("AM")] == ["VERY_HIGH", "MEDIUM", "HIGH", None]
+    high = index.high_impact_by_session()
+    assert [item.event["name"] for item in high["AM"]] == ["CPI", "NFP"]
+    assert high["PM"] == []
+
+
+def test_next_event_is_strictly_after_a_datetime():
+    events = [_event("2025-06-16", "09:00"), _event("2025-06-16", "10:00"), _event("2025-06-17", "08:00")]
+    index = _index(events)
+
+    at_nine = datetime(2025, 6, 16, 9, 0, tzinfo=UTC)
+    assert index.next_event("AM", at_nine).event["time"] == "10:00"
+    assert index.next_event("AM", "2025-06-16").event["time"] == "09:00"
+    assert index.next_event("AM", "2025-06-17").event["date"] == "2025-06-17"
+    assert index.next_event("AM", "2025-06-18") is None
+    assert index.next_events("2025-06-18") == {"AM": None, "PM": None}
+
+
+def test_same_timestamp_keeps_calendar_order():
+    events = [_event("2025-06-16", "09:00", name) for name in ("NFP", "CPI", "PMI")]
+
+    assert [item.event["name"] for item in _index(events).events_in("AM")] == ["NFP", "CPI", "PMI"]
+
+
+def test_event_timezone_is_converted_to_the_session_timezone():
+    plus_two = timezone(timedelta(hours=2))
+    index = KillZoneIndex([_event("2025-06-16", "10:30")], sessions=SESSIONS, event_timezone=plus_two)
+
+    (item,) = index.events_in("AM")
+    assert item.timestamp == datetime(2025, 6, 16, 8, 30, tzinfo=UTC)
+
+
+def test_sessions_at_and_unknown_session():
+    index = _index([])
+
+    assert index.sessions_at(datetime(2025, 6, 16, 8, 0, tzinfo=UTC)) == ["AM"]
+    assert index.sessions_at(datetime(2025, 6, 16, 12, 30, tzinfo=UTC)) == []
+    with pytest.raises(KeyError):
+        index.events_in("Asia")
+
+
+def test_default_sessions_follow_new_york_daylight_saving():
+    if isinstance(resolve_timezone("EST"), timezone):
+        pytest.skip("sem base de fusos horários")
+    index = KillZoneIndex([_event("2025-01-15", "08:30", "CPI"), _event("2025-07-15", "08:30", "CPI")])
+
+    winter, summer = index.events_in("NY_AM")
+    assert winter.timestamp.utcoffset() == timedelta(hours=-5)
+    assert summer.timestamp.utcoffset() == timedelta(hours=-4)
@@ -0,0 +1,131 @@
+from news_analyzer import NewsAnalyzer, NewsEvent
+from news_store import NewsStore
+
+
+def _store_analyzer(*dates):
+    store = NewsStore(":memory:")
+    store.insert_many([NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", date) for date in dates])
+    return NewsAnalyzer(store=store)
+
+
+def test_empty_store_bounds_load_nothing():
+    analyzer = NewsAnalyzer(store=NewsStore(":memory:"))
+
+    assert analyzer.load_range("", "") == 0
+    assert analyzer.load_range(None, None) == 0
+    assert list(analyzer.analyze_range("", "")) == []
+
+
+def test_invalid_dates_match_in_memory_behavior():
+    analyzer = _store_analyzer("2024-05-03")
+    memory = NewsAnalyzer()
+    memory.news_data = [NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", "2024-05-03")]
+
+    for date in ("2025-1-1", "", "2024-13-01"):
+        assert analyzer.analyze_confluence(date) == memory.analyze_confluence(date)
+    assert analyzer.load_range("2024-05-03", "x") == 0
+    # Nada foi carregado por engano
+    assert analyzer.news_data == []
+
+
+def test_open_bounds_use_store_dates():
+    analyzer = _store_analyzer("2024-05-03", "2024-06-07")
+
+    assert analyzer.load_range("", "2024-05-31") == 1
+    assert analyzer.load_range(None, None) == 1
+    assert analyzer.dates == ["2024-05-03", "2024-06-07"]
+
+
+def test_stream_range_releases_each_chunk():
+    dates = [f"2024-05-{day:02d}" for day in range(1, 11)]
+    analyzer = _store_analyzer(*dates)
+    memory = NewsAnalyzer()
+    memory.news_data = analyzer.news_store.events()
+
+    seen = []
+    for date, analysis in analyzer.stream_range("", "", chunk_dates=3):
+        # Nunca mais que um bloco em memória
+        assert len(analyzer.dates) <= 3
+        seen.append((date, analysis))
+
+    assert seen == list(memory.analyze_range(dates[0], dates[-1]))
+    assert analyzer.dates == [] and analyzer._loaded_ranges == []
+
+
+def test_stream_range_keeps_what_was_already_loaded():
+    analyzer = _store_analyzer("2024-05-01", "2024-05-02", "2024-05-03")
+    analyzer.load_range("2024-05-02", "2024-05-02")
+
+    assert [date for date, _ in analyzer.stream_range("2024-05-01", "2024-05-03", chunk_dates=1)] == [
+        "2024-05-01", "2024-05-02", "2024-05-03"]
+    assert analyzer.dates == ["2024-05-02"]
+    assert analyzer._loaded_ranges == [("2024-05-02", "2024-05-02")]
+
+
+def test_stream_range_keeps_unsaved_news():
+    analyzer = _store_analyzer("2024-05-01", "2024-05-02")
+    cpi = NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-03")
+    analyzer.add_news(cpi)
+    analyzer.add_news(cpi.replace(date="2024-05-02"))
+
+    streamed = dict(analyzer.stream_range("", "", chunk_dates=2))
+
+    assert sorted(streamed) == ["2024-05-01", "2024-05-02", "2024-05-03"]
+    assert "error" not in streamed["2024-05-03"]
+    # Só o que veio do disco nesta chamada foi descartado
+    assert analyzer.dates == ["2024-05-02", "2024-05-03"]
+    assert analyzer.events_on("2024-05-03") == [cpi]
+    assert analyzer._is_loaded("2024-05-02") and not analyzer._is_loaded("2024-05-01")
+    # Uma nova leitura não duplica o que ficou em memória
+    assert analyzer.load_range("2024-05-01", "2024-05-03") == 1
+    assert len(analyzer.events_on("2024-05-02")) == 2
+
+
+def test_release_range_splits_loaded_interval():
+    analyzer = _store_analyzer("2024-05-01", "2024-05-05", "2024-05-09")
+    analyzer.load_range("2024-05-01", "2024-05-09")
+
+    assert analyzer.release_range("2024-05-04", "2024-05-06") == 1
+    assert analyzer._loaded_ranges == [("2024-05-01", "2024-05-03"), ("2024-05-07", "2024-05-09")]
+    assert analyzer.analyze_confluence("2024-05-05")["date"] == "2024-05-05"
+
+
+def test_mark_loaded_merges_overlapping_and_adjacent_ranges():
+    analyzer = NewsAnalyzer(store=NewsStore(":memory:"))
+
+    analyzer._mark_loaded("2024-05-10", "2024-05-12")
+    analyzer._mark_loaded("2024-05-01", "2024-05-03")
+    assert analyzer._loaded_ranges == [("2024-05-01", "2024-05-03"), ("2024-05-10", "2024-05-12")]
+
+    # Vizinho (dia seguinte) e sobreposto viram um só intervalo, inclusive na virada do mês
+    analyzer._mark_loaded("2024-05-04", "2024-05-05")
+    analyzer._mark_loaded("2024-05-11", "2024-06-01")
+    assert analyzer._loaded_ranges == [("2024-05-01", "2024-05-05"), ("2024-05-10", "2024-06-01")]
+
+    analyzer._mark_loaded("2024-04-30", "2024-05-09")
+    assert analyzer._loaded_ranges == [("2024-04-30", "2024-06-01")]
+    assert analyzer._is_loaded("2024-05-31") and not analyzer._is_loaded("2024-06-02")
+
+
+def test_missing_ranges_are_the_gaps_between_loaded_ranges():
+    analyzer = NewsAnalyzer(store=NewsStore(":memory:"))
+    assert analyzer._missing_ranges("2024-05-01", "2024-05-31") == [("2024-05-01", "2024-05-31")]
+
+    analyzer._mark_loaded("2024-05-05", "2024-05-10")
+    analyzer._mark_loaded("2024-05-20", "2024-05-31")
+
+    assert analyzer._missing_ranges("2024-05-01", "2024-06-02") == [
+        ("2024-05-01", "2024-05-04"), ("2024-05-11", "2024-05-19"), ("2024-06-01", "2024-06-02")]
+    assert analyzer._missing_ranges("2024-05-06", "2024-05-09") == []
+    assert analyzer._missing_ranges("2024-05-08", "2024-05-25") == [("2024-05-11", "2024-05-19")]
+    assert analyzer._missing_ranges("2024-04-01", "2024-04-30") == [("2024-04-01", "2024-04-30")]
+
+
+def test_load_range_reads_only_the_gaps():
+    analyzer = _store_analyzer("2024-05-03", "2024-05-10", "2024-05-15")
+
+    assert analyzer.load_range("2024-05-08", "2024-05-12") == 1
+    assert analyzer.load_range("2024-05-01", "2024-05-31") == 2
+    assert analyzer.load_range("2024-05-01", "2024-05-31") == 0
+    assert analyzer.dates == ["2024-05-03", "2024-05-10", "2024-05-15"]
+    assert analyzer._loaded_ranges == [("2024-05-01", "2024-05-31")]
@@ -0,0 +1,55 @@
+import pickle
+
+import pytest
+
+from news_analyzer import NewsAnalyzer, NewsEvent
+
+FIELDS = {"name": "US CPI m/m", "previous": "0.4%", "consensus": "0.3%", "time": "08:30", "date": "2024-05-15"}
+
+
+def test_reads_like_a_dict():
+    news = NewsEvent.coerce(dict(FIELDS))
+
+    assert news.to_dict() == FIELDS
+    assert {key: news[key] for key in news.keys()} == FIELDS
+    assert news.get("time") == "08:30" and news.get("impact_info") is None
+    assert "date" in news and "impact_info" not in news
+    with pytest.raises(KeyError):
+        news["impact_info"]
+    # Campos opcionais ausentes viram texto vazio
+    assert NewsEvent.coerce({"name": "US CPI m/m", "date": "2024-05-15"}).previous == ""
+
+
+def test_is_compact_and_interned():
+    first = NewsEvent(*("".join(part) for part in (["US ", "CPI m/m"], ["0.4", "%"], ["0.3", "%"],
+                                                   ["08:", "30"], ["2024-05-", "15"])))
+    second = NewsEvent.coerce(dict(FIELDS))
+
+    assert not hasattr(first, "__dict__")
+    # Textos iguais são o mesmo objeto
+    assert all(getattr(first, field) is getattr(second, field) for field in FIELDS)
+
+
+def test_replace_equality_and_pickle():
+    news = NewsEvent.coerce(FIELDS)
+    changed = news.replace(consensus="0.5%")
+
+    assert news.consensus == "0.3%" and changed.consensus == "0.5%"
+    assert changed != news and changed.replace(consensus="0.3%") == news
+    assert NewsEvent.coerce(news) is news
+    assert pickle.loads(pickle.dumps(news)) == news
+    with pytest.raises(TypeError):
+        hash(news)
+
+
+def test_analysis_does_not_touch_stored_events():
+    analyzer = NewsAnalyzer()
+    analyzer.add_news(FIELDS)
+
+    analysis = analyzer.analyze_confluence("2024-05-15")
+    entry = (analysis["high_impact_news"] + analysis["medium_impact_news"])[0]
+
+    # Saída em dicionários, como antes; a notícia guardada continua sem impact_info
+    assert isinstance(entry, dict) and "impact_info" in entry
+    assert {key: entry[key] for key in FIELDS} == FIELDS
+    assert analyzer.events_on("2024-05-15")[0].to_dict() == FIELDS
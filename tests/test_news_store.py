@@ -0,0 +1,80 @@
+from news_analyzer import NewsAnalyzer, NewsEvent
+from news_store import NewsStore
+
+# Mesmo título, horário e valores publicados para dois países
+CALENDAR = [
+    NewsEvent("Interest Rate Decision", "5.25%", "5.25%", "08:00", "2024-05-03"),
+    NewsEvent("Interest Rate Decision", "5.25%", "5.25%", "08:00", "2024-05-03"),
+    NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", "2024-05-03"),
+]
+
+
+def test_identical_rows_are_kept_and_reimport_is_idempotent():
+    store = NewsStore(":memory:")
+    store.insert_many(CALENDAR)
+    store.insert_many(CALENDAR)
+
+    assert store.events() == CALENDAR
+
+
+def test_store_analysis_matches_memory():
+    memory = NewsAnalyzer()
+    memory.news_data = CALENDAR
+    store = NewsStore(":memory:")
+    store.insert_many(CALENDAR)
+    stored = NewsAnalyzer(store=store)
+
+    assert stored.analyze_confluence("2024-05-03") == memory.analyze_confluence("2024-05-03")
+
+
+def test_replace_dates_keeps_identical_rows():
+    store = NewsStore(":memory:")
+    store.insert_many(CALENDAR[2:])
+    store.replace_dates({"2024-05-03": CALENDAR[:2]})
+
+    assert store.events() == CALENDAR[:2]
+
+
+def test_rolled_back_titles_are_classified_on_the_next_write():
+    store = NewsStore(":memory:")
+
+    def failing():
+        yield CALENDAR[2]
+        raise RuntimeError("exportador interrompido")
+
+    try:
+        store.insert_many(failing(), batch_size=1)
+    except RuntimeError:
+        pass
+    assert len(store) == 0
+
+    store.insert_many(CALENDAR[2:])
+    assert store.events(currency="USD") == CALENDAR[2:]
+    assert sum(store.impact_counts().values()) == 1
+
+
+def test_cli_analyzer_bounds(tmp_path):
+    import argparse
+
+    import pytest
+
+    from news_store import open_cli_analyzer
+
+    parser = argparse.ArgumentParser()
+    calendar = tmp_path / "calendario.csv"
+    calendar.write_text("date,name\n2024-05-03,US CPI\n2024-05-15,US GDP\n", encoding="utf-8")
+
+    analyzer, store, start, end = open_cli_analyzer(parser, db=str(tmp_path / "vazio.sqlite3"))
+    assert (start, end) == ("", "")
+    assert dict(analyzer.analyze_range(start, end)) == {}
+    store.close()
+
+    analyzer, store, start, end = open_cli_analyzer(parser, str(calendar), str(tmp_path / "h.sqlite3"))
+    assert (start, end) == ("2024-05-03", "2024-05-15")
+    store.close()
+
+    analyzer, store, start, end = open_cli_analyzer(parser, str(calendar), start="2024-05-10")
+    assert store is None and (start, end) == ("2024-05-10", "2024-05-15")
+
+    with pytest.raises(SystemExit):
+        open_cli_analyzer(parser)
@@ -0,0 +1,96 @@
+import pytest
+
+from news_analyzer import NewsEvent
+
+CALENDAR = [NewsEvent(f"Headline {index}", "", "", "08:30", "2024-05-03") for index in range(2500)]
+
+
+@pytest.fixture
+def model(qapp):
+    import trading_analyzer
+    return trading_analyzer.NewsTableModel()
+
+
+@pytest.fixture
+def checked_model(model):
+    from PyQt5.QtTest import QAbstractItemModelTester
+
+    # Confere a consistência dos sinais a cada alteração (e busca todas as
+    # linhas, então não serve para os testes de fetchMore)
+    model.tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    return model
+
+
+def test_rows_are_fetched_in_batches(model):
+    model.set_events(CALENDAR)
+
+    assert model.rowCount() == model.FETCH_BATCH
+    assert model.canFetchMore()
+    model.fetchMore()
+    model.fetchMore()
+    assert model.rowCount() == len(CALENDAR) and not model.canFetchMore()
+    # Linhas ainda não exibidas também vão para a análise
+    model.set_events(CALENDAR)
+    assert model.events() == CALENDAR
+
+
+def test_cells_read_and_edit_the_events(checked_model):
+    from PyQt5.QtCore import Qt
+
+    model = checked_model
+    model.set_events(CALENDAR[:3])
+    index = model.index(1, 2)
+
+    assert model.data(model.index(1, 0)) == "Headline 1"
+    assert model.headerData(2, Qt.Horizontal) == "Consensus"
+    assert model.flags(index) & Qt.ItemIsEditable
+    assert model.setData(index, " 0.3% ")
+    assert model.events()[1] == CALENDAR[1].replace(consensus="0.3%")
+    # A notícia original não é alterada
+    assert CALENDAR[1].consensus == ""
+
+
+def test_paste_block_extends_the_table(checked_model):
+    model = checked_model
+    model.clear(rows=2)
+
+    model.paste_block(1, 0, "US CPI m/m\t0.4%\t0.3%\t08:30\t2024-05-15\textra\nUK GDP q/q\t0.1%\n")
+
+    assert model.rowCount() == 3
+    events = model.events()
+    assert events[0] == NewsEvent("")
+    assert events[1] == NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-15")
+    assert events[2] == NewsEvent("UK GDP q/q", "0.1%")
+
+
+def test_append_rows_waits_for_unfetched_rows(model):
+    model.set_events(CALENDAR)
+    model.append_rows(2)
+
+    assert model.rowCount() == model.FETCH_BATCH
+    assert len(model.events()) == len(CALENDAR) + 2
+
+    model.clear(rows=1)
+    model.append_rows(2)
+    assert model.rowCount() == 3
+
+
+def test_paste_block_over_unfetched_rows(model):
+    model.set_events(CALENDAR)
+
+    model.paste_block(model.FETCH_BATCH - 1, 1, "0.1%\n0.2%\n")
+
+    assert model.rowCount() == model.FETCH_BATCH + 1
+    events = model.events()
+    assert len(events) == len(CALENDAR)
+    assert [event.previous for event in events[model.FETCH_BATCH - 1:model.FETCH_BATCH + 2]] == ["0.1%", "0.2%", ""]
+    assert events[model.FETCH_BATCH].name == f"Headline {model.FETCH_BATCH}"
+
+
+def test_paste_block_into_empty_table(checked_model):
+    checked_model.set_events([])
+
+    checked_model.paste_block(0, 0, "US CPI m/m\nUK GDP q/q\n")
+
+    assert checked_model.rowCount() == 2
+    assert [event.name for event in checked_model.events()] == ["US CPI m/m", "UK GDP q/q"]
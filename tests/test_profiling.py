@@ -0,0 +1,72 @@
+from news_analyzer import AnalysisProfiler, NewsAnalyzer, NewsEvent
+
+CALENDAR = [
+    NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", "2024-05-03"),
+    NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-03"),
+    NewsEvent("Building Permits", "", "", "10:00", "2024-05-03"),
+    NewsEvent("UK GDP q/q", "0.1%", "0.2%", "02:00", "2024-05-10"),
+]
+
+
+def test_profiled_analysis_matches_and_records_stages():
+    plain = NewsAnalyzer()
+    plain.news_data = CALENDAR
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    profiler = analyzer.enable_profiling()
+
+    assert analyzer.analyze_confluence("2024-05-03") == plain.analyze_confluence("2024-05-03")
+    record = profiler.last
+    assert record["date"] == "2024-05-03"
+    assert set(record["stages"]) == {"filter", "impact", "strategy", "total"}
+    assert record["counts"] == {"cache_misses": 1, "events_filtered": 3, "lookups": 3, "matched": 2}
+    assert record["stages"]["total"] >= record["stages"]["impact"] >= 0
+
+    # Segunda vez: acerto de cache, só o total
+    analyzer.analyze_confluence("2024-05-03")
+    assert profiler.last["counts"] == {"cache_hits": 1}
+    assert set(profiler.last["stages"]) == {"total"}
+
+
+def test_summary_accumulates_and_resets():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    profiler = analyzer.enable_profiling(AnalysisProfiler(history=1))
+
+    list(analyzer.analyze_range("2024-05-01", "2024-05-31"))
+    analyzer.analyze_confluence("2024-05-10")
+    profiler.record_stage("render", 0.002, rows=5)
+
+    summary = profiler.summary()
+    assert summary["counts"]["cache_misses"] == 2 and summary["counts"]["cache_hits"] == 1
+    assert summary["counts"]["rows"] == 5
+    assert summary["stages"]["total"]["calls"] == 3
+    assert summary["stages"]["render"] == {"seconds": 0.002, "calls": 1}
+    # Histórico limitado; a etapa avulsa entra no último registro
+    assert len(profiler.records) == 1 and profiler.last["stages"]["render"] == 0.002
+    assert "render" in profiler.format_summary() and "2024-05-10" in profiler.format_record(profiler.last)
+
+    profiler.reset()
+    assert profiler.summary() == {"stages": {}, "counts": {}} and profiler.last is None
+
+
+def test_disabled_profiling_records_nothing():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    profiler = analyzer.enable_profiling()
+    analyzer.disable_profiling()
+
+    analyzer.analyze_confluence("2024-05-03")
+
+    assert analyzer.profiler is None and profiler.last is None
+
+
+def test_pool_ranges_count_cache_hits_and_misses():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    profiler = analyzer.enable_profiling()
+    analyzer.analyze_confluence("2024-05-03")
+
+    analyzer.plan_range("2024-05-01", "2024-05-31")
+
+    assert profiler.counters["cache_hits"] == 1 and profiler.counters["cache_misses"] == 2
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+
+import pytest
+
+from benchmark import generate_calendar
+from news_analyzer import NewsAnalyzer
+from report_export import (DAILY_COLUMNS, PERIOD_COLUMNS, export_report, main, period_key,
+                           write_report)
+
+CALENDAR = list(generate_calendar(300, 45))
+START, END = "2000-01-01", "2000-02-14"
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = CALENDAR
+    return analyzer
+
+
+def _analyses(analyzer):
+    return [(date, analyzer.analyze_confluence(date)) for date in analyzer.dates_between(START, END)]
+
+
+@pytest.mark.parametrize("date, period, key", [
+    ("2024-06-17", "daily", "2024-06-17"),
+    ("2024-06-17", "weekly", "2024-W25"),
+    ("2024-12-30", "weekly", "2025-W01"),
+    ("2024-06-17", "monthly", "2024-06"),
+    ("2024-06-17", "yearly", "2024"),
+])
+def test_period_key(date, period, key):
+    assert period_key(date, period) == key
+
+
+def test_daily_jsonl_has_the_full_analysis(analyzer):
+    output = io.StringIO()
+
+    count = write_report(analyzer.stream_range(START, END), output, "daily", "jsonl")
+
+    lines = output.getvalue().splitlines()
+    assert count == len(lines) == len(analyzer.dates_between(START, END))
+    for line, (date, analysis) in zip(lines, _analyses(analyzer)):
+        assert json.loads(line) == json.loads(json.dumps(analysis, ensure_ascii=False))
+
+
+def test_daily_csv_rows(analyzer):
+    output = io.StringIO()
+
+    write_report(analyzer.stream_range(START, END), output, "daily", "csv")
+
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert tuple(rows[0]) == DAILY_COLUMNS
+    for row, (date, analysis) in zip(rows, _analyses(analyzer)):
+        assert row["date"] == date
+        assert row["high_impact"] == str(len(analysis["high_impact_news"]))
+        assert row["currencies_affected"] == ", ".join(analysis["currencies_affected"])
+        assert row["avoid_pairs"] == ", ".join(analysis["strategy"]["avoid_pairs"])
+
+
+@pytest.mark.parametrize("period", ["weekly", "monthly"])
+def test_period_summaries_match_naive_totals(analyzer, period):
+    output = io.StringIO()
+
+    write_report(analyzer.stream_range(START, END), output, period, "jsonl")
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    groups = {}
+    for date, analysis in _analyses(analyzer):
+        groups.setdefault(period_key(date, period), []).append((date, analysis))
+    assert [record["period"] for record in records] == list(groups)
+    for record in records:
+        days = groups[record["period"]]
+        assert set(record) == set(PERIOD_COLUMNS)
+        assert (record["start"], record["end"], record["days"]) == (days[0][0], days[-1][0], len(days))
+        assert record["events"] == sum(len(a["high_impact_news"]) + len(a["medium_impact_news"]) for _, a in days)
+        assert record["high_risk_days"] == sum(a["strategy"]["risk_level"] == "HIGH" for _, a in days)
+        avoided = sum(len(a["strategy"]["avoid_pairs"]) for _, a in days)
+        assert sum(record["avoid_pairs"].values()) == avoided
+        # Contagens em ordem decrescente
+        assert list(record["avoid_pairs"].values()) == sorted(record["avoid_pairs"].values(), reverse=True)
+
+
+def test_html_is_escaped_and_marks_high_risk_days():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [{"date": "2025-06-16", "time": "08:30", "name": "Non-Farm Payrolls <b>"},
+                          {"date": "2025-06-16", "time": "10:00", "name": "CPI m/m"},
+                          {"date": "2025-06-16", "time": "14:00", "name": "FOMC Rate Decision"}]
+    output = io.StringIO()
+
+    count = write_report(analyzer.stream_range("2025-06-16", "2025-06-16"), output, "daily", "html",
+                         title="<script>alert(1)</script>")
+
+    page = output.getvalue()
+    assert count == 1
+    assert "<script>" not in page and "&lt;script&gt;" in page
+    assert "Non-Farm Payrolls &lt;b&gt;" in page
+    assert analyzer.analyze_confluence("2025-06-16")["strategy"]["risk_level"] == "HIGH"
+    assert '<tr class="risk-high">' in page
+    assert page.rstrip().endswith("</html>")
+    assert "1 linha(s)" in page
+
+
+def test_export_report_picks_the_format_by_extension(analyzer, tmp_path):
+    path = tmp_path / "mensal.csv"
+
+    count = export_report(analyzer, str(path), START, END, period="monthly")
+
+    rows = list(csv.reader(path.open(encoding="utf-8")))
+    assert rows[0] == list(PERIOD_COLUMNS)
+    assert count == len(rows) - 1 == 2
+    with pytest.raises(ValueError):
+        export_report(analyzer, str(tmp_path / "relatorio.pdf"), START, END)
+    with pytest.raises(ValueError):
+        write_report([], io.StringIO(), "daily", "xml")
+    with pytest.raises(ValueError):
+        write_report([], io.StringIO(), "hourly", "csv")
+
+
+def test_cli_writes_the_report(tmp_path, capsys):
+    calendar = tmp_path / "calendario.jsonl"
+    lines = [json.dumps(event.to_dict()) + "\n" for event in CALENDAR[:50]]
+    calendar.write_text("".join(lines), encoding="utf-8")
+    output = tmp_path / "dias.jsonl"
+
+    assert main([str(calendar), "-o", str(output)]) == 0
+
+    dates = sorted({event["date"] for event in CALENDAR[:50]})
+    assert [json.loads(line)["date"] for line in output.read_text(encoding="utf-8").splitlines()] == dates
+    assert f"{len(dates)} linha(s)" in capsys.readouterr().err
@@ -0,0 +1,80 @@
+import pytest
+
+from news_analyzer import NewsAnalyzer, NewsEvent
+
+
+@pytest.fixture
+def trading_analyzer(qapp):
+    import trading_analyzer
+    return trading_analyzer
+
+
+@pytest.fixture
+def analysis():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [NewsEvent("US Non-Farm Payrolls", "200K", "180K", "08:30", "2024-05-03"),
+                          NewsEvent("US CPI m/m", "0.4%", "0.3%", "08:30", "2024-05-03"),
+                          NewsEvent("Euro Area PMI", "", "", "04:00", "2024-05-03")]
+    return analyzer.analyze_confluence("2024-05-03")
+
+
+def test_analysis_rows_follow_the_analysis(trading_analyzer, analysis):
+    rows = trading_analyzer.analysis_rows(analysis)
+    kinds = [row.kind for row in rows]
+
+    assert kinds[0] == "header" and "2024-05-03" in rows[0].text
+    news = [row.text for row in rows if row.kind == "news"]
+    assert len(news) == len(analysis["high_impact_news"]) + len(analysis["medium_impact_news"])
+    assert "📰 US Non-Farm Payrolls" in news
+    assert any("📊 Previous: 200K | Consensus: 180K" in row.detail for row in rows if row.kind == "news")
+    risk = next(row for row in rows if row.text == "⚠️ NÍVEL DE RISCO:")
+    assert risk.detail == analysis["strategy"]["risk_level"]
+    assert kinds[-1] == "tip"
+
+
+def test_error_analysis_is_a_single_row(trading_analyzer):
+    rows = trading_analyzer.analysis_rows({"error": "Nenhuma notícia encontrada para esta data"})
+
+    assert [(row.kind, row.text) for row in rows] == [("error", "❌ Nenhuma notícia encontrada para esta data")]
+
+
+def test_results_model_rows(trading_analyzer, analysis):
+    from PyQt5.QtTest import QAbstractItemModelTester
+
+    model = trading_analyzer.AnalysisResultsModel()
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+
+    model.set_analysis(analysis)
+    count = model.rowCount()
+    model.add_analysis(analysis)
+    assert model.rowCount() == 2 * count
+    row = model.data(model.index(0, 0), model.ROW_ROLE)
+    assert row == trading_analyzer.analysis_rows(analysis)[0]
+    assert model.data(model.index(0, 0)) == row.text
+    model.clear()
+    assert model.rowCount() == 0
+    del tester
+
+
+def test_delegate_wraps_long_rows(trading_analyzer, qapp):
+    from PyQt5.QtWidgets import QListView, QStyleOptionViewItem
+
+    model = trading_analyzer.AnalysisResultsModel()
+    model.set_rows([trading_analyzer.ResultRow("tip", trading_analyzer.ICT_TIP, "#004085", "")])
+    view = QListView()
+    view.setModel(model)
+    delegate = trading_analyzer.ResultDelegate(view)
+    index = model.index(0, 0)
+
+    view.show()
+    sizes = []
+    for width in (900, 300):
+        view.resize(width, 400)
+        qapp.processEvents()
+        sizes.append(delegate.sizeHint(QStyleOptionViewItem(), index))
+    view.close()
+
+    # A linha ocupa a largura da lista e a altura acompanha a quebra do texto
+    wide, narrow = sizes
+    assert wide.width() > narrow.width()
+    assert narrow.height() > wide.height() > 0
@@ -0,0 +1,85 @@
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    from trading_analyzer import DB_ENV, TradingAnalyzerApp
+
+    monkeypatch.setenv(DB_ENV, str(tmp_path / "historico.sqlite3"))
+    monkeypatch.delenv("TRADING_ANALYZER_PROFILE", raising=False)
+    style = qapp.styleSheet()
+    window = TradingAnalyzerApp()
+    yield window
+    window.close()
+    window.deleteLater()
+    qapp.setStyleSheet(style)
+
+
+def _wait(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_construction_defers_store_and_results_panel(window, tmp_path):
+    assert window.news_analyzer.news_store is None
+    assert not (tmp_path / "historico.sqlite3").exists()
+    assert window.results_model is None and window.results_view is None
+    assert window._results_placeholder is not None
+
+
+def test_store_opens_after_the_first_paint(window, qapp, tmp_path):
+    window.show()
+
+    assert _wait(qapp, lambda: window.news_analyzer.news_store is not None)
+    assert window._painted
+    assert window.news_analyzer.news_store.path == str(tmp_path / "historico.sqlite3")
+
+
+def test_first_action_opens_the_store_before_the_paint(window):
+    window.attach_store()
+    store = window.news_analyzer.news_store
+    assert store is not None
+
+    # A pintura depois não abre um segundo histórico
+    window.finish_startup()
+    assert window.news_analyzer.news_store is store
+
+
+def test_results_panel_is_built_once_on_first_use(window, qapp):
+    window.show_initial_message()
+    window.clear_results()
+    assert window.results_model is None
+
+    model = window.results_panel()
+    view = window.results_view
+    assert window._results_placeholder is None
+    assert window._results_layout.indexOf(view) >= 0
+    assert window.results_panel() is model and window.results_view is view
+
+
+def test_style_is_applied_once_on_the_application(window, qapp):
+    from PyQt5.QtWidgets import QWidget
+
+    from trading_analyzer import APP_STYLE
+
+    assert qapp.styleSheet() == APP_STYLE
+    assert all(not widget.styleSheet() for widget in window.findChildren(QWidget))
+
+
+def test_startup_report_marks_in_order():
+    pytest.importorskip("PyQt5.QtWidgets")
+    from benchmark import _startup_once
+
+    env = dict(os.environ, TRADING_ANALYZER_STARTUP_REPORT="1", QT_QPA_PLATFORM="offscreen")
+    env.pop("TRADING_ANALYZER_DB", None)
+
+    marks = _startup_once(env)
+
+    assert 0 < marks["window"] <= marks["first_paint"] <= marks["ready"]
+    assert marks["process_first_paint"] <= marks["process_ready"]
@@ -0,0 +1,41 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from news_analyzer import NewsAnalyzer, NewsEvent
+from surprise import SurpriseTable, parse_value
+
+
+def _event(date, name="US Non-Farm Payrolls", previous="200K", consensus="180K"):
+    return NewsEvent(name, previous, consensus, "08:30", date)
+
+
+def test_parse_value_units_and_locales():
+    assert parse_value("0.3%") == (0.3, True)
+    assert parse_value("215K") == (215_000.0, False)
+    assert parse_value("-1,2%") == (-1.2, True)
+    assert parse_value("1.234,5M") == (1_234.5e6, False)
+    assert parse_value("(0.4)") == (-0.4, False)
+    value, percent = parse_value("n/a")
+    assert value != value and not percent
+
+
+def test_surprise_scores_span_follows_dates_not_insertion_order():
+    analyzer = NewsAnalyzer()
+    analyzer.news_data = [_event("2024-03-01"), _event("2024-01-05"), _event("2024-02-02")]
+
+    table = analyzer.surprise_scores()
+
+    assert list(table.dates) == ["2024-01-05", "2024-02-02", "2024-03-01"]
+    assert [row["date"] for row in table.rows("2024-01-01", "2024-01-31")] == ["2024-01-05"]
+    assert table.by_currency("2024-01-01", "2024-01-31")["USD"]["events"] == 1
+    assert table.by_currency("2024-02-01", "2024-03-31")["USD"]["events"] == 2
+
+
+def test_table_sorts_unordered_events():
+    events = [_event("2024-03-01", previous="1"), _event("2024-01-05", previous="2")]
+
+    table = SurpriseTable(events)
+
+    assert [row["date"] for row in table.rows()] == ["2024-01-05", "2024-03-01"]
+    assert table.row(0)["previous_value"] == 2.0
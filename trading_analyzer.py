@@ -1,210 +1,628 @@
+import os
 import sys
-import json
-from datetime import datetime, timedelta
+import logging
+import threading
+from time import perf_counter
+from collections import namedtuple
+
+# Início do processo (antes do PyQt5), referência das marcas de abertura
+_STARTED = perf_counter()
+
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QTableWidget, QTableWidgetItem, 
-                             QPushButton, QTextEdit, QLabel, QFrame, 
-                             QScrollArea, QGroupBox, QGridLayout, QComboBox,
-                             QDateEdit, QHeaderView, QMessageBox)
-from PyQt5.QtCore import Qt, QDate, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QColor, QPalette
+                             QHBoxLayout, QTableView, QListView, QPushButton,
+                             QLabel, QStyledItemDelegate, QGroupBox,
+                             QDateEdit, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import (Qt, QDate, QThread, QTimer, pyqtSignal, QAbstractTableModel,
+                          QAbstractListModel, QModelIndex, QRect, QSize)
+from PyQt5.QtGui import QFont, QColor, QKeySequence, QFontMetrics
 
-# Configurações de análise de notícias
-NEWS_IMPACT_DATABASE = {
-    # Decisões de Juros
-    "Interest Rate Decision": {
-        "impact": "HIGH",
-        "currencies": ["USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD"],
-        "description": "Decisões de taxa de juros impactam diretamente a moeda",
-        "trading_strategy": "Aguardar breakout após confirmação da decisão"
-    },
-    "BoJ Interest Rate": {
-        "impact": "HIGH",
-        "currencies": ["JPY"],
-        "pairs_affected": ["USDJPY", "EURJPY", "GBPJPY", "AUDJPY", "CADJPY"],
-        "description": "Banco do Japão - impacto direto no JPY"
-    },
-    "FOMC Rate Decision": {
-        "impact": "VERY_HIGH",
-        "currencies": ["USD"],
-        "pairs_affected": ["EURUSD", "GBPUSD", "USDJPY", "USDCHF", "USDCAD", "AUDUSD", "NZDUSD"],
-        "description": "Federal Reserve - maior impacto no USD"
-    },
-    
-    # Indicadores Econômicos
-    "Empire State Manufacturing Index": {
-        "impact": "MEDIUM",
-        "currencies": ["USD"],
-        "pairs_affected": ["EURUSD", "GBPUSD", "USDJPY"],
-        "description": "Indicador de manufatura de NY - impacto moderado no USD"
-    },
-    "Non-Farm Payrolls": {
-        "impact": "VERY_HIGH",
-        "currencies": ["USD"],
-        "pairs_affected": ["EURUSD", "GBPUSD", "USDJPY", "USDCHF", "USDCAD"],
-        "description": "Dados de emprego dos EUA - impacto muito alto no USD"
-    },
-    "CPI": {
-        "impact": "HIGH",
-        "currencies": ["USD", "EUR", "GBP"],
-        "description": "Índice de preços ao consumidor - impacto na inflação"
-    },
-    "GDP": {
-        "impact": "HIGH",
-        "currencies": ["USD", "EUR", "GBP", "JPY", "AUD", "CAD"],
-        "description": "Produto Interno Bruto - indicador de crescimento econômico"
-    },
-    "PMI": {
-        "impact": "MEDIUM",
-        "currencies": ["USD", "EUR", "GBP"],
-        "description": "Índice de Gerentes de Compras - indicador de atividade econômica"
-    },
-    
-    # Commodities
-    "Oil Inventories": {
-        "impact": "MEDIUM",
-        "instruments": ["XAUUSD", "USDCAD"],
-        "description": "Estoques de petróleo - impacto em CAD e ouro"
-    },
-    "Gold": {
-        "impact": "HIGH",
-        "instruments": ["XAUUSD"],
-        "description": "Notícias relacionadas ao ouro"
-    },
-    
-    # Índices
-    "Retail Sales": {
-        "impact": "HIGH",
-        "currencies": ["USD"],
-        "indices": ["US30", "SPX500", "NAS100"],
-        "description": "Vendas no varejo - impacto em índices americanos"
-    }
-}
+from impact_rules import refresh_rules
+from news_analyzer import NewsAnalyzer, NewsEvent
 
-# Sessões de trading
-TRADING_SESSIONS = {
-    "London": {"start": "03:00", "end": "12:00", "timezone": "EST"},
-    "NY_AM": {"start": "08:00", "end": "12:00", "timezone": "EST"},
-    "NY_PM": {"start": "13:00", "end": "17:00", "timezone": "EST"},
-    "Overlap": {"start": "08:00", "end": "12:00", "timezone": "EST"}
-}
+logger = logging.getLogger(__name__)
 
-# Pares de moedas
-FOREX_PAIRS = {
-    "majors": ["EURUSD", "GBPUSD", "USDJPY", "USDCHF", "USDCAD", "AUDUSD", "NZDUSD"],
-    "secondary": ["EURJPY", "GBPJPY", "EURGBP", "AUDJPY", "EURAUD", "GBPAUD", "CADJPY"]
-}
+# Tabelas que eram importadas daqui; vêm do news_analyzer no momento do
+# acesso (as do arquivo de regras refletem as regras em uso)
+_NEWS_ANALYZER_TABLES = ("NEWS_IMPACT_DATABASE", "TRADING_SESSIONS", "FOREX_PAIRS", "COMMODITIES", "INDICES")
 
-COMMODITIES = ["XAUUSD", "XAGUSD", "USOIL", "UKOIL"]
-INDICES = ["US30", "SPX500", "NAS100", "GER30", "UK100"]
 
-class NewsAnalyzer:
-    def __init__(self):
-        self.news_data = []
+def __getattr__(name):
+    if name in _NEWS_ANALYZER_TABLES:
+        import news_analyzer
+        return getattr(news_analyzer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Histórico persistente, só se pedido: TRADING_ANALYZER_DB=caminho do SQLite
+DB_ENV = "TRADING_ANALYZER_DB"
+
+# TRADING_ANALYZER_STARTUP_REPORT=1 escreve as marcas de abertura no stdout e
+# fecha a aplicação assim que ela fica pronta (benchmark.py --only startup)
+STARTUP_REPORT_ENV = "TRADING_ANALYZER_STARTUP_REPORT"
+
+
+# Linha vazia compartilhada (NewsEvent não é alterada, só substituída)
+EMPTY_NEWS = NewsEvent("")
+
+
+class NewsTableModel(QAbstractTableModel):
+    """Modelo da tabela de notícias sobre uma lista de NewsEvent
+    
+    Não cria objetos por célula: cada linha é a própria notícia que vai para o
+    NewsAnalyzer. Linhas são entregues à view em lotes (fetchMore) conforme a
+    rolagem, então calendários grandes abrem sem materializar tudo na tela.
+    """
+    COLUMNS = [("Notícia", "name"), ("Previous", "previous"), ("Consensus", "consensus"),
+               ("Horário", "time"), ("Data", "date")]
+    FETCH_BATCH = 1000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._events = []
+        self._loaded = 0
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
         
-    def add_news(self, news_item):
-        self.news_data.append(news_item)
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
         
-    def analyze_confluence(self, date):
-        """Analisa confluência de notícias para uma data específica"""
-        daily_news = [news for news in self.news_data if news['date'] == date]
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._events)
         
-        if not daily_news:
-            return {"error": "Nenhuma notícia encontrada para esta data"}
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, len(self._events) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return getattr(self._events[index.row()], self.COLUMNS[index.column()][1])
+        
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        field = self.COLUMNS[index.column()][1]
+        event = self._events[index.row()]
+        self._events[index.row()] = event.replace(**{field: str(value).strip()})
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+        
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section][0]
+        return section + 1
+        
+    def events(self):
+        """Cópia da lista de notícias (inclusive linhas ainda não exibidas)"""
+        return list(self._events)
+        
+    def set_events(self, events):
+        """Substitui todo o conteúdo da tabela"""
+        self.beginResetModel()
+        self._events = [NewsEvent.coerce(event) for event in events]
+        self._loaded = min(len(self._events), self.FETCH_BATCH)
+        self.endResetModel()
+        
+    def clear(self, rows=10):
+        self.set_events([EMPTY_NEWS] * rows)
+        
+    def append_rows(self, count=1):
+        """Adiciona linhas vazias ao fim da tabela"""
+        if self._loaded < len(self._events):
+            # Ainda há linhas não exibidas: as novas aparecem com o fetchMore
+            self._events.extend([EMPTY_NEWS] * count)
+            return
+        self.beginInsertRows(QModelIndex(), len(self._events), len(self._events) + count - 1)
+        self._events.extend([EMPTY_NEWS] * count)
+        self._loaded = len(self._events)
+        self.endInsertRows()
+        
+    def paste_block(self, row, column, text):
+        """Cola um bloco de texto (linhas separadas por quebra, colunas por tab)"""
+        lines = text.rstrip("\r\n").splitlines()
+        if not lines:
+            return
+        last_column = len(self.COLUMNS) - 1
+        end_row = row + len(lines)
+        pasted = []
+        for offset, line in enumerate(lines):
+            changes = {}
+            for cell_column, cell in enumerate(line.split("\t"), column):
+                if cell_column > last_column:
+                    break
+                changes[self.COLUMNS[cell_column][1]] = cell.strip()
+            event = self._events[row + offset] if row + offset < len(self._events) else EMPTY_NEWS
+            pasted.append(event.replace(**changes))
             
-        # Análise de impacto
-        high_impact_news = []
-        medium_impact_news = []
-        currencies_affected = set()
-        pairs_affected = set()
-        instruments_affected = set()
-        
-        for news in daily_news:
-            impact_info = self.get_news_impact(news['name'])
-            if impact_info:
-                news['impact_info'] = impact_info
-                
-                if impact_info['impact'] in ['VERY_HIGH', 'HIGH']:
-                    high_impact_news.append(news)
-                elif impact_info['impact'] == 'MEDIUM':
-                    medium_impact_news.append(news)
-                    
-                # Coletar moedas e pares afetados
-                if 'currencies' in impact_info:
-                    currencies_affected.update(impact_info['currencies'])
-                if 'pairs_affected' in impact_info:
-                    pairs_affected.update(impact_info['pairs_affected'])
-                if 'instruments' in impact_info:
-                    instruments_affected.update(impact_info['instruments'])
-        
-        # Determinar melhor estratégia
-        strategy = self.determine_trading_strategy(high_impact_news, medium_impact_news, 
-                                                 currencies_affected, pairs_affected)
-        
-        return {
-            "date": date,
-            "high_impact_news": high_impact_news,
-            "medium_impact_news": medium_impact_news,
-            "currencies_affected": list(currencies_affected),
-            "pairs_affected": list(pairs_affected),
-            "instruments_affected": list(instruments_affected),
-            "strategy": strategy
-        }
+        # Linhas já exibidas mudam no lugar; as demais passam a ser exibidas
+        # (e só entram na lista entre beginInsertRows e endInsertRows)
+        visible = self._loaded
+        if row < visible:
+            self._events[row:min(end_row, visible)] = pasted[:visible - row]
+            self.dataChanged.emit(self.index(row, column), self.index(min(end_row, visible) - 1, last_column))
+        if end_row > visible:
+            start = max(row, visible)
+            self.beginInsertRows(QModelIndex(), visible, end_row - 1)
+            if end_row > len(self._events):
+                self._events.extend([EMPTY_NEWS] * (end_row - len(self._events)))
+            self._events[start:end_row] = pasted[start - row:]
+            self._loaded = end_row
+            self.endInsertRows()
+        
+        
+class NewsTableView(QTableView):
+    """Tabela de notícias com colagem de blocos de várias linhas (Ctrl+V)"""
     
-    def get_news_impact(self, news_name):
-        """Identifica o impacto de uma notícia específica"""
-        for key, value in NEWS_IMPACT_DATABASE.items():
-            if key.lower() in news_name.lower():
-                return value
-        return None
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Paste):
+            current = self.currentIndex()
+            row = current.row() if current.isValid() else 0
+            column = current.column() if current.isValid() else 0
+            self.model().paste_block(row, column, QApplication.clipboard().text())
+            return
+        super().keyPressEvent(event)
+        
+        
+class ImportWorker(QThread):
+    """Lê um arquivo de calendário fora da thread da interface
     
-    def determine_trading_strategy(self, high_impact, medium_impact, currencies, pairs):
-        """Determina a melhor estratégia de trading baseada na confluência"""
-        strategy = {
-            "recommended_pairs": [],
-            "avoid_pairs": [],
-            "recommended_instruments": [],
-            "session_focus": [],
-            "risk_level": "MEDIUM",
-            "notes": []
-        }
-        
-        if len(high_impact) >= 2:
-            strategy["risk_level"] = "HIGH"
-            strategy["notes"].append("Múltiplas notícias de alto impacto - volatilidade esperada")
+    Com histórico persistente o calendário também é gravado nele, para não
+    precisar ser importado de novo na próxima execução.
+    """
+    loaded = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, path, analyzer=None, analyzer_lock=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.analyzer = analyzer
+        self.analyzer_lock = analyzer_lock
+        
+    def run(self):
+        from calendar_importer import ImportStats, iter_calendar
+        
+        stats = ImportStats()
+        try:
+            events = [NewsEvent.coerce(event) for event in iter_calendar(self.path, stats)]
+            if self.analyzer is not None and self.analyzer.news_store is not None:
+                with self.analyzer_lock:
+                    self.analyzer.save_news(events)
+        except (OSError, ValueError) as exc:
+            self.failed.emit(str(exc))
+            return
+        except Exception as exc:
+            self.failed.emit(f"falha ao gravar no histórico: {exc}")
+            return
+        self.loaded.emit(events, stats)
+
+
+class AnalysisWorker(QThread):
+    """Coleta e analisa as notícias fora da thread da interface"""
+    progress = pyqtSignal(int, int)
+    analysis_ready = pyqtSignal(object)
+    no_news = pyqtSignal()
+    failed = pyqtSignal(str)
+    
+    PROGRESS_STEP = 500
+    
+    def __init__(self, analyzer, analyzer_lock, rows, selected_date, parent=None, keep_other_dates=False):
+        super().__init__(parent)
+        self.analyzer = analyzer
+        self.analyzer_lock = analyzer_lock
+        self.rows = rows
+        self.selected_date = selected_date
+        # Com um calendário acompanhado, as datas fora da tabela são dele
+        self.keep_other_dates = keep_other_dates
+        
+    def run(self):
+        try:
+            news_data = []
+            total = len(self.rows)
+            for row, news in enumerate(self.rows):
+                if row % self.PROGRESS_STEP == 0:
+                    if self.isInterruptionRequested():
+                        return
+                    self.progress.emit(row, total)
+                if news.name:
+                    # Linhas sem data são da data selecionada
+                    news_data.append(news if news.date else news.replace(date=self.selected_date))
+            self.progress.emit(total, total)
             
-        # Recomendar pares baseado nas moedas afetadas
-        if "USD" in currencies:
-            if len([n for n in high_impact if "USD" in str(n.get('impact_info', {}).get('currencies', []))]) >= 2:
-                strategy["recommended_pairs"].extend(["EURUSD", "GBPUSD", "USDJPY"])
-                strategy["session_focus"].append("NY_AM")
+            if not news_data:
+                self.no_news.emit()
+                return
+            store = self.analyzer.news_store
                 
-        if "JPY" in currencies:
-            strategy["recommended_pairs"].extend(["USDJPY", "EURJPY", "GBPJPY"])
-            strategy["session_focus"].append("London")
-            
-        # Evitar pares com conflito de notícias
-        conflicting_pairs = []
-        for pair in FOREX_PAIRS["majors"] + FOREX_PAIRS["secondary"]:
-            base_currency = pair[:3]
-            quote_currency = pair[3:]
-            if base_currency in currencies and quote_currency in currencies:
-                conflicting_pairs.append(pair)
+            # Regras de impacto editadas no arquivo valem já nesta análise;
+            # um arquivo inválido mantém as regras anteriores
+            try:
+                refresh_rules()
+            except (OSError, ValueError) as exc:
+                logger.warning("regras de impacto mantidas: %s", exc)
                 
-        strategy["avoid_pairs"] = conflicting_pairs
+            # Uma análise por vez altera o analisador compartilhado; uma
+            # análise cancelada enquanto esperava não chega a alterá-lo
+            with self.analyzer_lock:
+                if self.isInterruptionRequested():
+                    return
+                if store is None and self.keep_other_dates:
+                    # Só as datas da tabela são substituídas
+                    events_by_date = {}
+                    for news in news_data:
+                        events_by_date.setdefault(news.date, []).append(news)
+                    self.analyzer.replace_dates(events_by_date)
+                elif store is None:
+                    self.analyzer.news_data = news_data
+                else:
+                    # Só o dia analisado é gravado (substituindo o que havia
+                    # nele); as demais datas vêm do histórico
+                    day = [news for news in news_data if news.date == self.selected_date]
+                    if day:
+                        self.analyzer.save_news(day, replace_dates=True)
+                analysis = self.analyzer.analyze_confluence(self.selected_date)
+                
+            if not self.isInterruptionRequested():
+                self.analysis_ready.emit(analysis)
+        except Exception as exc:
+            self.failed.emit(str(exc))
+
+
+class WatchWorker(QThread):
+    """Acompanha um calendário em arquivo/diretório e emite as mudanças na análise"""
+    diffs_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, source, analyzer, analyzer_lock, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.analyzer = analyzer
+        self.analyzer_lock = analyzer_lock
+        
+    def run(self):
+        from calendar_watch import CalendarWatcher
+        
+        watcher = CalendarWatcher(self.source, self.analyzer, lock=self.analyzer_lock)
+        try:
+            while not self.isInterruptionRequested():
+                diffs = watcher.poll()
+                if diffs:
+                    self.diffs_ready.emit(diffs)
+                self.msleep(max(int(watcher.interval * 1000), 1))
+        except Exception as exc:
+            self.failed.emit(str(exc))
+
+
+# Linha do painel de resultados: tipo, texto principal, cor e texto secundário
+ResultRow = namedtuple("ResultRow", "kind text color detail")
+
+ICT_TIP = ("💡 DICA ICT: Aguarde formação de estrutura de mercado e confluência com zonas de "
+           "liquidez antes de entrar no trade. Respeite os horários de kill zone para maior "
+           "probabilidade de sucesso.")
+RISK_COLORS = {"LOW": "#28a745", "MEDIUM": "#ffc107", "HIGH": "#dc3545"}
+
+
+def analysis_rows(analysis):
+    """Converte o resultado de analyze_confluence nas linhas do painel"""
+    if "error" in analysis:
+        return [ResultRow("error", f"❌ {analysis['error']}", "red", "")]
+        
+    rows = [ResultRow("header", f"📅 ANÁLISE PARA {analysis['date']}", "#2E86AB", "")]
+    
+    sections = (("🔴 NOTÍCIAS DE ALTO IMPACTO", analysis['high_impact_news'], "#dc3545"),
+                ("🟡 NOTÍCIAS DE MÉDIO IMPACTO", analysis['medium_impact_news'], "#ffc107"))
+    for title, news_list, color in sections:
+        if not news_list:
+            continue
+        rows.append(ResultRow("section", title, color, ""))
+        for news in news_list:
+            details = []
+            if 'impact_info' in news:
+                details.append(f"💡 {news['impact_info'].get('description', '')}")
+            if news['previous'] or news['consensus']:
+                details.append(f"📊 Previous: {news['previous']} | Consensus: {news['consensus']}")
+            rows.append(ResultRow("news", f"📰 {news['name']}", color, "\n".join(details)))
+            
+    strategy = analysis['strategy']
+    rows.append(ResultRow("strategy", "🎯 ESTRATÉGIA RECOMENDADA - SETUP ICT", "#28a745", ""))
+    if strategy['recommended_pairs']:
+        rows.append(ResultRow("field", "✅ PARES RECOMENDADOS:", "#28a745",
+                              ", ".join(strategy['recommended_pairs'])))
+    if strategy['avoid_pairs']:
+        rows.append(ResultRow("field", "❌ PARES A EVITAR:", "#dc3545",
+                              ", ".join(strategy['avoid_pairs'])))
+    if strategy['session_focus']:
+        rows.append(ResultRow("field", "⏰ SESSÕES DE FOCO:", "#007bff",
+                              ", ".join(strategy['session_focus'])))
+    rows.append(ResultRow("field", "⚠️ NÍVEL DE RISCO:", RISK_COLORS.get(strategy['risk_level'], "#333"),
+                          strategy['risk_level']))
+    if strategy['notes']:
+        rows.append(ResultRow("notes", "📝 NOTAS IMPORTANTES:", "#333", ""))
+        for note in strategy['notes']:
+            rows.append(ResultRow("note", f"• {note}", "#666", ""))
+    rows.append(ResultRow("tip", ICT_TIP, "#004085", ""))
+    return rows
+
+
+class AnalysisResultsModel(QAbstractListModel):
+    """Modelo do painel de resultados: uma ResultRow por linha"""
+    ROW_ROLE = Qt.UserRole + 1
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == self.ROW_ROLE:
+            return row
+        if role == Qt.DisplayRole:
+            return f"{row.text} {row.detail}".strip()
+        return None
+        
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
         
-        # Remover duplicatas
-        strategy["recommended_pairs"] = list(set(strategy["recommended_pairs"]))
+    def set_analysis(self, analysis):
+        """Substitui o conteúdo pelo resultado de uma análise"""
+        self.set_rows(analysis_rows(analysis))
         
-        return strategy
+    def add_analysis(self, analysis):
+        """Acrescenta o resultado de mais uma análise (saída de vários dias)"""
+        rows = analysis_rows(analysis)
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+        
+    def clear(self):
+        self.set_rows([])
+        
+        
+class ResultDelegate(QStyledItemDelegate):
+    """Desenha as linhas do painel de resultados; só as visíveis são pintadas"""
+    MARGIN = 6
+    PADDING = 8
+    LABEL_WIDTH = 240
+    
+    # Fonte (tamanho, negrito) e fundo por tipo de linha
+    FONTS = {"header": (14, True), "section": (12, True), "news": (10, True),
+             "strategy": (14, True), "field": (10, True), "notes": (10, True),
+             "error": (11, False), "message": (11, False)}
+    BACKGROUNDS = {"strategy": "#f8f9fa", "field": "#f8f9fa", "notes": "#f8f9fa",
+                   "note": "#f8f9fa", "tip": "#e7f3ff"}
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._fonts = {}
+        
+    def font(self, kind, detail=False):
+        key = (kind, detail)
+        if key not in self._fonts:
+            size, bold = (9, False) if detail else self.FONTS.get(kind, (10, False))
+            self._fonts[key] = QFont("Arial", size, QFont.Bold if bold else QFont.Normal)
+        return self._fonts[key]
+        
+    def _text_width(self, width, row):
+        width -= 2 * (self.MARGIN + self.PADDING)
+        if row.kind == "field":
+            width -= self.LABEL_WIDTH
+        return max(width, 50)
+        
+    def _text_height(self, font, width, text):
+        if not text:
+            return 0
+        rect = QFontMetrics(font).boundingRect(QRect(0, 0, width, 100000), Qt.TextWordWrap, text)
+        return rect.height()
+        
+    def sizeHint(self, option, index):
+        row = index.data(AnalysisResultsModel.ROW_ROLE)
+        view = self.parent()
+        width = view.viewport().width() if view is not None else option.rect.width()
+        text_width = self._text_width(width, row)
+        if row.kind == "field":
+            height = max(self._text_height(self.font(row.kind), self.LABEL_WIDTH, row.text),
+                         self._text_height(self.font(row.kind), text_width, row.detail))
+        else:
+            height = self._text_height(self.font(row.kind), text_width, row.text)
+            height += self._text_height(self.font(row.kind, True), text_width, row.detail)
+        return QSize(width, height + 2 * self.PADDING)
+        
+    def paint(self, painter, option, index):
+        row = index.data(AnalysisResultsModel.ROW_ROLE)
+        painter.save()
+        rect = option.rect.adjusted(self.MARGIN, 0, -self.MARGIN, 0)
+        
+        background = self.BACKGROUNDS.get(row.kind)
+        if background:
+            painter.fillRect(rect, QColor(background))
+        if row.kind in ("section", "news"):
+            painter.fillRect(QRect(rect.left(), rect.top(), 4, rect.height()), QColor(row.color))
+        elif row.kind == "header":
+            painter.fillRect(QRect(rect.left(), rect.bottom() - 1, rect.width(), 2), QColor(row.color))
+            
+        text_rect = rect.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        flags = Qt.TextWordWrap | Qt.AlignLeft | Qt.AlignTop
+        if row.kind == "field":
+            painter.setFont(self.font(row.kind))
+            painter.setPen(QColor("#333"))
+            painter.drawText(QRect(text_rect.left(), text_rect.top(), self.LABEL_WIDTH, text_rect.height()),
+                             flags, row.text)
+            painter.setPen(QColor(row.color))
+            painter.drawText(text_rect.adjusted(self.LABEL_WIDTH, 0, 0, 0), flags, row.detail)
+        else:
+            font = self.font(row.kind)
+            painter.setFont(font)
+            painter.setPen(QColor("#333" if row.kind == "news" else row.color))
+            if row.kind == "message":
+                flags = Qt.TextWordWrap | Qt.AlignCenter
+            painter.drawText(text_rect, flags, row.text)
+            if row.detail:
+                offset = self._text_height(font, text_rect.width(), row.text)
+                painter.setFont(self.font(row.kind, True))
+                painter.setPen(QColor("#666"))
+                painter.drawText(text_rect.adjusted(0, offset, 0, 0), flags, row.detail)
+        painter.restore()
+
+
+INITIAL_MESSAGE = "📝 Adicione as notícias do dia e clique em 'ANALISAR' para obter recomendações de trading."
+
+# Estilo da aplicação inteira, aplicado uma vez na QApplication antes de criar
+# os widgets (cada setStyleSheet por widget reinterpreta e repole a subárvore)
+APP_STYLE = """
+    QMainWindow {
+        background-color: #f8f9fa;
+    }
+    QGroupBox {
+        font-weight: bold;
+        border: 2px solid #dee2e6;
+        border-radius: 5px;
+        margin: 10px;
+        padding-top: 10px;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px 0 5px;
+    }
+    QTableView {
+        gridline-color: #dee2e6;
+        background-color: white;
+        border: 1px solid #dee2e6;
+        border-radius: 3px;
+    }
+    QTableView::item {
+        padding: 5px;
+    }
+    QPushButton {
+        background-color: #007bff;
+        color: white;
+        border: none;
+        padding: 8px 16px;
+        border-radius: 4px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #0056b3;
+    }
+    QPushButton:pressed {
+        background-color: #004085;
+    }
+    QPushButton#analyzeButton {
+        background-color: #28a745;
+        padding: 10px;
+    }
+    QDateEdit {
+        padding: 5px;
+        border: 1px solid #dee2e6;
+        border-radius: 3px;
+    }
+    QLabel#appTitle {
+        color: #2E86AB;
+        margin: 10px;
+        padding: 10px;
+    }
+    QLabel#resultsPlaceholder {
+        color: #666;
+        font-size: 11pt;
+    }
+"""
+
 
 class TradingAnalyzerApp(QMainWindow):
+    """Janela principal
+    
+    A abertura só constrói o que aparece na primeira pintura: o histórico em
+    disco é aberto logo depois dela (ou antes da primeira ação que o usa) e o
+    painel de resultados, com modelo e delegate, só na primeira análise.
+    """
+    
     def __init__(self):
         super().__init__()
         self.news_analyzer = NewsAnalyzer()
+        # TRADING_ANALYZER_PROFILE=1 liga a instrumentação por etapa
+        if os.environ.get("TRADING_ANALYZER_PROFILE"):
+            self.news_analyzer.enable_profiling()
+        self._analyzer_lock = threading.Lock()
+        self._analysis_worker = None
+        self._watch_worker = None
+        self._running_workers = set()
+        self._store_attached = False
+        self._painted = False
+        self._startup_report = bool(os.environ.get(STARTUP_REPORT_ENV))
+        self.results_model = None
+        self.results_view = None
         self.init_ui()
+        self.startup_mark("window")
+        
+    def startup_mark(self, stage):
+        """Marca de abertura (segundos desde o início do processo) no modo de relatório"""
+        if self._startup_report:
+            print(f"{stage} {perf_counter() - _STARTED:.6f}", flush=True)
+            
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.startup_mark("first_paint")
+            # Depois que a pintura chega à tela
+            QTimer.singleShot(0, self.finish_startup)
+            
+    def finish_startup(self):
+        """Trabalho adiado para depois da primeira pintura"""
+        self.attach_store()
+        self.startup_mark("ready")
+        if self._startup_report:
+            self.close()
+            
+    def attach_store(self):
+        """Abre o histórico em disco e o liga ao analisador (uma vez só)"""
+        if self._store_attached:
+            return
+        self._store_attached = True
+        store = self.open_store()
+        if store is not None:
+            with self._analyzer_lock:
+                self.news_analyzer.news_store = store
+            self.statusBar().showMessage(f"🗄️ Histórico em {store.path}", 5000)
+        
+    def open_store(self):
+        """Abre o histórico SQLite (None se não configurado ou indisponível)"""
+        path = os.environ.get(DB_ENV)
+        if not path:
+            return None
+        import sqlite3
+        from news_store import NewsStore
+        
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            return NewsStore(path)
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("histórico indisponível em %s: %s", path, exc)
+            return None
         
     def init_ui(self):
+        # Estilo antes dos widgets: cada um é polido uma vez só
+        self.apply_styles()
         self.setWindowTitle("Analisador de Notícias para Trading - ICT Setup")
         self.setGeometry(100, 100, 1400, 900)
         
@@ -219,8 +637,8 @@ class TradingAnalyzerApp(QMainWindow):
         # Título
         title = QLabel("🔍 ANALISADOR DE NOTÍCIAS PARA TRADING")
         title.setAlignment(Qt.AlignCenter)
+        title.setObjectName("appTitle")
         title.setFont(QFont("Arial", 16, QFont.Bold))
-        title.setStyleSheet("color: #2E86AB; margin: 10px; padding: 10px;")
         main_layout.addWidget(title)
         
         # Layout horizontal para input e análise
@@ -236,9 +654,6 @@ class TradingAnalyzerApp(QMainWindow):
         
         main_layout.addLayout(content_layout)
         
-        # Aplicar estilo
-        self.apply_styles()
-        
     def create_input_section(self):
         """Cria seção de input de notícias"""
         group = QGroupBox("📰 Input de Notícias")
@@ -254,16 +669,27 @@ class TradingAnalyzerApp(QMainWindow):
         layout.addLayout(date_layout)
         
         # Tabela de notícias
-        self.news_table = QTableWidget()
-        self.news_table.setColumnCount(4)
-        self.news_table.setHorizontalHeaderLabels(["Notícia", "Previous", "Consensus", "Horário"])
+        self.news_model = NewsTableModel(self)
+        self.news_model.clear()  # Começar com 10 linhas
+        self.news_table = NewsTableView()
+        self.news_table.setModel(self.news_model)
         self.news_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.news_table.setRowCount(10)  # Começar com 10 linhas
+        self.news_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.news_table.setColumnWidth(0, 220)
         layout.addWidget(self.news_table)
         
         # Botões
         button_layout = QHBoxLayout()
         
+        import_btn = QPushButton("📂 Importar")
+        import_btn.clicked.connect(self.import_calendar)
+        button_layout.addWidget(import_btn)
+        
+        self.watch_btn = QPushButton("👁️ Acompanhar")
+        self.watch_btn.setCheckable(True)
+        self.watch_btn.toggled.connect(self.toggle_watch)
+        button_layout.addWidget(self.watch_btn)
+        
         add_row_btn = QPushButton("➕ Adicionar Linha")
         add_row_btn.clicked.connect(self.add_news_row)
         button_layout.addWidget(add_row_btn)
@@ -274,7 +700,7 @@ class TradingAnalyzerApp(QMainWindow):
         
         analyze_btn = QPushButton("🔍 ANALISAR")
         analyze_btn.clicked.connect(self.analyze_news)
-        analyze_btn.setStyleSheet("background-color: #28a745; color: white; font-weight: bold; padding: 10px;")
+        analyze_btn.setObjectName("analyzeButton")
         button_layout.addWidget(analyze_btn)
         
         layout.addLayout(button_layout)
@@ -285,294 +711,233 @@ class TradingAnalyzerApp(QMainWindow):
     def create_analysis_section(self):
         """Cria seção de análise e resultados"""
         group = QGroupBox("📊 Análise e Recomendações")
-        layout = QVBoxLayout()
+        self._results_layout = QVBoxLayout()
         
-        # Área de resultados com scroll
-        scroll_area = QScrollArea()
-        scroll_widget = QWidget()
-        self.results_layout = QVBoxLayout()
-        scroll_widget.setLayout(self.results_layout)
-        scroll_area.setWidget(scroll_widget)
-        scroll_area.setWidgetResizable(True)
-        
-        layout.addWidget(scroll_area)
-        group.setLayout(layout)
-        
-        # Inicializar com mensagem
-        self.show_initial_message()
+        # Até a primeira análise o painel é só a mensagem inicial
+        self._results_placeholder = QLabel(INITIAL_MESSAGE)
+        self._results_placeholder.setObjectName("resultsPlaceholder")
+        self._results_placeholder.setAlignment(Qt.AlignCenter)
+        self._results_placeholder.setWordWrap(True)
         
+        self._results_layout.addWidget(self._results_placeholder)
+        group.setLayout(self._results_layout)
         return group
         
+    def results_panel(self):
+        """Modelo do painel de resultados, criado (com a lista) no primeiro uso"""
+        if self.results_model is None:
+            # Lista de resultados: um modelo atualizado a cada análise e um
+            # delegate que pinta só as linhas visíveis, sem widgets por notícia
+            self.results_model = AnalysisResultsModel(self)
+            self.results_view = QListView()
+            self.results_view.setModel(self.results_model)
+            self.results_view.setItemDelegate(ResultDelegate(self.results_view))
+            self.results_view.setSelectionMode(QAbstractItemView.NoSelection)
+            self.results_view.setFocusPolicy(Qt.NoFocus)
+            self.results_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+            self.results_view.setResizeMode(QListView.Adjust)
+            self.results_view.setLayoutMode(QListView.Batched)
+            
+            self._results_layout.replaceWidget(self._results_placeholder, self.results_view)
+            self._results_placeholder.deleteLater()
+            self._results_placeholder = None
+        return self.results_model
+        
     def show_initial_message(self):
         """Mostra mensagem inicial"""
-        msg = QLabel("📝 Adicione as notícias do dia e clique em 'ANALISAR' para obter recomendações de trading.")
-        msg.setAlignment(Qt.AlignCenter)
-        msg.setStyleSheet("color: #666; font-size: 14px; padding: 20px;")
-        self.results_layout.addWidget(msg)
+        if self.results_model is None:
+            return
+        self.results_model.set_rows([ResultRow("message", INITIAL_MESSAGE, "#666", "")])
         
     def add_news_row(self):
         """Adiciona uma nova linha à tabela de notícias"""
-        current_rows = self.news_table.rowCount()
-        self.news_table.insertRow(current_rows)
+        self.news_model.append_rows(1)
         
     def clear_news_table(self):
         """Limpa a tabela de notícias"""
-        self.news_table.setRowCount(0)
-        self.news_table.setRowCount(10)
-        
-    def analyze_news(self):
-        """Analisa as notícias inseridas"""
-        # Limpar resultados anteriores
-        self.clear_results()
+        self.news_model.clear()
         
-        # Coletar dados da tabela
-        news_data = []
-        selected_date = self.date_edit.date().toString("yyyy-MM-dd")
+    def import_calendar(self):
+        """Importa um calendário (CSV/JSON Lines) para a tabela de notícias"""
+        from PyQt5.QtWidgets import QFileDialog
         
-        for row in range(self.news_table.rowCount()):
-            news_item = self.news_table.item(row, 0)
-            previous_item = self.news_table.item(row, 1)
-            consensus_item = self.news_table.item(row, 2)
-            time_item = self.news_table.item(row, 3)
-            
-            if news_item and news_item.text().strip():
-                news_data.append({
-                    "name": news_item.text().strip(),
-                    "previous": previous_item.text().strip() if previous_item else "",
-                    "consensus": consensus_item.text().strip() if consensus_item else "",
-                    "time": time_item.text().strip() if time_item else "",
-                    "date": selected_date
-                })
-        
-        if not news_data:
-            QMessageBox.warning(self, "Aviso", "Por favor, adicione pelo menos uma notícia para análise.")
+        path, _ = QFileDialog.getOpenFileName(self, "Importar calendário", "",
+                                              "Calendários (*.csv *.jsonl *.ndjson *.json)")
+        if not path:
             return
+        self.attach_store()
+        worker = ImportWorker(path, self.news_analyzer, self._analyzer_lock, self)
+        worker.loaded.connect(self.on_calendar_loaded)
+        worker.failed.connect(self.on_import_failed)
+        worker.finished.connect(self.on_worker_finished)
+        self._running_workers.add(worker)
+        self.statusBar().showMessage("⏳ Importando calendário...")
+        worker.start()
+        
+    def on_calendar_loaded(self, events, stats):
+        self.news_model.set_events(events)
+        self.statusBar().showMessage(stats.summary().splitlines()[0])
+        if stats.rows_rejected:
+            from PyQt5.QtWidgets import QMessageBox
+            QMessageBox.warning(self, "Importação", stats.summary())
             
-        # Limpar dados anteriores e adicionar novos
-        self.news_analyzer.news_data = news_data
+    def on_import_failed(self, message):
+        from PyQt5.QtWidgets import QMessageBox
         
-        # Executar análise
-        analysis = self.news_analyzer.analyze_confluence(selected_date)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Erro", f"Falha ao importar o calendário: {message}")
         
-        # Mostrar resultados
-        self.display_analysis_results(analysis)
+    def toggle_watch(self, enabled):
+        """Liga/desliga o acompanhamento de um calendário atualizado externamente"""
+        if not enabled:
+            self.stop_watch()
+            return
+        from PyQt5.QtWidgets import QFileDialog
         
-    def clear_results(self):
-        """Limpa os resultados anteriores"""
-        for i in reversed(range(self.results_layout.count())):
-            child = self.results_layout.itemAt(i).widget()
-            if child:
-                child.setParent(None)
-                
-    def display_analysis_results(self, analysis):
-        """Exibe os resultados da análise"""
-        if "error" in analysis:
-            error_label = QLabel(f"❌ {analysis['error']}")
-            error_label.setStyleSheet("color: red; font-size: 14px;")
-            self.results_layout.addWidget(error_label)
+        path, _ = QFileDialog.getOpenFileName(self, "Acompanhar calendário", "",
+                                              "Calendários (*.csv *.jsonl *.ndjson *.json)")
+        if not path:
+            self.watch_btn.setChecked(False)
             return
+        self.attach_store()
+        worker = WatchWorker(path, self.news_analyzer, self._analyzer_lock, self)
+        worker.diffs_ready.connect(self.on_watch_diffs)
+        worker.failed.connect(self.on_watch_failed)
+        worker.finished.connect(self.on_worker_finished)
+        self._watch_worker = worker
+        self._running_workers.add(worker)
+        self.statusBar().showMessage(f"👁️ Acompanhando {os.path.basename(path)}")
+        worker.start()
+        
+    def stop_watch(self):
+        if self._watch_worker is not None:
+            self._watch_worker.requestInterruption()
+            self._watch_worker = None
+            self.statusBar().clearMessage()
             
-        # Cabeçalho
-        header = QLabel(f"📅 ANÁLISE PARA {analysis['date']}")
-        header.setFont(QFont("Arial", 14, QFont.Bold))
-        header.setStyleSheet("color: #2E86AB; padding: 10px; border-bottom: 2px solid #2E86AB;")
-        self.results_layout.addWidget(header)
-        
-        # Notícias de alto impacto
-        if analysis['high_impact_news']:
-            high_impact_frame = self.create_news_frame("🔴 NOTÍCIAS DE ALTO IMPACTO", 
-                                                     analysis['high_impact_news'], "#dc3545")
-            self.results_layout.addWidget(high_impact_frame)
-            
-        # Notícias de médio impacto
-        if analysis['medium_impact_news']:
-            medium_impact_frame = self.create_news_frame("🟡 NOTÍCIAS DE MÉDIO IMPACTO", 
-                                                       analysis['medium_impact_news'], "#ffc107")
-            self.results_layout.addWidget(medium_impact_frame)
-            
-        # Estratégia recomendada
-        strategy_frame = self.create_strategy_frame(analysis['strategy'])
-        self.results_layout.addWidget(strategy_frame)
+    def on_watch_diffs(self, diffs):
+        if self.sender() is not self._watch_worker:
+            return
+        from calendar_watch import format_diff
         
-        # Adicionar espaçador
-        self.results_layout.addStretch()
+        selected_date = self.date_edit.date().toString("yyyy-MM-dd")
+        for diff in diffs:
+            if diff.date == selected_date:
+                self.display_analysis_results(diff.after)
+        self.statusBar().showMessage("👁️ " + " | ".join(format_diff(diff).splitlines()[0] for diff in diffs[:3]))
         
-    def create_news_frame(self, title, news_list, color):
-        """Cria frame para exibir notícias"""
-        frame = QFrame()
-        frame.setFrameStyle(QFrame.Box)
-        frame.setStyleSheet(f"border: 2px solid {color}; border-radius: 5px; margin: 5px;")
+    def on_watch_failed(self, message):
+        if self.sender() is not self._watch_worker:
+            return
+        from PyQt5.QtWidgets import QMessageBox
         
-        layout = QVBoxLayout()
+        self._watch_worker = None
+        self.watch_btn.setChecked(False)
+        QMessageBox.critical(self, "Erro", f"Falha ao acompanhar o calendário: {message}")
         
-        # Título
-        title_label = QLabel(title)
-        title_label.setFont(QFont("Arial", 12, QFont.Bold))
-        title_label.setStyleSheet(f"color: {color}; padding: 5px;")
-        layout.addWidget(title_label)
+    def analyze_news(self):
+        """Analisa as notícias inseridas numa thread de trabalho"""
+        # Uma nova análise cancela a anterior
+        self.cancel_analysis()
+        self.attach_store()
         
-        # Lista de notícias
-        for news in news_list:
-            news_widget = QWidget()
-            news_layout = QVBoxLayout()
-            
-            # Nome da notícia
-            name_label = QLabel(f"📰 {news['name']}")
-            name_label.setFont(QFont("Arial", 10, QFont.Bold))
-            news_layout.addWidget(name_label)
+        # Cópia rasa das linhas: as notícias em si não são alteradas
+        rows = self.news_model.events()
+        selected_date = self.date_edit.date().toString("yyyy-MM-dd")
+        
+        worker = AnalysisWorker(self.news_analyzer, self._analyzer_lock, rows, selected_date, self,
+                                keep_other_dates=self._watch_worker is not None)
+        worker.progress.connect(self.on_analysis_progress)
+        worker.analysis_ready.connect(self.on_analysis_ready)
+        worker.no_news.connect(self.on_analysis_no_news)
+        worker.failed.connect(self.on_analysis_failed)
+        worker.finished.connect(self.on_worker_finished)
+        
+        self._analysis_worker = worker
+        self._running_workers.add(worker)
+        self.statusBar().showMessage("⏳ Analisando...")
+        worker.start()
+        
+    def cancel_analysis(self):
+        """Cancela a análise em andamento, se houver"""
+        if self._analysis_worker is not None:
+            self._analysis_worker.requestInterruption()
+            self._analysis_worker = None
             
-            # Informações adicionais
-            if 'impact_info' in news:
-                impact_info = news['impact_info']
-                info_text = f"💡 {impact_info.get('description', '')}"
-                info_label = QLabel(info_text)
-                info_label.setWordWrap(True)
-                info_label.setStyleSheet("color: #666; font-size: 9px;")
-                news_layout.addWidget(info_label)
-                
-            # Dados Previous/Consensus
-            if news['previous'] or news['consensus']:
-                data_text = f"📊 Previous: {news['previous']} | Consensus: {news['consensus']}"
-                data_label = QLabel(data_text)
-                data_label.setStyleSheet("color: #333; font-size: 9px;")
-                news_layout.addWidget(data_label)
-                
-            news_widget.setLayout(news_layout)
-            layout.addWidget(news_widget)
+    def on_analysis_progress(self, done, total):
+        if self.sender() is self._analysis_worker:
+            self.statusBar().showMessage(f"⏳ Analisando... {done}/{total} linhas")
             
-        frame.setLayout(layout)
-        return frame
+    def on_analysis_ready(self, analysis):
+        if self.sender() is not self._analysis_worker:
+            return
+        self.statusBar().clearMessage()
+        self.display_analysis_results(analysis)
         
-    def create_strategy_frame(self, strategy):
-        """Cria frame com estratégia recomendada"""
-        frame = QFrame()
-        frame.setFrameStyle(QFrame.Box)
-        frame.setStyleSheet("border: 2px solid #28a745; border-radius: 5px; margin: 5px; background-color: #f8f9fa;")
+    def on_analysis_no_news(self):
+        if self.sender() is not self._analysis_worker:
+            return
+        from PyQt5.QtWidgets import QMessageBox
         
-        layout = QVBoxLayout()
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Aviso", "Por favor, adicione pelo menos uma notícia para análise.")
         
-        # Título
-        title_label = QLabel("🎯 ESTRATÉGIA RECOMENDADA - SETUP ICT")
-        title_label.setFont(QFont("Arial", 14, QFont.Bold))
-        title_label.setStyleSheet("color: #28a745; padding: 10px; text-align: center;")
-        layout.addWidget(title_label)
-        
-        # Grid para organizar informações
-        grid_layout = QGridLayout()
-        
-        # Pares recomendados
-        if strategy['recommended_pairs']:
-            rec_pairs_label = QLabel("✅ PARES RECOMENDADOS:")
-            rec_pairs_label.setFont(QFont("Arial", 10, QFont.Bold))
-            grid_layout.addWidget(rec_pairs_label, 0, 0)
-            
-            pairs_text = ", ".join(strategy['recommended_pairs'])
-            pairs_value = QLabel(pairs_text)
-            pairs_value.setStyleSheet("color: #28a745; font-weight: bold;")
-            grid_layout.addWidget(pairs_value, 0, 1)
-            
-        # Pares a evitar
-        if strategy['avoid_pairs']:
-            avoid_pairs_label = QLabel("❌ PARES A EVITAR:")
-            avoid_pairs_label.setFont(QFont("Arial", 10, QFont.Bold))
-            grid_layout.addWidget(avoid_pairs_label, 1, 0)
-            
-            avoid_text = ", ".join(strategy['avoid_pairs'])
-            avoid_value = QLabel(avoid_text)
-            avoid_value.setStyleSheet("color: #dc3545; font-weight: bold;")
-            grid_layout.addWidget(avoid_value, 1, 1)
-            
-        # Sessões de foco
-        if strategy['session_focus']:
-            session_label = QLabel("⏰ SESSÕES DE FOCO:")
-            session_label.setFont(QFont("Arial", 10, QFont.Bold))
-            grid_layout.addWidget(session_label, 2, 0)
-            
-            session_text = ", ".join(strategy['session_focus'])
-            session_value = QLabel(session_text)
-            session_value.setStyleSheet("color: #007bff; font-weight: bold;")
-            grid_layout.addWidget(session_value, 2, 1)
-            
-        # Nível de risco
-        risk_label = QLabel("⚠️ NÍVEL DE RISCO:")
-        risk_label.setFont(QFont("Arial", 10, QFont.Bold))
-        grid_layout.addWidget(risk_label, 3, 0)
-        
-        risk_colors = {"LOW": "#28a745", "MEDIUM": "#ffc107", "HIGH": "#dc3545"}
-        risk_value = QLabel(strategy['risk_level'])
-        risk_value.setStyleSheet(f"color: {risk_colors.get(strategy['risk_level'], '#333')}; font-weight: bold;")
-        grid_layout.addWidget(risk_value, 3, 1)
-        
-        layout.addLayout(grid_layout)
-        
-        # Notas adicionais
-        if strategy['notes']:
-            notes_label = QLabel("📝 NOTAS IMPORTANTES:")
-            notes_label.setFont(QFont("Arial", 10, QFont.Bold))
-            layout.addWidget(notes_label)
-            
-            for note in strategy['notes']:
-                note_label = QLabel(f"• {note}")
-                note_label.setWordWrap(True)
-                note_label.setStyleSheet("color: #666; margin-left: 20px;")
-                layout.addWidget(note_label)
-                
-        # Dica ICT
-        ict_tip = QLabel("💡 DICA ICT: Aguarde formação de estrutura de mercado e confluência com zonas de liquidez antes de entrar no trade. Respeite os horários de kill zone para maior probabilidade de sucesso.")
-        ict_tip.setWordWrap(True)
-        ict_tip.setStyleSheet("background-color: #e7f3ff; border: 1px solid #007bff; border-radius: 3px; padding: 10px; margin: 10px; color: #004085;")
-        layout.addWidget(ict_tip)
+    def on_analysis_failed(self, message):
+        if self.sender() is not self._analysis_worker:
+            return
+        from PyQt5.QtWidgets import QMessageBox
+        
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Erro", f"Falha na análise: {message}")
+        
+    def on_worker_finished(self):
+        worker = self.sender()
+        self._running_workers.discard(worker)
+        if worker is self._analysis_worker:
+            self._analysis_worker = None
+        if worker is self._watch_worker:
+            self._watch_worker = None
+        worker.deleteLater()
+        
+    def closeEvent(self, event):
+        """Interrompe as análises em andamento antes de fechar"""
+        self.cancel_analysis()
+        self.stop_watch()
+        for worker in list(self._running_workers):
+            worker.requestInterruption()
+            worker.wait()
+        if self.news_analyzer.news_store is not None:
+            self.news_analyzer.news_store.close()
+        super().closeEvent(event)
         
-        frame.setLayout(layout)
-        return frame
+    def clear_results(self):
+        """Limpa os resultados anteriores"""
+        if self.results_model is not None:
+            self.results_model.clear()
+                
+    def display_analysis_results(self, analysis):
+        """Exibe os resultados da análise (substitui os anteriores)"""
+        results_model = self.results_panel()
+        profiler = self.news_analyzer.profiler
+        if profiler is None:
+            results_model.set_analysis(analysis)
+            return
+            
+        started = perf_counter()
+        results_model.set_analysis(analysis)
+        profiler.record_stage("render", perf_counter() - started,
+                              rows_rendered=results_model.rowCount())
+        record = profiler.last
+        if record is not None:
+            summary = profiler.format_record(record)
+            logger.info("análise %s", summary)
+            self.statusBar().showMessage(f"⏱️ {summary}")
         
     def apply_styles(self):
-        """Aplica estilos à aplicação"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f8f9fa;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #dee2e6;
-                border-radius: 5px;
-                margin: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QTableWidget {
-                gridline-color: #dee2e6;
-                background-color: white;
-                border: 1px solid #dee2e6;
-                border-radius: 3px;
-            }
-            QTableWidget::item {
-                padding: 5px;
-            }
-            QPushButton {
-                background-color: #007bff;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #0056b3;
-            }
-            QPushButton:pressed {
-                background-color: #004085;
-            }
-            QDateEdit {
-                padding: 5px;
-                border: 1px solid #dee2e6;
-                border-radius: 3px;
-            }
-        """)
+        """Aplica o estilo na QApplication (interpretado uma vez por processo)"""
+        app = QApplication.instance()
+        if app.styleSheet() != APP_STYLE:
+            app.setStyleSheet(APP_STYLE)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)